@@ -0,0 +1,146 @@
+"""Fixtures and baseline checking for the scale benchmarks.
+
+Each benchmark records its metrics through the ``baseline`` fixture,
+which fails the benchmark when a metric is worse than the committed
+``baseline.json`` by more than the tolerance. Run with
+``--update-baseline`` to record new baseline numbers instead.
+"""
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from synthetic import SyntheticInstall, build_install  # noqa: E402
+
+from custom_components.ai_config_assistant import entity_manager  # noqa: E402
+
+BASELINE_FILE = Path(__file__).with_name("baseline.json")
+
+# Install sizes benchmarked
+SIZES = [1_000, 10_000, 50_000]
+
+# Times vary between machines far more than memory does
+DEFAULT_TIME_TOLERANCE = 2.0
+DEFAULT_MEMORY_TOLERANCE = 1.25
+
+# Timings below this are scheduler noise, never a regression
+TIME_FLOOR_MS = 0.25
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """Add the baseline options."""
+    group = parser.getgroup("baseline")
+    group.addoption(
+        "--update-baseline",
+        action="store_true",
+        help="write the measured metrics to baseline.json instead of comparing",
+    )
+    group.addoption(
+        "--time-tolerance",
+        type=float,
+        default=DEFAULT_TIME_TOLERANCE,
+        help="allowed slowdown against the baseline, as a factor",
+    )
+    group.addoption(
+        "--memory-tolerance",
+        type=float,
+        default=DEFAULT_MEMORY_TOLERANCE,
+        help="allowed memory growth against the baseline, as a factor",
+    )
+
+
+class Baseline:
+    """Compare benchmark metrics against the committed baseline.
+
+    Metric names end in their unit: ``_ms`` and ``_mb`` are better when
+    lower, ``_per_s`` when higher.
+    """
+
+    def __init__(self, config: pytest.Config) -> None:
+        """Load the committed baseline."""
+        self._update = config.getoption("--update-baseline")
+        self._time_tolerance = config.getoption("--time-tolerance")
+        self._memory_tolerance = config.getoption("--memory-tolerance")
+        self.expected: Dict[str, Dict[str, float]] = (
+            json.loads(BASELINE_FILE.read_text()) if BASELINE_FILE.exists() else {}
+        )
+        self.measured: Dict[str, Dict[str, float]] = {}
+
+    def check(self, name: str, **metrics: float) -> None:
+        """Record a benchmark's metrics and fail on a regression."""
+        self.measured[name] = {key: round(value, 4) for key, value in metrics.items()}
+        if self._update:
+            return
+
+        expected = self.expected.get(name)
+        if expected is None:
+            pytest.skip(f"no baseline for {name}; run with --update-baseline")
+        regressions: List[str] = []
+        for key, value in metrics.items():
+            if key not in expected:
+                continue
+            if key.endswith("_mb"):
+                limit = expected[key] * self._memory_tolerance
+                worse = value > limit
+            elif key.endswith("_per_s"):
+                limit = expected[key] / self._time_tolerance
+                worse = value < limit
+            else:
+                limit = max(expected[key] * self._time_tolerance, TIME_FLOOR_MS)
+                worse = value > limit
+            if worse:
+                regressions.append(
+                    f"{key}: {value:.4g} (baseline {expected[key]:.4g}, limit {limit:.4g})"
+                )
+        if regressions:
+            pytest.fail(f"{name} regressed: " + "; ".join(regressions))
+
+    def write(self) -> None:
+        """Merge the measured metrics into the baseline file."""
+        self.expected.update(self.measured)
+        BASELINE_FILE.write_text(json.dumps(self.expected, indent=2, sort_keys=True) + "\n")
+
+
+@pytest.fixture(scope="session")
+def baseline(request: pytest.FixtureRequest) -> Baseline:
+    """Return the session's baseline, written back when updating."""
+    result = Baseline(request.config)
+    yield result
+    if request.config.getoption("--update-baseline"):
+        result.write()
+
+
+@pytest.fixture(scope="module", params=SIZES, ids=lambda size: f"{size // 1000}k")
+def install(request: pytest.FixtureRequest) -> SyntheticInstall:
+    """Generate an install and point the entity manager at its registries."""
+    synthetic = build_install(request.param)
+    patch = pytest.MonkeyPatch()
+    patch.setattr(entity_manager, "async_get_entity_registry", lambda hass: synthetic.entity_registry)
+    patch.setattr(entity_manager, "async_get_device_registry", lambda hass: synthetic.device_registry)
+    patch.setattr(entity_manager, "async_get_area_registry", lambda hass: synthetic.area_registry)
+    yield synthetic
+    patch.undo()
+
+
+def median_ms(call: Callable[[], Any], rounds: int, budget: float = 2.0) -> float:
+    """Return the median duration of ``call`` in milliseconds.
+
+    Stops early once ``budget`` seconds have been spent, after at least
+    three rounds.
+    """
+    durations = []
+    deadline = time.perf_counter() + budget
+    for round_number in range(rounds):
+        started = time.perf_counter()
+        call()
+        durations.append(time.perf_counter() - started)
+        if round_number >= 2 and time.perf_counter() > deadline:
+            break
+    return statistics.median(durations) * 1000
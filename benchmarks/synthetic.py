@@ -0,0 +1,126 @@
+"""Synthetic Home Assistant installs for the scale benchmarks.
+
+Builds states and entity, device and area registries shaped like a real
+install: entities spread over common domains, grouped four to a device,
+with most devices assigned to an area and a few entities assigned to an
+area directly. Generation is seeded, so every run sees the same install.
+"""
+import random
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+from homeassistant.core import Event, State
+
+ROOMS = [
+    "Kitchen", "Living Room", "Bedroom", "Bathroom", "Office", "Hallway",
+    "Garage", "Basement", "Attic", "Dining Room", "Laundry", "Porch",
+    "Garden", "Nursery", "Guest Room", "Study",
+]
+
+# Domain, share of entities, device nouns, states and attributes
+DOMAINS = [
+    ("light", 0.22, ["Ceiling Light", "Lamp", "Strip", "Spot"], ["on", "off"], {}),
+    ("switch", 0.12, ["Plug", "Outlet", "Relay"], ["on", "off"], {}),
+    ("sensor", 0.30, ["Temperature", "Humidity", "Power", "Energy", "Illuminance"],
+     ["21.5", "48", "120.3", "3.2"], {"unit_of_measurement": "°C", "state_class": "measurement"}),
+    ("binary_sensor", 0.16, ["Motion", "Door", "Window", "Occupancy"], ["on", "off"],
+     {"device_class": "motion"}),
+    ("climate", 0.03, ["Thermostat", "Heat Pump"], ["heat", "cool", "off"],
+     {"current_temperature": 21, "temperature": 22, "hvac_modes": ["heat", "cool", "off"]}),
+    ("cover", 0.05, ["Blind", "Shade", "Garage Door"], ["open", "closed"], {"current_position": 50}),
+    ("media_player", 0.04, ["Speaker", "TV"], ["playing", "idle", "off"], {"volume_level": 0.4}),
+    ("fan", 0.03, ["Fan", "Ventilator"], ["on", "off"], {"percentage": 50}),
+    ("lock", 0.02, ["Lock", "Deadbolt"], ["locked", "unlocked"], {}),
+    ("device_tracker", 0.03, ["Phone", "Tag"], ["home", "not_home"], {}),
+]
+
+ENTITIES_PER_DEVICE = 4
+DEVICE_AREA_SHARE = 0.8
+DIRECT_AREA_SHARE = 0.1
+
+
+@dataclass
+class SyntheticInstall:
+    """States and registries of a generated install."""
+    size: int
+    states: List[State]
+    entity_registry: SimpleNamespace
+    device_registry: SimpleNamespace
+    area_registry: SimpleNamespace
+    names: List[str] = field(default_factory=list)
+
+    def hass(self) -> SimpleNamespace:
+        """Return a hass stand-in exposing the states and a no-op event bus."""
+        states = self.states
+        return SimpleNamespace(
+            states=SimpleNamespace(async_all=lambda: list(states)),
+            bus=SimpleNamespace(async_listen=lambda *args, **kwargs: None),
+        )
+
+    def state_events(self, count: int, seed: int = 1) -> List[Event]:
+        """Return state_changed events for randomly chosen entities."""
+        rng = random.Random(seed)
+        events = []
+        for _ in range(count):
+            old = rng.choice(self.states)
+            new = State(old.entity_id, rng.choice(("on", "off", "21.7")), old.attributes)
+            events.append(
+                Event("state_changed", {"entity_id": old.entity_id, "old_state": old, "new_state": new})
+            )
+        return events
+
+
+def build_install(size: int, seed: int = 0) -> SyntheticInstall:
+    """Generate an install with ``size`` entities."""
+    rng = random.Random(seed)
+    area_count = max(len(ROOMS), size // 200)
+    areas: Dict[str, Any] = {}
+    for index in range(area_count):
+        room = ROOMS[index % len(ROOMS)]
+        name = room if index < len(ROOMS) else f"{room} {index // len(ROOMS) + 1}"
+        area_id = name.lower().replace(" ", "_")
+        areas[area_id] = SimpleNamespace(id=area_id, name=name, aliases=set())
+    area_ids = list(areas)
+
+    weights = [share for _, share, _, _, _ in DOMAINS]
+    states: List[State] = []
+    entities: Dict[str, Any] = {}
+    devices: Dict[str, Any] = {}
+    names: List[str] = []
+    counters: Dict[str, int] = {}
+    for index in range(size):
+        domain, _, nouns, values, attributes = rng.choices(DOMAINS, weights)[0]
+        device_id = f"device_{index // ENTITIES_PER_DEVICE}"
+        if device_id not in devices:
+            devices[device_id] = SimpleNamespace(
+                id=device_id,
+                name=f"Device {index // ENTITIES_PER_DEVICE}",
+                name_by_user=None,
+                area_id=rng.choice(area_ids) if rng.random() < DEVICE_AREA_SHARE else None,
+            )
+        area_id = rng.choice(area_ids) if rng.random() < DIRECT_AREA_SHARE else None
+        room = areas[area_id or devices[device_id].area_id or rng.choice(area_ids)].name
+
+        name = f"{room} {rng.choice(nouns)}"
+        counters[name] = counters.get(name, 0) + 1
+        if counters[name] > 1:
+            name = f"{name} {counters[name]}"
+        entity_id = f"{domain}.{name.lower().replace(' ', '_')}"
+        names.append(name)
+
+        states.append(
+            State(entity_id, rng.choice(values), {**attributes, "friendly_name": name})
+        )
+        entities[entity_id] = SimpleNamespace(
+            entity_id=entity_id, area_id=area_id, device_id=device_id
+        )
+
+    return SyntheticInstall(
+        size=size,
+        states=states,
+        entity_registry=SimpleNamespace(entities=entities),
+        device_registry=SimpleNamespace(devices=devices),
+        area_registry=SimpleNamespace(areas=areas),
+        names=names,
+    )
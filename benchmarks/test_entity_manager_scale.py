@@ -0,0 +1,107 @@
+"""Scale benchmarks for EntityManager on synthetic 1k-50k entity installs.
+
+Run from the repository root:
+
+    python -m pytest benchmarks -q
+"""
+import asyncio
+import gc
+import time
+import tracemalloc
+
+import pytest
+
+from conftest import median_ms
+from synthetic import SyntheticInstall
+
+from custom_components.ai_config_assistant.entity_manager import EntityManager
+
+# Queries by kind, as typed into the autocomplete box
+QUERIES = {
+    "exact_word": ("kitchen", None),
+    "prefix": ("kitch", None),
+    "substring": ("itche", None),
+    "multi_word": ("kitchen ceiling", None),
+    "domain": ("light", None),
+    "domain_filtered": ("kitchen", ["light", "switch"]),
+    "domain_qualified": ("light.kitch", None),
+    "miss": ("zzqx", None),
+    "empty": ("", None),
+}
+
+STATE_EVENTS = 20_000
+
+
+@pytest.fixture(scope="module")
+def loop() -> asyncio.AbstractEventLoop:
+    """Return an event loop shared by a module's benchmarks."""
+    event_loop = asyncio.new_event_loop()
+    yield event_loop
+    event_loop.close()
+
+
+@pytest.fixture(scope="module")
+def manager(install: SyntheticInstall, loop: asyncio.AbstractEventLoop) -> EntityManager:
+    """Return an entity manager with the install indexed."""
+    entity_manager = EntityManager(install.hass())
+    loop.run_until_complete(entity_manager.initialize())
+    return entity_manager
+
+
+def test_build_index(install, loop, baseline):
+    """Time building the entity cache and search index, and measure its memory."""
+    hass = install.hass()
+
+    def build() -> None:
+        """Index the install into a fresh manager."""
+        loop.run_until_complete(EntityManager(hass)._build_entity_cache())
+
+    build_ms = median_ms(build, rounds=5, budget=10.0)
+
+    gc.collect()
+    tracemalloc.start()
+    entity_manager = EntityManager(hass)
+    loop.run_until_complete(entity_manager._build_entity_cache())
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert entity_manager.entity_count > 0.9 * install.size
+    baseline.check(
+        f"build_index[{install.size}]",
+        build_ms=build_ms,
+        retained_mb=retained / 2**20,
+        peak_mb=peak / 2**20,
+    )
+
+
+@pytest.mark.parametrize("kind", QUERIES)
+def test_suggestion_latency(install, manager, loop, baseline, kind):
+    """Time one autocomplete query of each kind."""
+    query, domain_filter = QUERIES[kind]
+
+    def suggest() -> None:
+        """Run the query."""
+        loop.run_until_complete(
+            manager.get_entity_suggestions(query, domain_filter=domain_filter, limit=10)
+        )
+
+    baseline.check(
+        f"suggest_{kind}[{install.size}]",
+        query_ms=median_ms(suggest, rounds=50),
+    )
+
+
+def test_state_event_throughput(install, manager, baseline):
+    """Measure how many state_changed events the cache absorbs per second."""
+    events = install.state_events(STATE_EVENTS)
+    handle = manager._handle_state_changed
+
+    started = time.perf_counter()
+    for event in events:
+        handle(event)
+    elapsed = time.perf_counter() - started
+
+    baseline.check(
+        f"state_events[{install.size}]",
+        events_per_s=len(events) / elapsed,
+    )
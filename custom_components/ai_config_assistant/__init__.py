@@ -1,5 +1,7 @@
 """AI Configuration Assistant integration for Home Assistant."""
+import asyncio
 import logging
+import os
 import time
 from typing import Any, Dict
 
@@ -14,22 +16,46 @@ from .const import (
     DOMAIN,
     CONF_LLM_PROVIDER,
     CONF_DEFAULT_MODEL,
+    CONF_API_BASE,
+    CONF_FALLBACK_PROVIDERS,
+    CONF_REQUESTS_PER_MINUTE,
+    CONF_TOKENS_PER_MINUTE,
+    CONF_PROMPT_TOKEN_BUDGET,
+    CONF_LOCAL_FAST_PATH,
+    CONF_AUTO_ROUTE_MODELS,
+    CONF_OLLAMA_KEEP_ALIVE,
+    DEFAULT_PROMPT_TOKEN_BUDGET,
+    DEFAULT_AUTO_ROUTE_MODELS,
+    DEFAULT_LOCAL_FAST_PATH,
+    DEFAULT_OLLAMA_KEEP_ALIVE,
+    DEFAULT_REQUESTS_PER_MINUTE,
+    DEFAULT_TOKENS_PER_MINUTE,
+    PRIORITY_NAMES,
+    TASK_MODEL_OPTIONS,
     SERVICE_GENERATE_CONFIG,
     SERVICE_VALIDATE_CONFIG,
+    SERVICE_VALIDATE_BATCH,
+    EVENT_BATCH_ITEM_VALIDATED,
     SERVICE_PREVIEW_CONFIG,
     SERVICE_RELOAD,
     SERVICE_DEPLOY_CONFIG,
     LLM_PROVIDERS,
+    ATTR_CONFIG_ENTRY_ID,
+    ATTR_PROFILE,
 )
+from .cache import GenerationCache, async_migrate_legacy_cache
 from .llm_client import LLMClientManager
+from .metrics import IntegrationMetrics
 from .config_generator import ConfigGenerator
 from .entity_manager import EntityManager
+from .entry_data import get_selected_entry_data, selection_error
 from .api import async_register_api_views
+from .websocket_api import async_register_websocket_commands
 from .panel import async_register_panel
 
 _LOGGER = logging.getLogger(__name__)
 
-PLATFORMS: list[Platform] = []
+PLATFORMS: list[Platform] = [Platform.SENSOR]
 
 CONFIG_SCHEMA = vol.Schema(
     {
@@ -38,6 +64,18 @@ CONFIG_SCHEMA = vol.Schema(
                 vol.Required(CONF_LLM_PROVIDER, default="openai"): vol.In(LLM_PROVIDERS),
                 vol.Required(CONF_API_KEY): cv.string,
                 vol.Optional(CONF_DEFAULT_MODEL): cv.string,
+                vol.Optional(CONF_API_BASE): cv.url,
+                # Further providers in failover order
+                vol.Optional(CONF_FALLBACK_PROVIDERS, default=[]): [
+                    vol.Schema(
+                        {
+                            vol.Required(CONF_LLM_PROVIDER): vol.In(LLM_PROVIDERS),
+                            vol.Optional(CONF_API_KEY, default=""): cv.string,
+                            vol.Optional(CONF_DEFAULT_MODEL): cv.string,
+                            vol.Optional(CONF_API_BASE): cv.url,
+                        }
+                    )
+                ],
             }
         )
     },
@@ -53,74 +91,205 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     return True
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    """Set up AI Config Assistant from a config entry."""
-    # Ensure domain data exists
-    hass.data.setdefault(DOMAIN, {})
-    
-    # Store config entry data
-    hass.data[DOMAIN]["config_entry"] = entry
+    """Set up AI Config Assistant from a config entry.
+
+    Each entry gets its own pipeline, so e.g. a fast local model and a
+    strong cloud model can run side by side. The entity index, services,
+    API views and panel are set up with the first entry and shared.
+    """
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    entries = domain_data.setdefault("entries", {})
     
-    # Initialize core components if not already done
-    if "llm_client" not in hass.data[DOMAIN]:
-        hass.data[DOMAIN]["llm_client"] = LLMClientManager(hass)
-        hass.data[DOMAIN]["config_generator"] = ConfigGenerator(hass)
-        hass.data[DOMAIN]["entity_manager"] = EntityManager(hass)
-        
-        # Initialize entity manager
-        await hass.data[DOMAIN]["entity_manager"].initialize()
-        
-        # Set up config generator
-        hass.data[DOMAIN]["config_generator"].setup(
-            hass.data[DOMAIN]["llm_client"],
-            hass.data[DOMAIN]["entity_manager"]
+    # Initialize shared components if not already done
+    first_entry = "entity_manager" not in domain_data
+    if first_entry:
+        entity_manager = EntityManager(hass)
+        domain_data["entity_manager"] = entity_manager
+        # Index entities once for all entries; each entry's warm-up waits on it
+        domain_data["index_task"] = hass.async_create_background_task(
+            entity_manager.initialize(), f"{DOMAIN} entity index"
         )
+    
+    # Per-entry pipeline: LLM client with its own HTTP session and
+    # rate limits, generation cache, metrics and config generator
+    metrics = IntegrationMetrics()
+    llm_client = LLMClientManager(hass, metrics)
+    generation_cache = GenerationCache(hass, entry_id=entry.entry_id)
+    config_generator = ConfigGenerator(hass)
+    config_generator.setup(
+        llm_client,
+        domain_data["entity_manager"],
+        generation_cache,
+        prompt_token_budget=entry.options.get(
+            CONF_PROMPT_TOKEN_BUDGET, DEFAULT_PROMPT_TOKEN_BUDGET
+        ),
+        local_fast_path=entry.options.get(
+            CONF_LOCAL_FAST_PATH, DEFAULT_LOCAL_FAST_PATH
+        ),
+        metrics=metrics,
+    )
+    entries[entry.entry_id] = {
+        "config_entry": entry,
+        "metrics": metrics,
+        "llm_client": llm_client,
+        "generation_cache": generation_cache,
+        "config_generator": config_generator,
+    }
+    
+    if first_entry:
+        # The cache was shared before entries got their own pipelines;
+        # move it before the warm-up below loads this entry's cache
+        await async_migrate_legacy_cache(hass, entry.entry_id)
         
         # Register services
         await _async_register_services(hass)
         
         # Register API endpoints
         await async_register_api_views(hass)
+        async_register_websocket_commands(hass)
         
         # Register frontend panel
         await async_register_panel(hass)
     
-    # Initialize LLM client with config
-    llm_client = hass.data[DOMAIN]["llm_client"]
-    await llm_client.setup(
-        provider=entry.data[CONF_LLM_PROVIDER],
-        api_key=entry.data[CONF_API_KEY],
-        default_model=entry.data.get(CONF_DEFAULT_MODEL),
+    # Options are only read here and during warm-up; apply changes to
+    # limits, budgets and model routing by reloading the entry
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+    
+    # Performance sensors read the in-memory metrics
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    
+    # Warm up the LLM client and entity index in the background so Home
+    # Assistant's bootstrap never waits on the litellm import or indexing;
+    # generation requests wait on the readiness state instead
+    config_generator.async_set_warming()
+    entries[entry.entry_id]["warm_up_task"] = entry.async_create_background_task(
+        hass,
+        _async_warm_up(hass, entry),
+        f"{DOMAIN} warm-up {entry.title}",
     )
     
-    _LOGGER.info("AI Configuration Assistant integration loaded successfully")
+    _LOGGER.info("AI Configuration Assistant %s loaded, warming up in background", entry.title)
     return True
 
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload a config entry whose options changed."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+async def _async_warm_up(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Configure the entry's LLM client and wait for the entity index."""
+    entry_data = hass.data[DOMAIN]["entries"][entry.entry_id]
+    llm_client = entry_data["llm_client"]
+    config_generator = entry_data["config_generator"]
+    
+    tasks = [
+        llm_client.setup(
+            provider=entry.data[CONF_LLM_PROVIDER],
+            api_key=entry.data[CONF_API_KEY],
+            default_model=entry.data.get(CONF_DEFAULT_MODEL),
+            api_base=entry.data.get(CONF_API_BASE),
+            fallbacks=entry.data.get(CONF_FALLBACK_PROVIDERS, []),
+            requests_per_minute=entry.options.get(
+                CONF_REQUESTS_PER_MINUTE, DEFAULT_REQUESTS_PER_MINUTE
+            ),
+            tokens_per_minute=entry.options.get(
+                CONF_TOKENS_PER_MINUTE, DEFAULT_TOKENS_PER_MINUTE
+            ),
+            task_models={
+                task: entry.options.get(option)
+                for task, option in TASK_MODEL_OPTIONS.items()
+            },
+            auto_route=entry.options.get(
+                CONF_AUTO_ROUTE_MODELS, DEFAULT_AUTO_ROUTE_MODELS
+            ),
+            ollama_keep_alive=entry.options.get(
+                CONF_OLLAMA_KEEP_ALIVE, DEFAULT_OLLAMA_KEEP_ALIVE
+            ),
+        ),
+        entry_data["generation_cache"].async_load(),
+        # Shielded: unloading this entry must not cancel the shared index
+        asyncio.shield(hass.data[DOMAIN]["index_task"]),
+    ]
+    
+    try:
+        await asyncio.gather(*tasks)
+    except Exception as err:
+        _LOGGER.error("AI Configuration Assistant %s warm-up failed: %s", entry.title, err)
+        config_generator.async_set_ready(err)
+        return
+    
+    config_generator.async_set_ready()
+    _LOGGER.info("AI Configuration Assistant %s is ready", entry.title)
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload AI Config Assistant config entry."""
-    # Clean up resources
-    if DOMAIN in hass.data:
-        # Clean up LLM client
-        llm_client = hass.data[DOMAIN].get("llm_client")
-        if llm_client:
-            await llm_client.cleanup()
-        
-        # Remove services
-        if hass.services.has_service(DOMAIN, SERVICE_GENERATE_CONFIG):
-            hass.services.async_remove(DOMAIN, SERVICE_GENERATE_CONFIG)
-        if hass.services.has_service(DOMAIN, SERVICE_VALIDATE_CONFIG):
-            hass.services.async_remove(DOMAIN, SERVICE_VALIDATE_CONFIG)
-        if hass.services.has_service(DOMAIN, SERVICE_PREVIEW_CONFIG):
-            hass.services.async_remove(DOMAIN, SERVICE_PREVIEW_CONFIG)
-        if hass.services.has_service(DOMAIN, SERVICE_RELOAD):
-            hass.services.async_remove(DOMAIN, SERVICE_RELOAD)
+    if not await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
+        return False
+    
+    domain_data = hass.data.get(DOMAIN)
+    if not domain_data:
+        return True
+    
+    # Clean up the entry's pipeline
+    entry_data = domain_data.get("entries", {}).pop(entry.entry_id, None)
+    if entry_data:
+        # Stop a warm-up that is still running
+        warm_up_task = entry_data.get("warm_up_task")
+        if warm_up_task and not warm_up_task.done():
+            warm_up_task.cancel()
         
-        # Clear data
-        hass.data.pop(DOMAIN, None)
+        # Close the LLM client's connections
+        await entry_data["llm_client"].cleanup()
         
-        _LOGGER.info("AI Configuration Assistant integration unloaded")
+        # Persist cached generations before the data is dropped
+        await entry_data["generation_cache"].async_save()
+    
+    if domain_data.get("entries"):
+        _LOGGER.info("AI Configuration Assistant %s unloaded", entry.title)
+        return True
+    
+    # The last entry is gone; stop indexing and remove the shared parts
+    index_task = domain_data.get("index_task")
+    if index_task and not index_task.done():
+        index_task.cancel()
+    
+    # Remove services
+    if hass.services.has_service(DOMAIN, SERVICE_GENERATE_CONFIG):
+        hass.services.async_remove(DOMAIN, SERVICE_GENERATE_CONFIG)
+    if hass.services.has_service(DOMAIN, SERVICE_VALIDATE_CONFIG):
+        hass.services.async_remove(DOMAIN, SERVICE_VALIDATE_CONFIG)
+    if hass.services.has_service(DOMAIN, SERVICE_VALIDATE_BATCH):
+        hass.services.async_remove(DOMAIN, SERVICE_VALIDATE_BATCH)
+    if hass.services.has_service(DOMAIN, SERVICE_PREVIEW_CONFIG):
+        hass.services.async_remove(DOMAIN, SERVICE_PREVIEW_CONFIG)
+    if hass.services.has_service(DOMAIN, SERVICE_RELOAD):
+        hass.services.async_remove(DOMAIN, SERVICE_RELOAD)
     
+    # Clear data
+    hass.data.pop(DOMAIN, None)
+    
+    _LOGGER.info("AI Configuration Assistant integration unloaded")
     return True
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Delete the persisted generation cache of a removed config entry."""
+    await GenerationCache(hass, entry_id=entry.entry_id).async_remove()
+
+def _priority_option(call: ServiceCall) -> Dict[str, Any]:
+    """Return the scheduler priority requested by a service call, if any."""
+    priority = call.data.get("priority")
+    if priority in PRIORITY_NAMES:
+        return {"priority": PRIORITY_NAMES.index(priority)}
+    return {}
+
+def _read_config_file(hass: HomeAssistant, file_name: str) -> str:
+    """Read a YAML file from the configuration directory."""
+    config_dir = os.path.realpath(hass.config.config_dir)
+    path = os.path.realpath(hass.config.path(file_name))
+    if os.path.commonpath([config_dir, path]) != config_dir:
+        raise ValueError(f"{file_name} is outside the configuration directory")
+    with open(path, encoding="utf-8") as file:
+        return file.read()
+
 async def _async_register_services(hass: HomeAssistant) -> None:
     """Register AI Config Assistant services."""
     
@@ -144,15 +313,19 @@ async def _async_register_services(hass: HomeAssistant) -> None:
             }
         
         try:
-            config_generator = hass.data[DOMAIN].get("config_generator")
-            if not config_generator:
-                _LOGGER.error("Config generator not initialized")
-                return {"success": False, "error": "Config generator not initialized"}
+            entry_data = get_selected_entry_data(hass, call.data)
+            if not entry_data:
+                error = selection_error(call.data)
+                _LOGGER.error(error)
+                return {"success": False, "error": error}
+            config_generator = entry_data["config_generator"]
             
             prompt = call.data.get("prompt", "")
             config_type = call.data.get("type", "automation")
             context = call.data.get("context", {})
             include_entities = call.data.get("entities", [])
+            accept_similar = call.data.get("accept_similar", False)
+            options = _priority_option(call)
             
             _LOGGER.info("Generating %s for prompt: %s", config_type, prompt[:50] + "..." if len(prompt) > 50 else prompt)
             
@@ -161,6 +334,8 @@ async def _async_register_services(hass: HomeAssistant) -> None:
                 config_type=config_type,
                 context=context,
                 include_entities=include_entities,
+                accept_similar=accept_similar,
+                **options,
             )
             
             _LOGGER.info("Config generator returned: success=%s", result.success)
@@ -173,6 +348,7 @@ async def _async_register_services(hass: HomeAssistant) -> None:
                     "config": result.config,
                     "explanation": result.explanation,
                     "entities_used": result.entities_used,
+                    "request_id": result.request_id,
                     "error": result.warnings[0] if result.warnings and not result.success else None,
                 },
             )
@@ -181,15 +357,29 @@ async def _async_register_services(hass: HomeAssistant) -> None:
             if result.success:
                 response_data = {
                     "success": True,
+                    "status": config_generator.status,
+                    ATTR_CONFIG_ENTRY_ID: entry_data["config_entry"].entry_id,
                     "config": result.config,
                     "explanation": result.explanation,
                     "entities_used": result.entities_used,
+                    "cached": result.cached,
+                    "warnings": result.warnings,
+                    "prompt_tokens": result.prompt_tokens,
+                    "completion_tokens": result.completion_tokens,
+                    "cached_tokens": result.cached_tokens,
+                    "estimated_cost": result.estimated_cost,
+                    # A pending explanation follows as an
+                    # ai_config_assistant_explanation_ready event
+                    "request_id": result.request_id,
+                    "explanation_pending": result.explanation_pending,
+                    "source": result.source,
                 }
             else:
                 # Make sure to get the most detailed error message
                 error_msg = result.warnings[0] if result.warnings else "Configuration generation failed"
                 response_data = {
                     "success": False,
+                    "status": config_generator.status,
                     "error": error_msg,
                     "warnings": result.warnings,  # Include all warnings for debugging
                 }
@@ -219,21 +409,26 @@ async def _async_register_services(hass: HomeAssistant) -> None:
     
     async def validate_config_service(call: ServiceCall) -> None:
         """Validate a configuration."""
-        config_generator = hass.data[DOMAIN]["config_generator"]
-        
         config_yaml = call.data.get("config", "")
         config_type = call.data.get("type", "automation")
         
         try:
+            entry_data = get_selected_entry_data(hass, call.data)
+            if not entry_data:
+                raise ValueError(selection_error(call.data))
+            config_generator = entry_data["config_generator"]
+            
             result = await config_generator.validate_config(
                 config_yaml=config_yaml,
                 config_type=config_type,
+                **_priority_option(call),
             )
             
             hass.bus.async_fire(
                 "ai_config_assistant_config_validated",
                 {
                     "success": True,
+                    "status": config_generator.status,
                     "valid": result.valid,
                     "errors": result.errors,
                     "warnings": result.warnings,
@@ -250,6 +445,45 @@ async def _async_register_services(hass: HomeAssistant) -> None:
                 },
             )
     
+    async def validate_batch_service(call: ServiceCall) -> ServiceResponse | None:
+        """Validate many configurations, e.g. a whole automations.yaml.
+
+        Each result is fired as an ai_config_assistant_batch_item_validated
+        event as soon as it is ready; all results are also returned.
+        """
+        try:
+            entry_data = get_selected_entry_data(hass, call.data)
+            if not entry_data:
+                raise ValueError(selection_error(call.data))
+            config_generator = entry_data["config_generator"]
+            
+            config_yaml = call.data.get("config", "")
+            if call.data.get("file"):
+                config_yaml = await hass.async_add_executor_job(
+                    _read_config_file, hass, call.data["file"]
+                )
+            
+            results = []
+            summary: Dict[str, Any] = {}
+            async for event in config_generator.async_validate_batch(
+                configs=config_generator.split_configs(config_yaml),
+                config_type=call.data.get("type", "automation"),
+                use_llm=call.data.get("use_llm", True),
+                **_priority_option(call),
+            ):
+                if event["type"] == "item":
+                    hass.bus.async_fire(EVENT_BATCH_ITEM_VALIDATED, event)
+                    results.append(event)
+                else:
+                    summary = event
+            
+            results.sort(key=lambda item: item["index"])
+            return {"success": True, "summary": summary, "results": results}
+            
+        except Exception as err:
+            _LOGGER.error("Error validating configurations: %s", err)
+            return {"success": False, "error": str(err)}
+    
     async def preview_config_service(call: ServiceCall) -> None:
         """Preview a configuration with live data."""
         entity_manager = hass.data[DOMAIN]["entity_manager"]
@@ -362,19 +596,21 @@ async def _async_register_services(hass: HomeAssistant) -> None:
             }
     
     async def reload_service(call: ServiceCall) -> None:
-        """Reload the AI Configuration Assistant integration."""
+        """Reload the selected config entry, or all of them."""
         _LOGGER.info("Reloading AI Configuration Assistant integration...")
         
         try:
-            # Get the config entry
-            config_entry = hass.data[DOMAIN].get("config_entry")
-            if not config_entry:
-                _LOGGER.error("No config entry found for reload")
-                return
+            if call.data.get(ATTR_CONFIG_ENTRY_ID) or call.data.get(ATTR_PROFILE):
+                entry_data = get_selected_entry_data(hass, call.data)
+                if not entry_data:
+                    raise ValueError(selection_error(call.data))
+                entry_ids = [entry_data["config_entry"].entry_id]
+            else:
+                entry_ids = list(hass.data[DOMAIN]["entries"])
             
-            # Unload and reload the integration
-            await async_unload_entry(hass, config_entry)
-            await async_setup_entry(hass, config_entry)
+            # Unload and reload the entries
+            for entry_id in entry_ids:
+                await hass.config_entries.async_reload(entry_id)
             
             _LOGGER.info("AI Configuration Assistant integration reloaded successfully")
             
@@ -401,6 +637,11 @@ async def _async_register_services(hass: HomeAssistant) -> None:
         DOMAIN, SERVICE_VALIDATE_CONFIG, validate_config_service
     )
     
+    hass.services.async_register(
+        DOMAIN, SERVICE_VALIDATE_BATCH, validate_batch_service,
+        supports_response=SupportsResponse.OPTIONAL
+    )
+    
     hass.services.async_register(
         DOMAIN, SERVICE_PREVIEW_CONFIG, preview_config_service
     )
@@ -1,6 +1,7 @@
 """API endpoints for AI Configuration Assistant."""
+import asyncio
 import logging
-from typing import Any, Dict
+from typing import Any, Awaitable, Dict, TypeVar
 import json
 
 from aiohttp import web
@@ -11,10 +12,49 @@ from homeassistant.core import HomeAssistant
 from homeassistant.components.http import HomeAssistantView
 from homeassistant.helpers import config_validation as cv
 
-from .const import DOMAIN
+from .const import ATTR_CONFIG_ENTRY_ID, ATTR_PROFILE, DOMAIN
+from .entry_data import entry_summaries, get_selected_entry_data, selection_error
 
 _LOGGER = logging.getLogger(__name__)
 
+_T = TypeVar("_T")
+
+# Seconds between checks whether the HTTP client is still connected
+_DISCONNECT_POLL_INTERVAL = 0.5
+
+
+class ClientDisconnected(Exception):
+    """The HTTP client went away before the response was ready."""
+
+
+async def _async_cancel_on_disconnect(request: Request, awaitable: Awaitable[_T]) -> _T:
+    """Await ``awaitable``, cancelling it if the HTTP client disconnects.
+
+    aiohttp does not cancel handlers when the client goes away, so the
+    transport is polled while the work runs.
+    """
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=_DISCONNECT_POLL_INTERVAL)
+            if done:
+                return task.result()
+            transport = request.transport
+            if transport is None or transport.is_closing():
+                task.cancel()
+                raise ClientDisconnected
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+
+def _no_entry_response(selection: Any) -> Response:
+    """Return the error response for a request no loaded entry matches."""
+    selected = selection.get(ATTR_CONFIG_ENTRY_ID) or selection.get(ATTR_PROFILE)
+    return web.json_response(
+        {"error": selection_error(selection)}, status=404 if selected else 500
+    )
+
+
 class EntitySuggestionsView(HomeAssistantView):
     """View for entity suggestions API."""
     
@@ -86,26 +126,44 @@ class ConfigGenerationView(HomeAssistantView):
                     {"error": "Prompt is required"}, status=400
                 )
 
-            config_generator = hass.data[DOMAIN].get("config_generator")
-            if not config_generator:
-                return web.json_response(
-                    {"error": "Config generator not available"}, status=500
-                )
-
-            result = await config_generator.generate_config(
-                prompt=prompt,
-                config_type=config_type,
-                context=context
+            entry_data = get_selected_entry_data(hass, data)
+            if not entry_data:
+                return _no_entry_response(data)
+            config_generator = entry_data["config_generator"]
+
+            # Closing the request aborts the provider call and skips the
+            # remaining pipeline stages
+            result = await _async_cancel_on_disconnect(
+                request,
+                config_generator.generate_config(
+                    prompt=prompt,
+                    config_type=config_type,
+                    context=context
+                ),
             )
 
             return web.json_response({
                 "success": result.success,
+                "status": config_generator.status,
+                ATTR_CONFIG_ENTRY_ID: entry_data["config_entry"].entry_id,
                 "config": result.config,
                 "explanation": result.explanation,
                 "entities_used": result.entities_used,
                 "warnings": result.warnings,
+                "cached": result.cached,
+                "prompt_tokens": result.prompt_tokens,
+                "completion_tokens": result.completion_tokens,
+                "cached_tokens": result.cached_tokens,
+                "estimated_cost": result.estimated_cost,
+                "request_id": result.request_id,
+                "explanation_pending": result.explanation_pending,
+                "source": result.source,
             })
 
+        except ClientDisconnected:
+            _LOGGER.debug("Client disconnected, config generation cancelled")
+            return web.Response(status=499)
+
         except Exception as err:
             _LOGGER.error("Error in config generation: %s", err)
             return web.json_response(
@@ -134,15 +192,17 @@ class ConfigValidationView(HomeAssistantView):
                     {"error": "Configuration is required"}, status=400
                 )
 
-            config_generator = hass.data[DOMAIN].get("config_generator")
-            if not config_generator:
-                return web.json_response(
-                    {"error": "Config generator not available"}, status=500
-                )
-
-            result = await config_generator.validate_config(
-                config_yaml=config_yaml,
-                config_type=config_type
+            entry_data = get_selected_entry_data(hass, data)
+            if not entry_data:
+                return _no_entry_response(data)
+            config_generator = entry_data["config_generator"]
+
+            result = await _async_cancel_on_disconnect(
+                request,
+                config_generator.validate_config(
+                    config_yaml=config_yaml,
+                    config_type=config_type
+                ),
             )
 
             return web.json_response({
@@ -152,6 +212,10 @@ class ConfigValidationView(HomeAssistantView):
                 "suggestions": result.suggestions,
             })
 
+        except ClientDisconnected:
+            _LOGGER.debug("Client disconnected, config validation cancelled")
+            return web.Response(status=499)
+
         except Exception as err:
             _LOGGER.error("Error in config validation: %s", err)
             return web.json_response(
@@ -159,6 +223,61 @@ class ConfigValidationView(HomeAssistantView):
             )
 
 
+class BatchValidationView(HomeAssistantView):
+    """View for validating many configurations in one request.
+
+    Results are streamed back as newline-delimited JSON: one line per
+    configuration as soon as it is validated, then a summary line.
+    """
+    
+    url = "/api/ai_config_assistant/validate_batch"
+    name = "api:ai_config_assistant:validate_batch"
+    requires_auth = True
+
+    async def post(self, request: Request) -> web.StreamResponse:
+        """Handle a batch validation request."""
+        hass: HomeAssistant = request.app["hass"]
+        
+        try:
+            data = await request.json()
+        except ValueError:
+            return web.json_response({"error": "Invalid JSON"}, status=400)
+
+        entry_data = get_selected_entry_data(hass, data)
+        if not entry_data:
+            return _no_entry_response(data)
+        config_generator = entry_data["config_generator"]
+
+        # Either a list of configurations or one YAML document listing
+        # them, like automations.yaml
+        configs = data.get("configs")
+        if configs is None:
+            configs = config_generator.split_configs(data.get("config", ""))
+        if not isinstance(configs, list) or not any(str(c).strip() for c in configs):
+            return web.json_response(
+                {"error": "Configurations are required"}, status=400
+            )
+
+        response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+        await response.prepare(request)
+
+        async def _stream_results() -> None:
+            """Write each validation event as one JSON line."""
+            async for event in config_generator.async_validate_batch(
+                configs=[str(config) for config in configs],
+                config_type=data.get("type", "automation"),
+                use_llm=data.get("use_llm", True),
+            ):
+                await response.write(json.dumps(event).encode() + b"\n")
+
+        try:
+            await _async_cancel_on_disconnect(request, _stream_results())
+            await response.write_eof()
+        except (ClientDisconnected, ConnectionResetError):
+            _LOGGER.debug("Client disconnected, batch validation cancelled")
+        return response
+
+
 class ConfigPreviewView(HomeAssistantView):
     """View for config preview API."""
     
@@ -232,7 +351,9 @@ class EntitiesView(HomeAssistantView):
                 entities = await entity_manager.get_entities_by_area(area)
             else:
                 # Return summary information
+                entry_data = get_selected_entry_data(hass, request.query)
                 return web.json_response({
+                    "status": entry_data["config_generator"].status if entry_data else None,
                     "entity_count": entity_manager.entity_count,
                     "last_update": entity_manager.last_update.isoformat() if entity_manager.last_update else None,
                     "domains": list(entity_manager._entities_by_domain.keys()),
@@ -261,14 +382,61 @@ class EntitiesView(HomeAssistantView):
             )
 
 
+class StatusView(HomeAssistantView):
+    """View for integration readiness status."""
+    
+    url = "/api/ai_config_assistant/status"
+    name = "api:ai_config_assistant:status"
+    requires_auth = True
+
+    async def get(self, request: Request) -> Response:
+        """Return whether the assistant is warming up, ready or failed.
+
+        The details are those of the selected entry; ``entries`` lists
+        every loaded entry with its status.
+        """
+        hass: HomeAssistant = request.app["hass"]
+        
+        entry_data = get_selected_entry_data(hass, request.query)
+        if not entry_data:
+            return _no_entry_response(request.query)
+
+        config_generator = entry_data["config_generator"]
+        llm_client = entry_data["llm_client"]
+        entity_manager = hass.data[DOMAIN].get("entity_manager")
+        generation_cache = entry_data["generation_cache"]
+        metrics = entry_data["metrics"]
+        return web.json_response({
+            "status": config_generator.status,
+            ATTR_CONFIG_ENTRY_ID: entry_data["config_entry"].entry_id,
+            ATTR_PROFILE: entry_data["config_entry"].title,
+            "entries": entry_summaries(hass),
+            "provider": llm_client.provider if llm_client else None,
+            "model": llm_client.default_model if llm_client else None,
+            "entity_count": entity_manager.entity_count if entity_manager else 0,
+            "cache": generation_cache.stats if generation_cache else None,
+            "circuits": llm_client.circuit_states if llm_client else {},
+            "latency": llm_client.provider_stats if llm_client else None,
+            "tasks": llm_client.task_stats if llm_client else None,
+            "scheduler": llm_client.scheduler_stats if llm_client else None,
+            "metrics": metrics.as_dict() if metrics else None,
+            "coalesced_calls": {
+                "generation": config_generator.coalesced_calls,
+                "completion": llm_client.coalesced_calls if llm_client else 0,
+            },
+        })
+
+
 async def async_register_api_views(hass: HomeAssistant) -> None:
     """Register API views."""
     try:
         hass.http.register_view(EntitySuggestionsView())
         hass.http.register_view(ConfigGenerationView())
         hass.http.register_view(ConfigValidationView())
+        hass.http.register_view(BatchValidationView())
         hass.http.register_view(ConfigPreviewView())
         hass.http.register_view(EntitiesView())
+        hass.http.register_view(StatusView())
         
         _LOGGER.info("AI Configuration Assistant API views registered")
         
@@ -0,0 +1,387 @@
+"""Generation response cache for AI Configuration Assistant."""
+import hashlib
+import json
+import logging
+import random
+import re
+import time
+import zlib
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    CACHE_SAVE_DELAY,
+    CACHE_STORAGE_KEY,
+    CACHE_STORAGE_VERSION,
+    DEFAULT_CACHE_MAX_ENTRIES,
+    DEFAULT_CACHE_TTL,
+    DEFAULT_SIMILARITY_THRESHOLD,
+    MINHASH_BANDS,
+    MINHASH_PERMUTATIONS,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+# Filler words that carry no meaning for matching prompts
+_STOP_WORDS = frozenset({
+    "a", "an", "the", "please", "can", "could", "would", "you", "i", "me",
+    "my", "to", "and", "of", "for",
+})
+
+# Words that flip the meaning of a prompt; "don't" splits into "don" and "t"
+_POLARITY_WORDS = frozenset({
+    "on", "off", "open", "opened", "close", "closed", "lock", "locked",
+    "unlock", "unlocked", "arm", "armed", "disarm", "disarmed", "start",
+    "started", "stop", "stopped", "before", "after", "above", "below",
+    "enable", "enabled", "disable", "disabled", "not", "no", "don", "dont",
+    "never",
+})
+
+_MERSENNE_PRIME = (1 << 61) - 1
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Normalize a prompt so trivially different spellings share a key."""
+    return " ".join(prompt.lower().split())
+
+
+def context_fingerprint(context: Dict[str, Any]) -> str:
+    """Hash the parts of a generation context that end up in the prompt.
+
+    The current time is left out and entity states are reduced to their
+    state value, so the key only changes when the prompt would.
+    """
+    relevant = {
+        key: sorted(value) if isinstance(value, set) else value
+        for key, value in context.items()
+        if key not in ("current_time", "current_states")
+    }
+    relevant["current_states"] = {
+        entity_id: state_data.get("state")
+        for entity_id, state_data in context.get("current_states", {}).items()
+    }
+    encoded = json.dumps(relevant, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def prompt_shingles(prompt: str) -> FrozenSet[str]:
+    """Return the normalized word set used to compare prompts.
+
+    Words are lowercased, plurals are crudely stemmed and filler words
+    dropped, so rephrasings like "turn on kitchen lights at sunset" and
+    "kitchen lights on at sunset" share almost all shingles.
+    """
+    words = (
+        word[:-1] if len(word) > 3 and word.endswith("s") else word
+        for word in _WORD_RE.findall(prompt.lower())
+    )
+    return frozenset(word for word in words if word not in _STOP_WORDS)
+
+
+def _numbers(shingles: Iterable[str]) -> FrozenSet[str]:
+    """Return the shingles containing digits (times, levels, durations)."""
+    return frozenset(s for s in shingles if any(c.isdigit() for c in s))
+
+
+def _polarity(shingles: Iterable[str]) -> FrozenSet[str]:
+    """Return the shingles that flip a prompt's meaning (on/off, before/after, not)."""
+    return frozenset(s for s in shingles if s in _POLARITY_WORDS)
+
+
+class SimilarPromptIndex:
+    """MinHash/LSH index for finding previously seen near-duplicate prompts.
+
+    Signatures are split into bands; prompts sharing any band bucket for the
+    same config type become candidates, which are then checked with exact
+    Jaccard similarity. A miss costs one signature and a few dict lookups.
+    """
+
+    def __init__(
+        self,
+        num_perm: int = MINHASH_PERMUTATIONS,
+        bands: int = MINHASH_BANDS,
+    ) -> None:
+        """Initialize the index."""
+        self._rows = num_perm // bands
+        self._bands = bands
+        # Fixed seed so signatures are stable across restarts
+        rng = random.Random(0x5EED)
+        self._perms = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+        self._buckets: Dict[Tuple[str, int, Tuple[int, ...]], Set[str]] = defaultdict(set)
+        self._items: Dict[str, Tuple[str, FrozenSet[str], List[Tuple[int, ...]], FrozenSet[str]]] = {}
+
+    def _band_keys(self, shingles: FrozenSet[str]) -> List[Tuple[int, ...]]:
+        """Compute the MinHash signature of a shingle set, split into bands."""
+        hashes = [zlib.crc32(s.encode("utf-8")) for s in shingles] or [0]
+        signature = [
+            min((a * h + b) % _MERSENNE_PRIME for h in hashes)
+            for a, b in self._perms
+        ]
+        return [
+            tuple(signature[i * self._rows:(i + 1) * self._rows])
+            for i in range(self._bands)
+        ]
+
+    def add(
+        self, key: str, prompt: str, config_type: str, entities: Iterable[str]
+    ) -> None:
+        """Index a prompt under its cache key."""
+        self.remove(key)
+        shingles = prompt_shingles(prompt)
+        bands = self._band_keys(shingles)
+        self._items[key] = (config_type, shingles, bands, frozenset(entities))
+        for i, band in enumerate(bands):
+            self._buckets[(config_type, i, band)].add(key)
+
+    def remove(self, key: str) -> None:
+        """Remove a prompt from the index."""
+        item = self._items.pop(key, None)
+        if item is None:
+            return
+        config_type, _, bands, _ = item
+        for i, band in enumerate(bands):
+            bucket_key = (config_type, i, band)
+            bucket = self._buckets.get(bucket_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[bucket_key]
+
+    def find(
+        self,
+        prompt: str,
+        config_type: str,
+        entities: Iterable[str],
+        threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+    ) -> Optional[Tuple[str, float]]:
+        """Return the key and similarity of the closest matching prompt.
+
+        A match must reference exactly the same entities and numbers and
+        agree on words that flip the meaning, so "at 7pm" never matches
+        "at 8pm" and "turn on" never matches "turn off".
+        """
+        if not self._items:
+            return None
+
+        shingles = prompt_shingles(prompt)
+        entity_set = frozenset(entities)
+        candidates: Set[str] = set()
+        for i, band in enumerate(self._band_keys(shingles)):
+            candidates |= self._buckets.get((config_type, i, band), set())
+
+        best: Optional[Tuple[str, float]] = None
+        for key in candidates:
+            _, other, _, other_entities = self._items[key]
+            if (
+                other_entities != entity_set
+                or _numbers(other) != _numbers(shingles)
+                or _polarity(other) != _polarity(shingles)
+            ):
+                continue
+            similarity = len(shingles & other) / len(shingles | other) if shingles | other else 1.0
+            if similarity >= threshold and (best is None or similarity > best[1]):
+                best = (key, similarity)
+        return best
+
+
+def _storage_key(entry_id: Optional[str]) -> str:
+    """Return the storage key of a config entry's cache."""
+    return f"{CACHE_STORAGE_KEY}.{entry_id}" if entry_id else CACHE_STORAGE_KEY
+
+
+async def async_migrate_legacy_cache(hass: HomeAssistant, entry_id: str) -> None:
+    """Hand the cache stored before caches were kept per entry to an entry.
+
+    The entry keeps its own cache if it already has one; the legacy
+    store is removed either way.
+    """
+    legacy_store: Store = Store(hass, CACHE_STORAGE_VERSION, CACHE_STORAGE_KEY)
+    data = await legacy_store.async_load()
+    if data is None:
+        return
+
+    store: Store = Store(hass, CACHE_STORAGE_VERSION, _storage_key(entry_id))
+    if await store.async_load() is None:
+        await store.async_save(data)
+        _LOGGER.info("Moved the generation cache to config entry %s", entry_id)
+    await legacy_store.async_remove()
+
+
+class GenerationCache:
+    """LRU cache of successful generation results with TTL eviction.
+
+    Entries are persisted with Home Assistant's storage helper so they
+    survive restarts. Each config entry keeps its own cache under a
+    storage key ending in its entry ID.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        max_entries: int = DEFAULT_CACHE_MAX_ENTRIES,
+        ttl: float = DEFAULT_CACHE_TTL,
+        entry_id: Optional[str] = None,
+    ) -> None:
+        """Initialize the cache."""
+        self.hass = hass
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._store: Store = Store(hass, CACHE_STORAGE_VERSION, _storage_key(entry_id))
+        self._similar_index = SimilarPromptIndex()
+        self.hits = 0
+        self.misses = 0
+        self.similar_hits = 0
+
+    @staticmethod
+    def make_key(
+        prompt: str, config_type: str, model: Optional[str], fingerprint: str
+    ) -> str:
+        """Build the cache key for a generation request."""
+        raw = "\x1f".join(
+            (normalize_prompt(prompt), config_type, model or "", fingerprint)
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    async def async_load(self) -> None:
+        """Load persisted entries, dropping any that have expired."""
+        data = await self._store.async_load()
+        if not data:
+            return
+
+        now = time.time()
+        for key, entry in data.get("entries", []):
+            if now - entry["created"] < self._ttl:
+                self._entries[key] = entry
+                self._index(key, entry)
+        self._evict(now)
+        _LOGGER.debug("Loaded %d cached generation results", len(self._entries))
+
+    @callback
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a cached result, or None on a miss."""
+        entry = self._entries.get(key)
+        if entry is None or time.time() - entry["created"] >= self._ttl:
+            if entry is not None:
+                self._remove(key)
+                self._schedule_save()
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry["result"]
+
+    @callback
+    def find_similar(
+        self, prompt: str, config_type: str, entities: Iterable[str]
+    ) -> Optional[Tuple[Dict[str, Any], float]]:
+        """Return a result cached for a near-duplicate prompt and its similarity."""
+        match = self._similar_index.find(prompt, config_type, entities)
+        if match is None:
+            return None
+
+        key, similarity = match
+        entry = self._entries.get(key)
+        if entry is None or time.time() - entry["created"] >= self._ttl:
+            return None
+        self.similar_hits += 1
+        return entry["result"], similarity
+
+    @callback
+    def set(
+        self,
+        key: str,
+        result: Dict[str, Any],
+        prompt: Optional[str] = None,
+        config_type: Optional[str] = None,
+        entities: Optional[Iterable[str]] = None,
+    ) -> None:
+        """Store a result, evicting the least recently used entries.
+
+        When the prompt is given, the entry is also indexed for
+        near-duplicate lookups.
+        """
+        entry = {"created": time.time(), "result": result}
+        if prompt is not None and config_type is not None:
+            entry["prompt"] = prompt
+            entry["config_type"] = config_type
+            entry["entities"] = sorted(entities or [])
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        self._index(key, entry)
+        self._evict(time.time())
+        self._schedule_save()
+
+    @callback
+    def update(self, key: str, **fields: Any) -> None:
+        """Update fields of a cached result, e.g. a late explanation."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        entry["result"] = {**entry["result"], **fields}
+        self._schedule_save()
+
+    @callback
+    def _index(self, key: str, entry: Dict[str, Any]) -> None:
+        """Add an entry to the near-duplicate index if it carries its prompt."""
+        if "prompt" in entry:
+            self._similar_index.add(
+                key, entry["prompt"], entry["config_type"], entry["entities"]
+            )
+
+    @callback
+    def _remove(self, key: str) -> None:
+        """Remove an entry from the cache and the near-duplicate index."""
+        self._entries.pop(key, None)
+        self._similar_index.remove(key)
+
+    @callback
+    def _evict(self, now: float) -> None:
+        """Drop expired entries, then the oldest ones above the size limit."""
+        expired = [
+            key for key, entry in self._entries.items()
+            if now - entry["created"] >= self._ttl
+        ]
+        for key in expired:
+            self._remove(key)
+        while len(self._entries) > self._max_entries:
+            self._remove(next(iter(self._entries)))
+
+    @callback
+    def _schedule_save(self) -> None:
+        """Persist the cache after a quiet period."""
+        self._store.async_delay_save(self._data_to_save, CACHE_SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> Dict[str, Any]:
+        """Return the data to persist, oldest entry first."""
+        return {"entries": list(self._entries.items())}
+
+    async def async_save(self) -> None:
+        """Persist the cache immediately."""
+        await self._store.async_save(self._data_to_save())
+
+    async def async_remove(self) -> None:
+        """Delete the persisted cache."""
+        await self._store.async_remove()
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Return cache size and hit/miss counters."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "similar_hits": self.similar_hits,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
@@ -4,7 +4,7 @@ from typing import Any, Dict, Optional
 
 import voluptuous as vol
 from homeassistant import config_entries
-from homeassistant.const import CONF_API_KEY
+from homeassistant.const import CONF_API_KEY, CONF_NAME
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
@@ -13,12 +13,31 @@ from .const import (
     DOMAIN,
     CONF_LLM_PROVIDER,
     CONF_DEFAULT_MODEL,
+    CONF_API_BASE,
+    CONF_FALLBACK_PROVIDERS,
+    CONF_FALLBACK_PROVIDER,
+    CONF_FALLBACK_API_KEY,
+    CONF_FALLBACK_MODEL,
     CONF_TEMPERATURE,
     CONF_MAX_TOKENS,
+    CONF_REQUESTS_PER_MINUTE,
+    CONF_TOKENS_PER_MINUTE,
+    CONF_PROMPT_TOKEN_BUDGET,
+    CONF_LOCAL_FAST_PATH,
+    CONF_AUTO_ROUTE_MODELS,
+    CONF_OLLAMA_KEEP_ALIVE,
     LLM_PROVIDERS,
     DEFAULT_MODELS,
     DEFAULT_TEMPERATURE,
     DEFAULT_MAX_TOKENS,
+    DEFAULT_REQUESTS_PER_MINUTE,
+    DEFAULT_TOKENS_PER_MINUTE,
+    DEFAULT_PROMPT_TOKEN_BUDGET,
+    DEFAULT_LOCAL_FAST_PATH,
+    DEFAULT_AUTO_ROUTE_MODELS,
+    DEFAULT_OLLAMA_KEEP_ALIVE,
+    KEYLESS_PROVIDERS,
+    TASK_MODEL_OPTIONS,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -42,8 +61,15 @@ class AIConfigAssistantConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             # Validate the provider selection
             provider = user_input[CONF_LLM_PROVIDER]
             api_key = user_input[CONF_API_KEY]
+            name = user_input.get(CONF_NAME, "").strip()
 
-            if not api_key.strip():
+            # Services and API requests select entries by this name
+            if name and any(
+                entry.title.casefold() == name.casefold()
+                for entry in self._async_current_entries()
+            ):
+                errors[CONF_NAME] = "name_exists"
+            elif not api_key.strip() and provider not in KEYLESS_PROVIDERS:
                 errors[CONF_API_KEY] = "api_key_required"
             else:
                 # Test the API key
@@ -63,7 +89,8 @@ class AIConfigAssistantConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             step_id="user",
             data_schema=vol.Schema({
                 vol.Required(CONF_LLM_PROVIDER, default="openai"): vol.In(LLM_PROVIDERS),
-                vol.Required(CONF_API_KEY): str,
+                vol.Optional(CONF_API_KEY, default=""): str,
+                vol.Optional(CONF_NAME, default=""): str,
             }),
             errors=errors,
         )
@@ -81,10 +108,7 @@ class AIConfigAssistantConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 provider = self.data[CONF_LLM_PROVIDER]
                 self.data[CONF_DEFAULT_MODEL] = DEFAULT_MODELS.get(provider)
 
-            return self.async_create_entry(
-                title=f"AI Config Assistant ({self.data[CONF_LLM_PROVIDER]})",
-                data=self.data,
-            )
+            return await self.async_step_fallback()
 
         provider = self.data[CONF_LLM_PROVIDER]
         default_model = DEFAULT_MODELS.get(provider, "")
@@ -93,6 +117,7 @@ class AIConfigAssistantConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             step_id="advanced",
             data_schema=vol.Schema({
                 vol.Optional(CONF_DEFAULT_MODEL, default=default_model): str,
+                vol.Optional(CONF_API_BASE): str,
                 vol.Optional(CONF_TEMPERATURE, default=DEFAULT_TEMPERATURE): vol.All(
                     vol.Coerce(float), vol.Range(min=0.0, max=2.0)
                 ),
@@ -102,6 +127,52 @@ class AIConfigAssistantConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             }),
         )
 
+    async def async_step_fallback(
+        self, user_input: Optional[Dict[str, Any]] = None
+    ) -> FlowResult:
+        """Handle the optional fallback provider."""
+        errors = {}
+
+        if user_input is not None:
+            fallbacks = []
+            fallback_provider = user_input.get(CONF_FALLBACK_PROVIDER)
+            if fallback_provider:
+                fallback_key = user_input.get(CONF_FALLBACK_API_KEY, "")
+                if fallback_provider not in KEYLESS_PROVIDERS and not await self._test_api_key(
+                    fallback_provider, fallback_key
+                ):
+                    errors[CONF_FALLBACK_API_KEY] = "invalid_api_key"
+                else:
+                    fallbacks.append({
+                        CONF_LLM_PROVIDER: fallback_provider,
+                        CONF_API_KEY: fallback_key,
+                        CONF_DEFAULT_MODEL: user_input.get(CONF_FALLBACK_MODEL)
+                        or DEFAULT_MODELS.get(fallback_provider),
+                    })
+
+            if not errors:
+                self.data[CONF_FALLBACK_PROVIDERS] = fallbacks
+                name = self.data.pop(CONF_NAME, "").strip()
+                return self.async_create_entry(
+                    title=name or f"AI Config Assistant ({self.data[CONF_LLM_PROVIDER]})",
+                    data=self.data,
+                )
+
+        providers = [
+            provider for provider in LLM_PROVIDERS
+            if provider != self.data[CONF_LLM_PROVIDER]
+        ]
+
+        return self.async_show_form(
+            step_id="fallback",
+            data_schema=vol.Schema({
+                vol.Optional(CONF_FALLBACK_PROVIDER): vol.In(providers),
+                vol.Optional(CONF_FALLBACK_API_KEY): str,
+                vol.Optional(CONF_FALLBACK_MODEL): str,
+            }),
+            errors=errors,
+        )
+
     async def _test_api_key(self, provider: str, api_key: str) -> bool:
         """Test the API key for the specified provider."""
         # For now, we'll just do basic validation and skip API testing
@@ -110,6 +181,9 @@ class AIConfigAssistantConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         
         _LOGGER.info("Validating API key format for provider %s", provider)
         
+        if provider in KEYLESS_PROVIDERS:
+            return True
+        
         # Basic validation - just check if the key looks reasonable
         if not api_key or len(api_key.strip()) < 10:
             _LOGGER.warning("API key appears too short for provider %s", provider)
@@ -161,6 +235,31 @@ class AIConfigAssistantOptionsFlowHandler(config_entries.OptionsFlow):
             CONF_MAX_TOKENS,
             self.config_entry.data.get(CONF_MAX_TOKENS, DEFAULT_MAX_TOKENS)
         )
+        current_rpm = self.config_entry.options.get(
+            CONF_REQUESTS_PER_MINUTE, DEFAULT_REQUESTS_PER_MINUTE
+        )
+        current_tpm = self.config_entry.options.get(
+            CONF_TOKENS_PER_MINUTE, DEFAULT_TOKENS_PER_MINUTE
+        )
+        current_budget = self.config_entry.options.get(
+            CONF_PROMPT_TOKEN_BUDGET, DEFAULT_PROMPT_TOKEN_BUDGET
+        )
+        current_fast_path = self.config_entry.options.get(
+            CONF_LOCAL_FAST_PATH, DEFAULT_LOCAL_FAST_PATH
+        )
+        current_auto_route = self.config_entry.options.get(
+            CONF_AUTO_ROUTE_MODELS, DEFAULT_AUTO_ROUTE_MODELS
+        )
+        current_keep_alive = self.config_entry.options.get(
+            CONF_OLLAMA_KEEP_ALIVE, DEFAULT_OLLAMA_KEEP_ALIVE
+        )
+        # Per-task models; left empty, the task uses the default model
+        task_model_fields = {
+            vol.Optional(
+                option, default=self.config_entry.options.get(option, "")
+            ): str
+            for option in TASK_MODEL_OPTIONS.values()
+        }
 
         return self.async_show_form(
             step_id="init",
@@ -171,5 +270,20 @@ class AIConfigAssistantOptionsFlowHandler(config_entries.OptionsFlow):
                 vol.Optional(CONF_MAX_TOKENS, default=current_max_tokens): vol.All(
                     vol.Coerce(int), vol.Range(min=100, max=4000)
                 ),
+                vol.Optional(CONF_REQUESTS_PER_MINUTE, default=current_rpm): vol.All(
+                    vol.Coerce(int), vol.Range(min=1)
+                ),
+                vol.Optional(CONF_TOKENS_PER_MINUTE, default=current_tpm): vol.All(
+                    vol.Coerce(int), vol.Range(min=1000)
+                ),
+                vol.Optional(CONF_PROMPT_TOKEN_BUDGET, default=current_budget): vol.All(
+                    vol.Coerce(int), vol.Range(min=500, max=100000)
+                ),
+                vol.Optional(CONF_LOCAL_FAST_PATH, default=current_fast_path): bool,
+                **task_model_fields,
+                vol.Optional(CONF_AUTO_ROUTE_MODELS, default=current_auto_route): bool,
+                vol.Optional(CONF_OLLAMA_KEEP_ALIVE, default=current_keep_alive): vol.All(
+                    vol.Coerce(int), vol.Range(min=-1)
+                ),
             }),
         )
\ No newline at end of file
@@ -1,24 +1,55 @@
 """Configuration generator for AI Configuration Assistant."""
+import asyncio
 import logging
-from typing import Any, Dict, List, Optional, Set
-from dataclasses import dataclass
+import time
+from typing import Any, AsyncIterator, Awaitable, Dict, List, Optional, Set, Tuple
+from dataclasses import asdict, dataclass
 import yaml
 import json
 from datetime import datetime
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.template import Template
 from homeassistant.util import dt as dt_util
+from homeassistant.util.ulid import ulid_now
 
 from .const import (
     AUTOMATION_PROMPT,
+    BATCH_VALIDATION_CONCURRENCY,
+    BATCH_VALIDATION_MAX_ITEMS,
+    BATCH_VALIDATION_MAX_TOKENS,
     DASHBOARD_PROMPT,
     SCRIPT_PROMPT,
     CONFIG_TYPES,
+    DOMAIN,
+    EVENT_EXPLANATION_READY,
+    DEFAULT_LOCAL_FAST_PATH,
+    DEFAULT_PROMPT_TOKEN_BUDGET,
+    DEFAULT_WARMUP_TIMEOUT,
+    EXPLANATION_MARKER,
+    PRIORITY_BACKGROUND,
+    REQUEST_PROMPT,
+    RESPONSE_FORMAT,
+    SOURCE_FAST_PATH,
+    SOURCE_LLM,
+    STAGE_LLM,
+    STAGE_POST_PROCESS,
+    STAGE_PREPARE,
+    STAGE_TOTAL,
+    STATUS_ERROR,
+    STATUS_READY,
+    STATUS_WARMING,
+    TASK_GENERATE,
+    TASK_VALIDATE,
 )
-from .llm_client import LLMClientManager, LLMMessage
+from .cache import GenerationCache, context_fingerprint, prompt_shingles
+from .llm_client import LLMClientManager, LLMMessage, LLMResponse
+from .metrics import IntegrationMetrics
+from .prompt_builder import PromptPlan, build_budgeted_prompt, count_tokens, estimate_cost
+from .single_flight import SingleFlight, request_key
 from .entity_manager import EntityManager
+from .fast_path import FastPathGenerator
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -30,6 +61,14 @@ class GenerationResult:
     entities_used: List[str]
     warnings: List[str]
     success: bool
+    cached: bool = False
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    cached_tokens: Optional[int] = None
+    estimated_cost: Optional[float] = None
+    request_id: Optional[str] = None
+    explanation_pending: bool = False
+    source: str = SOURCE_LLM
 
 @dataclass
 class ValidationResult:
@@ -47,15 +86,71 @@ class ConfigGenerator:
         self.hass = hass
         self._llm_client: Optional[LLMClientManager] = None
         self._entity_manager: Optional[EntityManager] = None
+        self._cache: Optional[GenerationCache] = None
+        self._fast_path: Optional[FastPathGenerator] = None
+        self._metrics = IntegrationMetrics()
+        # Identical generation requests in flight share one LLM call
+        self._in_flight: SingleFlight[GenerationResult] = SingleFlight()
+        # Explanations still being generated, by request ID
+        self._pending_explanations: Dict[str, asyncio.Task] = {}
+        # Resolved once the LLM client and entity index have warmed up
+        self._ready: asyncio.Future = hass.loop.create_future()
 
     def setup(
         self, 
         llm_client: LLMClientManager, 
-        entity_manager: EntityManager
+        entity_manager: EntityManager,
+        cache: Optional[GenerationCache] = None,
+        prompt_token_budget: int = DEFAULT_PROMPT_TOKEN_BUDGET,
+        local_fast_path: bool = DEFAULT_LOCAL_FAST_PATH,
+        metrics: Optional[IntegrationMetrics] = None,
     ) -> None:
         """Set up the configuration generator."""
         self._llm_client = llm_client
         self._entity_manager = entity_manager
+        self._cache = cache
+        if metrics is not None:
+            self._metrics = metrics
+        self._prompt_token_budget = prompt_token_budget
+        if local_fast_path:
+            self._fast_path = FastPathGenerator(self.hass, entity_manager)
+
+    @callback
+    def async_set_warming(self) -> None:
+        """Mark the generator as warming up again, e.g. before a reconfigure."""
+        if self._ready.done():
+            self._ready = self.hass.loop.create_future()
+
+    @callback
+    def async_set_ready(self, err: Optional[Exception] = None) -> None:
+        """Resolve the readiness state, with the warm-up error if it failed."""
+        if self._ready.done():
+            return
+        if err is None:
+            self._ready.set_result(None)
+        else:
+            self._ready.set_exception(err)
+            # Mark the exception as retrieved; callers re-raise it on demand
+            self._ready.exception()
+
+    async def async_wait_ready(self, timeout: Optional[float] = DEFAULT_WARMUP_TIMEOUT) -> None:
+        """Wait for warm-up to finish, re-raising its error if it failed."""
+        # Shield the shared future so a cancelled caller does not cancel it
+        await asyncio.wait_for(asyncio.shield(self._ready), timeout)
+
+    @property
+    def coalesced_calls(self) -> int:
+        """Return how many generation requests joined one already in flight."""
+        return self._in_flight.coalesced
+
+    @property
+    def status(self) -> str:
+        """Return the readiness status: warming, ready or error."""
+        if not self._ready.done():
+            return STATUS_WARMING
+        if self._ready.exception() is not None:
+            return STATUS_ERROR
+        return STATUS_READY
 
     async def generate_config(
         self,
@@ -63,72 +158,477 @@ class ConfigGenerator:
         config_type: str,
         context: Optional[Dict[str, Any]] = None,
         include_entities: Optional[List[str]] = None,
+        accept_similar: bool = False,
         **kwargs
     ) -> GenerationResult:
-        """Generate a configuration based on a natural language prompt."""
-        try:
-            if not self._llm_client or not self._llm_client.is_configured:
-                raise RuntimeError("LLM client not configured")
+        """Generate a configuration based on a natural language prompt.
 
-            if not self._entity_manager:
-                raise RuntimeError("Entity manager not initialized")
+        Simple automation requests are answered by the rule-based fast path
+        without calling the LLM; the result's ``source`` tells which path
+        produced it. With ``accept_similar`` a result cached for a
+        near-duplicate prompt referencing the same entities is returned
+        instead of calling the LLM. Concurrent identical requests are
+        answered by a single generation.
+        """
+        key = request_key(
+            " ".join(prompt.lower().split()),
+            config_type,
+            context,
+            sorted(include_entities or []),
+            accept_similar,
+            kwargs,
+        )
+        return await self._in_flight.run(
+            key,
+            lambda: self._measure(
+                self._generate_config(
+                    prompt, config_type, context, include_entities, accept_similar, **kwargs
+                )
+            ),
+        )
 
-            # Get entity suggestions if entities are mentioned in the prompt
-            suggested_entities = await self._extract_entities_from_prompt(prompt)
-            if include_entities:
-                suggested_entities.extend(include_entities)
+    async def _measure(self, generation: Awaitable[GenerationResult]) -> GenerationResult:
+        """Time a generation request and count its outcome."""
+        with self._metrics.time_stage(STAGE_TOTAL):
+            result = await generation
+        self._metrics.record_request(result.success)
+        return result
 
-            # Build context with entity information
-            generation_context = await self._build_generation_context(
-                prompt, config_type, suggested_entities, context
-            )
+    async def _generate_config(
+        self,
+        prompt: str,
+        config_type: str,
+        context: Optional[Dict[str, Any]],
+        include_entities: Optional[List[str]],
+        accept_similar: bool,
+        **kwargs
+    ) -> GenerationResult:
+        """Run the generation pipeline for one request."""
+        try:
+            # The first requests after startup wait for the warm-up
+            try:
+                await self.async_wait_ready()
+            except asyncio.TimeoutError:
+                return self._warming_result()
 
-            # Select appropriate prompt template
-            system_prompt = self._get_system_prompt(config_type, generation_context)
+            fast_result = await self._fast_path_result(prompt, config_type, include_entities)
+            if fast_result:
+                return fast_result
+
+            with self._metrics.time_stage(STAGE_PREPARE):
+                suggested_entities, plan, cache_key, model = await self._prepare_generation(
+                    prompt, config_type, context, include_entities, kwargs.get("model")
+                )
+            # The model the prompt was budgeted and cached for
+            kwargs["model"] = model
+
+            # Identical requests are answered from the cache
+            cached_result = self._get_cached_result(cache_key)
+            if cached_result:
+                return cached_result
+            if accept_similar:
+                similar = self._get_similar_result(prompt, config_type, suggested_entities)
+                if similar:
+                    return similar[0]
 
             # Generate the configuration
-            response = await self._llm_client.generate_config(
-                prompt=prompt,
-                system_prompt=system_prompt,
-                **kwargs
-            )
+            with self._metrics.time_stage(STAGE_LLM):
+                response = await self._llm_client.generate_config(
+                    prompt=plan.request,
+                    system_prompt=plan.text,
+                    **kwargs
+                )
 
             # Post-process the generated configuration
-            processed_result = await self._post_process_config(
-                response.content, config_type, suggested_entities
-            )
+            with self._metrics.time_stage(STAGE_POST_PROCESS):
+                processed_result = await self._post_process_config(
+                    response.content, config_type, suggested_entities
+                )
 
-            return GenerationResult(
+            result = GenerationResult(
                 config=processed_result["config"],
                 explanation=processed_result["explanation"],
                 entities_used=processed_result["entities_used"],
-                warnings=processed_result["warnings"],
-                success=True
+                warnings=processed_result["warnings"] + self._budget_warnings(plan),
+                success=True,
+                **self._usage(response, plan),
+                request_id=ulid_now(),
+                explanation_pending=processed_result["explanation_pending"],
             )
+            if processed_result["parsed"]:
+                self._cache_result(
+                    cache_key, result, prompt, config_type, suggested_entities
+                )
+            self._defer_explanation(result, config_type, cache_key)
+            return result
+
+        except asyncio.CancelledError:
+            # The caller went away; later stages, like the explanation
+            # request, are never started
+            _LOGGER.debug("Configuration generation cancelled")
+            raise
 
         except Exception as err:
-            error_msg = str(err)
             _LOGGER.error("Error generating configuration: %s", err)
-            
-            # Check for specific LLM errors and provide better messages
-            if "RateLimitError" in error_msg or "quota" in error_msg.lower():
-                user_friendly_error = "⚠️ OpenAI API quota exceeded. Please check your billing details at https://platform.openai.com/account/billing"
-            elif "AuthenticationError" in error_msg or "api_key" in error_msg.lower():
-                user_friendly_error = "🔑 API key invalid or missing. Please reconfigure your LLM provider in the integration settings."
-            elif "TimeoutError" in error_msg or "timeout" in error_msg.lower():
-                user_friendly_error = "⏱️ Request timed out. The AI service may be overloaded. Please try again."
-            elif "NetworkError" in error_msg or "connection" in error_msg.lower():
-                user_friendly_error = "🌐 Network connection failed. Please check your internet connection."
+            return self._error_result(err)
+
+    async def async_generate_config_stream(
+        self,
+        prompt: str,
+        config_type: str,
+        context: Optional[Dict[str, Any]] = None,
+        include_entities: Optional[List[str]] = None,
+        **kwargs
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Generate a configuration, yielding progress events as they happen.
+
+        Events are dicts with a ``type`` of ``stage`` (pipeline progress),
+        ``candidate`` (a result cached for a near-duplicate prompt, offered
+        while the fresh one is generated), ``token`` (a chunk of generated
+        text) or ``result`` (the final ``GenerationResult`` fields). When the
+        result has ``explanation_pending`` set, a final ``explanation`` event
+        with the same ``request_id`` follows once it is ready.
+        """
+        started = time.monotonic()
+        try:
+            if self.status == STATUS_WARMING:
+                yield {"type": "stage", "stage": "warming"}
+            try:
+                await self.async_wait_ready()
+            except asyncio.TimeoutError:
+                result = self._warming_result()
+                self._record_stream(started, result)
+                yield {"type": "result", **asdict(result)}
+                return
+
+            fast_result = await self._fast_path_result(prompt, config_type, include_entities)
+            if fast_result:
+                self._record_stream(started, fast_result)
+                yield {"type": "result", **asdict(fast_result)}
+                return
+
+            yield {"type": "stage", "stage": "resolving_entities"}
+            with self._metrics.time_stage(STAGE_PREPARE):
+                suggested_entities, plan, cache_key, model = await self._prepare_generation(
+                    prompt, config_type, context, include_entities, kwargs.get("model")
+                )
+            # The model the prompt was budgeted and cached for
+            kwargs["model"] = model
+
+            result = self._get_cached_result(cache_key)
+            if result:
+                yield {"type": "stage", "stage": "cache_hit"}
             else:
-                user_friendly_error = f"❌ AI service error: {error_msg}"
-            
-            return GenerationResult(
-                config="",
-                explanation="",
-                entities_used=[],
-                warnings=[user_friendly_error],
-                success=False
+                similar = self._get_similar_result(prompt, config_type, suggested_entities)
+                if similar:
+                    candidate, similarity = similar
+                    yield {"type": "candidate", "similarity": round(similarity, 3), **asdict(candidate)}
+
+                yield {"type": "stage", "stage": "generating"}
+                llm_started = time.monotonic()
+                stream = await self._llm_client.generate_config(
+                    prompt=plan.request,
+                    system_prompt=plan.text,
+                    stream=True,
+                    **kwargs
+                )
+                async with stream:
+                    async for delta in stream:
+                        yield {"type": "token", "text": delta}
+                self._metrics.record_stage(STAGE_LLM, time.monotonic() - llm_started)
+
+                yield {"type": "stage", "stage": "post_processing"}
+                with self._metrics.time_stage(STAGE_POST_PROCESS):
+                    processed_result = await self._post_process_config(
+                        stream.response.content, config_type, suggested_entities
+                    )
+                result = GenerationResult(
+                    config=processed_result["config"],
+                    explanation=processed_result["explanation"],
+                    entities_used=processed_result["entities_used"],
+                    warnings=processed_result["warnings"] + self._budget_warnings(plan),
+                    success=True,
+                    **self._usage(stream.response, plan),
+                    request_id=ulid_now(),
+                    explanation_pending=processed_result["explanation_pending"],
+                )
+                if processed_result["parsed"]:
+                    self._cache_result(
+                        cache_key, result, prompt, config_type, suggested_entities
+                    )
+                self._defer_explanation(result, config_type, cache_key)
+
+        except asyncio.CancelledError:
+            _LOGGER.debug("Configuration stream cancelled")
+            raise
+
+        except Exception as err:
+            _LOGGER.error("Error streaming configuration: %s", err)
+            result = self._error_result(err)
+
+        self._record_stream(started, result)
+        yield {"type": "result", **asdict(result)}
+
+        if result.explanation_pending:
+            explanation = await self.async_wait_explanation(result.request_id)
+            if explanation is not None:
+                yield {
+                    "type": "explanation",
+                    "request_id": result.request_id,
+                    "explanation": explanation,
+                }
+
+    def _record_stream(self, started: float, result: GenerationResult) -> None:
+        """Time a streamed generation request and count its outcome."""
+        self._metrics.record_stage(STAGE_TOTAL, time.monotonic() - started)
+        self._metrics.record_request(result.success)
+
+    async def _fast_path_result(
+        self,
+        prompt: str,
+        config_type: str,
+        include_entities: Optional[List[str]],
+    ) -> Optional[GenerationResult]:
+        """Return a locally generated result, or None to use the LLM.
+
+        Only automations are generated locally, and only when the request
+        is parsed confidently, covers the entities the user selected and
+        the result passes validation.
+        """
+        if self._fast_path is None or config_type != "automation":
+            return None
+
+        try:
+            match = await self._fast_path.async_generate(prompt)
+        except Exception as err:  # pylint: disable=broad-except
+            _LOGGER.debug("Fast path failed, using the LLM: %s", err)
+            return None
+        if match is None or not set(include_entities or []) <= set(match.entities):
+            return None
+
+        config_yaml = yaml.safe_dump(match.config, sort_keys=False, allow_unicode=True)
+        errors = self._validate_automation_config(config_yaml)
+        if errors:
+            _LOGGER.debug("Fast path result invalid, using the LLM: %s", errors)
+            return None
+
+        _LOGGER.debug("Generated automation locally (confidence %.2f)", match.confidence)
+        return GenerationResult(
+            config=config_yaml,
+            explanation=match.explanation,
+            entities_used=match.entities,
+            warnings=[],
+            success=True,
+            prompt_tokens=0,
+            completion_tokens=0,
+            estimated_cost=0.0,
+            request_id=ulid_now(),
+            source=SOURCE_FAST_PATH,
+        )
+
+    async def _prepare_generation(
+        self,
+        prompt: str,
+        config_type: str,
+        context: Optional[Dict[str, Any]],
+        include_entities: Optional[List[str]],
+        model: Optional[str] = None,
+    ) -> Tuple[List[str], PromptPlan, Optional[str], Optional[str]]:
+        """Resolve entities and build the prompt, cache key and model."""
+        if not self._llm_client or not self._llm_client.is_configured:
+            raise RuntimeError("LLM client not configured")
+
+        if not self._entity_manager:
+            raise RuntimeError("Entity manager not initialized")
+
+        # Get entity suggestions if entities are mentioned in the prompt
+        suggested_entities = await self._extract_entities_from_prompt(prompt)
+        if include_entities:
+            suggested_entities.extend(include_entities)
+
+        # Build context with entity information
+        generation_context = await self._build_generation_context(
+            prompt, config_type, suggested_entities, context
+        )
+
+        # Select appropriate prompt template, filled within the token budget
+        model = model or self._llm_client.model_for(TASK_GENERATE, config_type, prompt)
+        plan = self._get_system_prompt(
+            prompt,
+            config_type,
+            generation_context,
+            self._rank_entities(prompt, generation_context, include_entities or []),
+            model,
+        )
+
+        cache_key = None
+        if self._cache:
+            cache_key = self._cache.make_key(
+                prompt,
+                config_type,
+                model,
+                context_fingerprint(generation_context),
+            )
+
+        return suggested_entities, plan, cache_key, model
+
+    def _get_cached_result(self, cache_key: Optional[str]) -> Optional[GenerationResult]:
+        """Return the cached result for a request, if there is one."""
+        if not self._cache or not cache_key:
+            return None
+        data = self._cache.get(cache_key)
+        if data is None:
+            return None
+        return GenerationResult(**{**data, "cached": True, "estimated_cost": 0.0})
+
+    def _get_similar_result(
+        self, prompt: str, config_type: str, entity_ids: List[str]
+    ) -> Optional[Tuple[GenerationResult, float]]:
+        """Return a result cached for a near-duplicate prompt and its similarity."""
+        if not self._cache:
+            return None
+        match = self._cache.find_similar(prompt, config_type, entity_ids)
+        if match is None:
+            return None
+        data, similarity = match
+        return GenerationResult(**{**data, "cached": True, "estimated_cost": 0.0}), similarity
+
+    def _cache_result(
+        self,
+        cache_key: Optional[str],
+        result: GenerationResult,
+        prompt: str,
+        config_type: str,
+        entity_ids: List[str],
+    ) -> None:
+        """Cache a successful result and index its prompt."""
+        if self._cache and cache_key and result.success and result.config:
+            data = asdict(result)
+            for field_name in ("cached", "request_id", "explanation_pending"):
+                data.pop(field_name)
+            self._cache.set(
+                cache_key, data, prompt=prompt, config_type=config_type, entities=entity_ids
+            )
+
+    def _usage(self, response: LLMResponse, plan: PromptPlan) -> Dict[str, Any]:
+        """Return the token counts and estimated cost of a generation.
+
+        Provider-reported usage is preferred; otherwise the tokens are
+        counted locally.
+        """
+        prompt_tokens = response.prompt_tokens
+        if prompt_tokens is None:
+            prompt_tokens = plan.tokens
+        completion_tokens = response.completion_tokens
+        if completion_tokens is None:
+            completion_tokens = count_tokens(response.content, response.model)
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "cached_tokens": response.cached_tokens,
+            "estimated_cost": estimate_cost(
+                response.provider,
+                response.model,
+                prompt_tokens,
+                completion_tokens,
+                response.cached_tokens,
+            ),
+        }
+
+    def _budget_warnings(self, plan: PromptPlan) -> List[str]:
+        """Return a warning if entities were left out of the prompt."""
+        if not plan.entities_dropped:
+            return []
+        return [
+            f"{len(plan.entities_dropped)} less relevant entities were left out "
+            f"of the prompt to stay within the {self._prompt_token_budget} token budget"
+        ]
+
+    def _defer_explanation(
+        self, result: GenerationResult, config_type: str, cache_key: Optional[str]
+    ) -> None:
+        """Generate a missing explanation in the background.
+
+        The result is returned right away with a basic explanation; the
+        full one is announced with an ``EVENT_EXPLANATION_READY`` event
+        keyed by the result's request ID and stored in the cache.
+        """
+        if not result.explanation_pending:
+            return
+
+        request_id = result.request_id
+
+        async def _explain() -> str:
+            """Generate the explanation and announce it."""
+            explanation = await self._generate_explanation(
+                result.config, config_type, result.entities_used
+            )
+            if self._cache and cache_key:
+                self._cache.update(cache_key, explanation=explanation)
+            self.hass.bus.async_fire(
+                EVENT_EXPLANATION_READY,
+                {"request_id": request_id, "explanation": explanation},
             )
+            return explanation
+
+        task = self.hass.async_create_background_task(
+            _explain(), f"{DOMAIN} explanation {request_id}"
+        )
+        self._pending_explanations[request_id] = task
+        task.add_done_callback(
+            lambda _: self._pending_explanations.pop(request_id, None)
+        )
+
+    async def async_wait_explanation(self, request_id: Optional[str]) -> Optional[str]:
+        """Wait for a deferred explanation, or None if none is pending."""
+        task = self._pending_explanations.get(request_id)
+        if task is None:
+            return None
+        try:
+            # Shielded so a departing listener does not cancel the work
+            return await asyncio.shield(task)
+        except Exception:  # pylint: disable=broad-except
+            return None
+
+    def _warming_result(self) -> GenerationResult:
+        """Return the result reported while the warm-up is still running."""
+        return GenerationResult(
+            config="",
+            explanation="",
+            entities_used=[],
+            warnings=["⏳ The AI assistant is still warming up. Please try again in a moment."],
+            success=False
+        )
+
+    def _error_result(self, err: Exception) -> GenerationResult:
+        """Turn a generation error into a user-friendly failed result."""
+        error_msg = str(err)
+
+        # Check for specific LLM errors and provide better messages; the
+        # exception type name covers both litellm and native backend errors
+        error_text = f"{type(err).__name__}: {error_msg}"
+        if "SchedulerOverloadedError" in error_text:
+            user_friendly_error = "🚦 Too many AI requests are queued right now. Please try again shortly."
+        elif "CircuitOpenError" in error_text:
+            user_friendly_error = f"🚧 The AI service is temporarily unavailable ({error_msg}). Please try again shortly."
+        elif "RateLimitError" in error_text or "quota" in error_text.lower():
+            user_friendly_error = "⚠️ OpenAI API quota exceeded. Please check your billing details at https://platform.openai.com/account/billing"
+        elif "AuthenticationError" in error_text or "api_key" in error_text.lower():
+            user_friendly_error = "🔑 API key invalid or missing. Please reconfigure your LLM provider in the integration settings."
+        elif "TimeoutError" in error_text or "timeout" in error_text.lower():
+            user_friendly_error = "⏱️ Request timed out. The AI service may be overloaded. Please try again."
+        elif "NetworkError" in error_text or "connection" in error_text.lower():
+            user_friendly_error = "🌐 Network connection failed. Please check your internet connection."
+        else:
+            user_friendly_error = f"❌ AI service error: {error_msg}"
+
+        return GenerationResult(
+            config="",
+            explanation="",
+            entities_used=[],
+            warnings=[user_friendly_error],
+            success=False
+        )
 
     async def _extract_entities_from_prompt(self, prompt: str) -> List[str]:
         """Extract potential entity references from the user prompt."""
@@ -205,22 +705,53 @@ class ConfigGenerator:
 
         return context
 
-    def _get_system_prompt(self, config_type: str, context: Dict[str, Any]) -> str:
-        """Get the appropriate system prompt for the configuration type."""
-        # Format entity information
-        entities_info = []
-        for entity_id, info in context.get("entities", {}).items():
-            state_info = context.get("current_states", {}).get(entity_id, {})
-            state = state_info.get("state", "unknown")
-            entities_info.append(f"- {entity_id} ({info['name']}) - {info['domain']} in {info.get('area', 'No Area')} - Current state: {state}")
+    def _rank_entities(
+        self, prompt: str, context: Dict[str, Any], selected: List[str]
+    ) -> List[str]:
+        """Order the context entities by relevance to the prompt.
 
-        entities_text = "\n".join(entities_info) if entities_info else "No specific entities identified"
+        Entities the user selected come first; within each group entities
+        sharing more words with the prompt (ID, name or area) rank higher.
+        """
+        prompt_words = prompt_shingles(prompt)
+        selected_ids = set(selected)
 
-        # Format current states
-        states_info = []
-        for entity_id, state_data in context.get("current_states", {}).items():
-            states_info.append(f"- {entity_id}: {state_data['state']}")
-        states_text = "\n".join(states_info) if states_info else "No current states available"
+        def relevance(entity_id: str) -> Tuple[bool, int, str]:
+            info = context["entities"][entity_id]
+            words = prompt_shingles(
+                f"{entity_id} {info.get('name') or ''} {info.get('area') or ''}"
+            )
+            # Negated so the highest relevance sorts first
+            return (entity_id not in selected_ids, -len(words & prompt_words), entity_id)
+
+        return sorted(context.get("entities", {}), key=relevance)
+
+    def _get_system_prompt(
+        self,
+        prompt: str,
+        config_type: str,
+        context: Dict[str, Any],
+        ranked_entities: List[str],
+        model: Optional[str] = None,
+    ) -> PromptPlan:
+        """Get the appropriate prompt for the configuration type.
+
+        The system prompt lists the instructions, services and entities,
+        which rarely change, so providers can cache it; the current time,
+        entity states and the request go in the user message. Entities are
+        taken in ``ranked_entities`` order until the prompt token budget is
+        spent.
+        """
+        # Format entity information
+        entity_lines = {}
+        for entity_id in ranked_entities:
+            info = context["entities"][entity_id]
+            entity_lines[entity_id] = f"- {entity_id} ({info['name']}) - {info['domain']} in {info.get('area', 'No Area')}"
+
+        state_lines = {
+            entity_id: f"- {entity_id}: {state_data.get('state', 'unknown')}"
+            for entity_id, state_data in context.get("current_states", {}).items()
+        }
 
         # Select prompt template
         if config_type == "automation":
@@ -231,25 +762,29 @@ class ConfigGenerator:
             template = SCRIPT_PROMPT
         else:
             # Generic template
-            template = f"""
-Create a Home Assistant {config_type} configuration based on this request: {{prompt}}
+            template = f"""You create Home Assistant {config_type} configurations.
 
-Available entities:
-{{entities}}
+Generate a complete YAML {config_type} configuration for the user's request.
 
-Current time: {{current_time}}
-Current states: {{current_states}}
+{{response_format}}
 
-Generate a complete YAML {config_type} configuration.
-Respond with valid YAML only.
+Available entities:
+{{entities}}
 """
 
-        return template.format(
-            prompt="{prompt}",  # Keep placeholder for actual formatting
-            entities=entities_text,
-            current_time=context.get("current_time", ""),
-            current_states=states_text,
-            services=context.get("services", "")
+        return build_budgeted_prompt(
+            template,
+            REQUEST_PROMPT,
+            {
+                "prompt": prompt,
+                "current_time": context.get("current_time", ""),
+                "services": context.get("services", ""),
+                "response_format": RESPONSE_FORMAT,
+            },
+            entity_lines,
+            state_lines,
+            self._prompt_token_budget,
+            model,
         )
 
     def _get_available_services(self) -> str:
@@ -258,6 +793,8 @@ Respond with valid YAML only.
         for domain, domain_services in self.hass.services.async_services().items():
             for service_name in domain_services.keys():
                 services.append(f"{domain}.{service_name}")
+        # Sorted so the list, part of the cached prompt prefix, is stable
+        services.sort()
         
         # Return a subset of common services to avoid overwhelming the LLM
         common_services = [s for s in services if any(
@@ -275,10 +812,18 @@ Respond with valid YAML only.
         config_type: str,
         suggested_entities: List[str]
     ) -> Dict[str, Any]:
-        """Post-process the generated configuration."""
+        """Post-process the generated configuration.
+
+        The explanation normally arrives in the same response as the
+        configuration. When it does not, a basic explanation is returned
+        with ``explanation_pending`` set, and the caller generates the
+        full one in the background.
+        """
         try:
+            generated_yaml, explanation = self._split_explanation(generated_content)
+
             # Extract YAML from the response (remove markdown formatting if present)
-            yaml_content = self._extract_yaml_from_response(generated_content)
+            yaml_content = self._extract_yaml_from_response(generated_yaml)
             
             # Parse and validate YAML
             try:
@@ -291,10 +836,10 @@ Respond with valid YAML only.
             # Extract entities actually used in the config
             entities_used = self._extract_entities_from_config(yaml_content)
             
-            # Generate explanation
-            explanation = await self._generate_explanation(
-                yaml_content, config_type, entities_used
-            )
+            explanation_pending = not explanation
+            if explanation_pending:
+                _LOGGER.debug("Response had no explanation, deferring a separate request")
+                explanation = self._basic_explanation(config_type, entities_used)
 
             # Check for warnings
             warnings = []
@@ -307,6 +852,8 @@ Respond with valid YAML only.
                 "explanation": explanation,
                 "entities_used": entities_used,
                 "warnings": warnings,
+                "parsed": True,
+                "explanation_pending": explanation_pending,
             }
 
         except Exception as err:
@@ -316,8 +863,22 @@ Respond with valid YAML only.
                 "explanation": "Configuration generated but may need manual review",
                 "entities_used": [],
                 "warnings": [f"Post-processing error: {err}"],
+                "parsed": False,
+                "explanation_pending": False,
             }
 
+    def _split_explanation(self, response: str) -> Tuple[str, Optional[str]]:
+        """Split a structured response into its YAML part and explanation."""
+        # The last marker at the start of a line, so a YAML value that
+        # mentions the word is never mistaken for it
+        marker_at = response.rfind(f"\n{EXPLANATION_MARKER}")
+        if marker_at == -1:
+            if not response.startswith(EXPLANATION_MARKER):
+                return response, None
+            marker_at = 0
+        explanation = response[marker_at:].strip()[len(EXPLANATION_MARKER):].strip()
+        return response[:marker_at], explanation or None
+
     def _extract_yaml_from_response(self, response: str) -> str:
         """Extract YAML content from LLM response."""
         # Remove markdown code blocks if present
@@ -391,7 +952,10 @@ Respond with valid YAML only.
         except Exception as err:
             _LOGGER.debug("Could not generate explanation: %s", err)
 
-        # Fallback to simple explanation
+        return self._basic_explanation(config_type, entities_used)
+
+    def _basic_explanation(self, config_type: str, entities_used: List[str]) -> str:
+        """Describe a configuration by the entities it uses."""
         entity_names = []
         for entity_id in entities_used:
             if entity_id in self._entity_manager._entities_cache:
@@ -411,33 +975,9 @@ Respond with valid YAML only.
     ) -> ValidationResult:
         """Validate a configuration."""
         try:
-            errors = []
-            warnings = []
-            suggestions = []
-
-            # Basic YAML validation
-            try:
-                yaml.safe_load(config_yaml)
-            except yaml.YAMLError as err:
-                errors.append(f"Invalid YAML syntax: {err}")
-                return ValidationResult(
-                    valid=False,
-                    errors=errors,
-                    warnings=warnings,
-                    suggestions=suggestions
-                )
-
-            # Extract and validate entity references
-            entities_used = self._extract_entities_from_config(config_yaml)
-            for entity_id in entities_used:
-                if entity_id not in self._entity_manager._entities_cache:
-                    warnings.append(f"Entity '{entity_id}' not found")
-
-            # Configuration-specific validation
-            if config_type == "automation":
-                errors.extend(self._validate_automation_config(config_yaml))
-            elif config_type == "script":
-                errors.extend(self._validate_script_config(config_yaml))
+            result, parsed = self._validate_locally(config_yaml, config_type)
+            if not parsed:
+                return result
 
             # Use LLM for additional validation if available
             if self._llm_client and self._llm_client.is_configured:
@@ -449,20 +989,12 @@ Respond with valid YAML only.
                     )
                     
                     # Parse LLM response
-                    llm_result = json.loads(response.content)
-                    errors.extend(llm_result.get("errors", []))
-                    warnings.extend(llm_result.get("warnings", []))
-                    suggestions.extend(llm_result.get("suggestions", []))
+                    self._merge_review(result, json.loads(response.content))
                     
                 except Exception as err:
                     _LOGGER.debug("LLM validation failed: %s", err)
 
-            return ValidationResult(
-                valid=len(errors) == 0,
-                errors=errors,
-                warnings=warnings,
-                suggestions=suggestions
-            )
+            return result
 
         except Exception as err:
             _LOGGER.error("Error validating configuration: %s", err)
@@ -473,6 +1005,194 @@ Respond with valid YAML only.
                 suggestions=[]
             )
 
+    def _validate_locally(
+        self, config_yaml: str, config_type: str
+    ) -> Tuple[ValidationResult, bool]:
+        """Run the checks that need no LLM; also return whether the YAML parsed."""
+        errors = []
+        warnings = []
+
+        # Basic YAML validation
+        try:
+            yaml.safe_load(config_yaml)
+        except yaml.YAMLError as err:
+            errors.append(f"Invalid YAML syntax: {err}")
+            return ValidationResult(
+                valid=False, errors=errors, warnings=warnings, suggestions=[]
+            ), False
+
+        # Extract and validate entity references
+        entities_used = self._extract_entities_from_config(config_yaml)
+        for entity_id in entities_used:
+            if entity_id not in self._entity_manager._entities_cache:
+                warnings.append(f"Entity '{entity_id}' not found")
+
+        # Configuration-specific validation
+        if config_type == "automation":
+            errors.extend(self._validate_automation_config(config_yaml))
+        elif config_type == "script":
+            errors.extend(self._validate_script_config(config_yaml))
+
+        return ValidationResult(
+            valid=not errors, errors=errors, warnings=warnings, suggestions=[]
+        ), True
+
+    @staticmethod
+    def _merge_review(result: ValidationResult, review: Dict[str, Any]) -> None:
+        """Add the findings of an LLM review to a validation result."""
+        result.errors.extend(review.get("errors", []))
+        result.warnings.extend(review.get("warnings", []))
+        result.suggestions.extend(review.get("suggestions", []))
+        result.valid = not result.errors
+
+    async def async_validate_batch(
+        self,
+        configs: List[str],
+        config_type: str,
+        use_llm: bool = True,
+        **kwargs
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Validate many configurations, yielding each result as it completes.
+
+        The local checks run for every configuration first. Configurations
+        that parse are then reviewed by the LLM several to a request, with
+        at most ``BATCH_VALIDATION_CONCURRENCY`` requests at a time and at
+        background priority unless another is given. Events have a
+        ``type`` of ``item`` (the ``ValidationResult`` fields of one
+        configuration with its ``index`` and ``name``) or ``summary``,
+        which comes last.
+        """
+        review = use_llm and self._llm_client is not None and self._llm_client.is_configured
+        results: List[ValidationResult] = []
+        to_review: List[int] = []
+        counts = {"valid": 0, "invalid": 0}
+
+        def item_event(index: int) -> Dict[str, Any]:
+            """Return the event reporting one configuration's result."""
+            result = results[index]
+            counts["valid" if result.valid else "invalid"] += 1
+            return {
+                "type": "item",
+                "index": index,
+                "name": self._config_name(configs[index], index),
+                **asdict(result),
+            }
+
+        for index, config_yaml in enumerate(configs):
+            result, parsed = self._validate_locally(config_yaml, config_type)
+            results.append(result)
+            if parsed and review:
+                to_review.append(index)
+            else:
+                yield item_event(index)
+
+        kwargs.setdefault("priority", PRIORITY_BACKGROUND)
+        semaphore = asyncio.Semaphore(BATCH_VALIDATION_CONCURRENCY)
+
+        async def _review(batch: List[int]) -> Tuple[List[int], Dict[int, Dict[str, Any]]]:
+            """Review one packed batch of configurations."""
+            async with semaphore:
+                return batch, await self._review_batch(batch, configs, config_type, **kwargs)
+
+        if to_review and not kwargs.get("model"):
+            # Resolved once, so batches are sized with the tokenizer of
+            # the model that reviews them
+            kwargs["model"] = self._llm_client.model_for(TASK_VALIDATE, config_type)
+        batches = self._pack_batches(to_review, configs, kwargs.get("model"))
+        tasks = [asyncio.ensure_future(_review(batch)) for batch in batches]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                batch, reviews = await next_done
+                for index in batch:
+                    if index in reviews:
+                        self._merge_review(results[index], reviews[index])
+                    yield item_event(index)
+        finally:
+            # The consumer went away; stop the remaining reviews
+            for task in tasks:
+                task.cancel()
+
+        yield {
+            "type": "summary",
+            "total": len(configs),
+            "llm_requests": len(batches),
+            **counts,
+        }
+
+    def _pack_batches(
+        self, indices: List[int], configs: List[str], model: Optional[str]
+    ) -> List[List[int]]:
+        """Group configurations into review requests of bounded size for ``model``."""
+        batches: List[List[int]] = []
+        batch: List[int] = []
+        batch_tokens = 0
+        for index in indices:
+            tokens = count_tokens(configs[index], model)
+            if batch and (
+                len(batch) >= BATCH_VALIDATION_MAX_ITEMS
+                or batch_tokens + tokens > BATCH_VALIDATION_MAX_TOKENS
+            ):
+                batches.append(batch)
+                batch, batch_tokens = [], 0
+            batch.append(index)
+            batch_tokens += tokens
+        if batch:
+            batches.append(batch)
+        return batches
+
+    async def _review_batch(
+        self,
+        batch: List[int],
+        configs: List[str],
+        config_type: str,
+        **kwargs
+    ) -> Dict[int, Dict[str, Any]]:
+        """Have the LLM review a batch; return the findings by index."""
+        try:
+            response = await self._llm_client.validate_configs(
+                configs=[(index, configs[index]) for index in batch],
+                config_type=config_type,
+                **kwargs
+            )
+            content = response.content
+            # Tolerate prose or a code fence around the JSON object
+            data = json.loads(content[content.index("{"):content.rindex("}") + 1])
+            return {
+                int(item["index"]): item
+                for item in data.get("results", [])
+                if isinstance(item, dict) and int(item.get("index", -1)) in batch
+            }
+        except Exception as err:
+            _LOGGER.debug("LLM batch validation failed: %s", err)
+            return {}
+
+    @staticmethod
+    def split_configs(config_yaml: str) -> List[str]:
+        """Split a YAML list of configurations, like automations.yaml, into items.
+
+        Anything that is not a list is returned as a single configuration.
+        """
+        try:
+            data = yaml.safe_load(config_yaml)
+        except yaml.YAMLError:
+            return [config_yaml]
+        if not isinstance(data, list):
+            return [config_yaml]
+        return [yaml.safe_dump(item, sort_keys=False, allow_unicode=True) for item in data]
+
+    @staticmethod
+    def _config_name(config_yaml: str, index: int) -> str:
+        """Return a readable name for a configuration: its alias, ID or position."""
+        try:
+            config = yaml.safe_load(config_yaml)
+        except yaml.YAMLError:
+            config = None
+        if isinstance(config, dict):
+            name = config.get("alias") or config.get("id")
+            if name:
+                return str(name)
+        return f"#{index + 1}"
+
     def _validate_automation_config(self, config_yaml: str) -> List[str]:
         """Validate automation-specific configuration."""
         errors = []
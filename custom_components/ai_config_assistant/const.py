@@ -5,6 +5,21 @@ DOMAIN = "ai_config_assistant"
 # Configuration keys
 CONF_LLM_PROVIDER = "llm_provider"
 CONF_DEFAULT_MODEL = "default_model"
+CONF_API_BASE = "api_base"
+CONF_FALLBACK_PROVIDERS = "fallback_providers"
+CONF_FALLBACK_PROVIDER = "fallback_provider"
+CONF_FALLBACK_API_KEY = "fallback_api_key"
+CONF_FALLBACK_MODEL = "fallback_model"
+CONF_REQUESTS_PER_MINUTE = "requests_per_minute"
+CONF_TOKENS_PER_MINUTE = "tokens_per_minute"
+CONF_PROMPT_TOKEN_BUDGET = "prompt_token_budget"
+CONF_LOCAL_FAST_PATH = "local_fast_path"
+CONF_GENERATE_MODEL = "generate_model"
+CONF_VALIDATE_MODEL = "validate_model"
+CONF_EXPLAIN_MODEL = "explain_model"
+CONF_IMPROVE_MODEL = "improve_model"
+CONF_AUTO_ROUTE_MODELS = "auto_route_models"
+CONF_OLLAMA_KEEP_ALIVE = "ollama_keep_alive"
 CONF_MAX_TOKENS = "max_tokens"
 CONF_TEMPERATURE = "temperature"
 
@@ -17,6 +32,7 @@ LLM_PROVIDERS = [
     "groq",
     "ollama",
     "openrouter",
+    "mock",
 ]
 
 # Default models for each provider
@@ -28,17 +44,85 @@ DEFAULT_MODELS = {
     "groq": "llama3-70b-8192",
     "ollama": "llama2",
     "openrouter": "openai/gpt-3.5-turbo",
+    "mock": "mock-replay",
 }
 
+# Smaller, faster model of each provider, picked by the automatic router
+# for requests that do not need the default model
+SMALL_MODELS = {
+    "openai": "gpt-4o-mini",
+    "anthropic": "claude-3-haiku-20240307",
+    "google": "gemini-1.5-flash",
+    "mistral": "mistral-small-latest",
+    "groq": "llama3-8b-8192",
+    "openrouter": "openai/gpt-4o-mini",
+}
+
+# Kinds of LLM request, each with its own model setting and statistics
+TASK_GENERATE = "generate"
+TASK_VALIDATE = "validate"
+TASK_EXPLAIN = "explain"
+TASK_IMPROVE = "improve"
+TASK_MODEL_OPTIONS = {
+    TASK_GENERATE: CONF_GENERATE_MODEL,
+    TASK_VALIDATE: CONF_VALIDATE_MODEL,
+    TASK_EXPLAIN: CONF_EXPLAIN_MODEL,
+    TASK_IMPROVE: CONF_IMPROVE_MODEL,
+}
+
+# Automatic model routing: explanations and validation always use the small
+# model; generation does for short requests of the simpler config types
+DEFAULT_AUTO_ROUTE_MODELS = False
+ROUTER_SMALL_TASKS = [TASK_VALIDATE, TASK_EXPLAIN]
+ROUTER_SIMPLE_CONFIG_TYPES = ["automation", "script"]
+ROUTER_MAX_SMALL_PROMPT_TOKENS = 40
+
+# Wire format spoken by each provider with a native backend; providers not
+# listed here fall back to litellm
+PROVIDER_WIRE_FORMATS = {
+    "openai": "openai",
+    "openrouter": "openai",
+    "groq": "openai",
+    "mistral": "openai",
+    "anthropic": "anthropic",
+    "ollama": "ollama",
+    "mock": "mock",
+}
+
+# Providers that work without an API key
+KEYLESS_PROVIDERS = ["ollama", "mock"]
+
+# Default API base URL for each native provider
+PROVIDER_API_BASES = {
+    "openai": "https://api.openai.com/v1",
+    "openrouter": "https://openrouter.ai/api/v1",
+    "groq": "https://api.groq.com/openai/v1",
+    "mistral": "https://api.mistral.ai/v1",
+    "anthropic": "https://api.anthropic.com",
+    "ollama": "http://localhost:11434",
+}
+
+ANTHROPIC_API_VERSION = "2023-06-01"
+
 # Services
 SERVICE_GENERATE_CONFIG = "generate_config"
 SERVICE_VALIDATE_CONFIG = "validate_config"
+SERVICE_VALIDATE_BATCH = "validate_batch"
 SERVICE_PREVIEW_CONFIG = "preview_config"
 SERVICE_GET_ENTITIES = "get_entities"
 SERVICE_GET_SUGGESTIONS = "get_suggestions"
 SERVICE_RELOAD = "reload"
 SERVICE_DEPLOY_CONFIG = "deploy_config"
 
+# Service, API and WebSocket fields selecting the config entry to use; a
+# profile is an entry's title
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_PROFILE = "profile"
+
+# WebSocket commands
+WS_TYPE_GENERATE_STREAM = f"{DOMAIN}/generate_stream"
+WS_TYPE_VALIDATE_BATCH = f"{DOMAIN}/validate_batch"
+
 # Configuration types
 CONFIG_TYPES = [
     "automation",
@@ -55,6 +139,8 @@ CONFIG_TYPES = [
 EVENT_CONFIG_GENERATED = f"{DOMAIN}_config_generated"
 EVENT_CONFIG_VALIDATED = f"{DOMAIN}_config_validated"
 EVENT_CONFIG_PREVIEWED = f"{DOMAIN}_config_previewed"
+EVENT_EXPLANATION_READY = f"{DOMAIN}_explanation_ready"
+EVENT_BATCH_ITEM_VALIDATED = f"{DOMAIN}_batch_item_validated"
 
 # Panel configuration
 PANEL_NAME = "aight"
@@ -67,6 +153,166 @@ DEFAULT_MAX_TOKENS = 2000
 DEFAULT_TEMPERATURE = 0.1
 DEFAULT_TOP_P = 0.9
 
+# Upper bound on provider requests in flight at once, shared by all callers
+DEFAULT_MAX_CONCURRENT_REQUESTS = 4
+
+# Scheduler priority classes, most urgent first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_EXPLANATION = 1
+PRIORITY_VALIDATION = 2
+PRIORITY_BACKGROUND = 3
+PRIORITY_NAMES = ["interactive", "explanation", "validation", "background"]
+
+# Requests waiting for admission before the lowest-priority ones are shed
+DEFAULT_MAX_QUEUE_DEPTH = 32
+
+# Per-provider rate limits enforced with token buckets; local providers
+# are not metered
+DEFAULT_REQUESTS_PER_MINUTE = 60
+DEFAULT_TOKENS_PER_MINUTE = 150000
+UNMETERED_PROVIDERS = {"ollama", "mock"}
+
+# Seconds before a provider request is abandoned
+DEFAULT_REQUEST_TIMEOUT = 60
+
+# Retries for transient provider failures (exponential backoff with jitter)
+DEFAULT_MAX_RETRIES = 2
+DEFAULT_RETRY_BASE_DELAY = 1.0
+DEFAULT_RETRY_MAX_DELAY = 20
+
+# Consecutive failures that open a provider's circuit, and the seconds it
+# stays open before requests are let through again
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_COOLDOWN = 60
+
+# Hedged requests: when a provider has not answered within its recent p95
+# latency the request is duplicated to the next configured provider. Until
+# enough samples exist the default delay is used.
+DEFAULT_HEDGE_DELAY = 8
+HEDGE_MIN_DELAY = 1.0
+HEDGE_MAX_DELAY = 30
+
+# Minutes Ollama keeps a model loaded after each request (-1 keeps it
+# loaded until the server restarts), and the seconds allowed for loading
+# the model at setup
+DEFAULT_OLLAMA_KEEP_ALIVE = 30
+OLLAMA_PRELOAD_TIMEOUT = 300
+
+# Offline mock provider replaying recorded responses, for load and
+# regression testing. Recordings are read from this file in the config
+# directory; without it a built-in automation is replayed.
+MOCK_MODEL = "mock-replay"
+MOCK_RECORDINGS_FILE = "ai_config_assistant_mock.json"
+MOCK_DEFAULT_LATENCY = 0.5
+MOCK_DEFAULT_TOKENS_PER_SECOND = 50.0
+MOCK_DEFAULT_ERROR_RATE = 0.0
+MOCK_DEFAULT_ERROR_STATUS = 503
+MOCK_SERVER_PORT = 8089
+
+# Phases of an Ollama request reported by the server, in seconds
+OLLAMA_TIMING_PHASES = ["load", "prompt_eval", "eval"]
+
+# Per-provider latency tracking (EWMA smoothing and p95 sample window)
+LATENCY_EWMA_ALPHA = 0.2
+LATENCY_WINDOW = 50
+LATENCY_MIN_SAMPLES = 5
+
+# Metrics histograms: log-spaced latency buckets from 1 ms to 5 minutes,
+# percentiles over the last one to two windows of this many seconds
+METRICS_MIN_LATENCY_MS = 1.0
+METRICS_MAX_LATENCY_MS = 300_000.0
+METRICS_BUCKET_GROWTH = 1.15
+METRICS_WINDOW = 900
+
+# Stages of the generation pipeline timed by the metrics
+STAGE_TOTAL = "total"
+STAGE_PREPARE = "prepare"
+STAGE_LLM = "llm"
+STAGE_POST_PROCESS = "post_process"
+METRICS_STAGES = [STAGE_TOTAL, STAGE_PREPARE, STAGE_LLM, STAGE_POST_PROCESS]
+
+# Token budget for the generation system prompt; the lowest-ranked
+# entities are left out once it is spent
+DEFAULT_PROMPT_TOKEN_BUDGET = 2500
+
+# Average characters per word token for each tokenizer family, used to
+# count prompt tokens locally
+MODEL_FAMILY_CHARS_PER_TOKEN = {
+    "openai": 4.2,
+    "anthropic": 3.8,
+    "gemini": 4.0,
+    "mistral": 3.5,
+    "llama": 3.8,
+    "default": 3.8,
+}
+
+# Price in US dollars per million input and output tokens, by model name
+# prefix; used for cost estimates only
+MODEL_PRICES = {
+    "gpt-3.5-turbo": (0.50, 1.50),
+    "gpt-4": (30.00, 60.00),
+    "gpt-4-turbo": (10.00, 30.00),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "claude-3-haiku": (0.25, 1.25),
+    "claude-3-sonnet": (3.00, 15.00),
+    "claude-3-5-sonnet": (3.00, 15.00),
+    "claude-3-opus": (15.00, 75.00),
+    "gemini-pro": (0.50, 1.50),
+    "gemini-1.5-pro": (1.25, 5.00),
+    "mistral-small": (0.20, 0.60),
+    "mistral-medium": (2.70, 8.10),
+    "mistral-large": (2.00, 6.00),
+    "llama3-8b": (0.05, 0.08),
+    "llama3-70b": (0.59, 0.79),
+    "mixtral-8x7b": (0.24, 0.24),
+}
+
+# Fraction of the input price charged for prompt tokens read from the
+# provider's prompt cache, by tokenizer family
+CACHED_PROMPT_PRICE_RATIO = {
+    "anthropic": 0.1,
+    "default": 0.5,
+}
+
+# Seconds a generation request waits for the background warm-up
+DEFAULT_WARMUP_TIMEOUT = 30
+
+# Generation response cache
+CACHE_STORAGE_KEY = f"{DOMAIN}.generation_cache"
+CACHE_STORAGE_VERSION = 1
+CACHE_SAVE_DELAY = 30
+DEFAULT_CACHE_MAX_ENTRIES = 256
+DEFAULT_CACHE_TTL = 7 * 24 * 3600
+
+# Near-duplicate prompt matching (MinHash/LSH over prompt word shingles)
+MINHASH_PERMUTATIONS = 32
+MINHASH_BANDS = 8
+DEFAULT_SIMILARITY_THRESHOLD = 0.75
+
+# Readiness states reported by the services and API
+STATUS_WARMING = "warming"
+STATUS_READY = "ready"
+STATUS_ERROR = "error"
+
+# Batch validation: configurations are packed into LLM review requests of
+# at most this many items and YAML tokens, a few requests at a time
+BATCH_VALIDATION_MAX_ITEMS = 10
+BATCH_VALIDATION_MAX_TOKENS = 3000
+BATCH_VALIDATION_CONCURRENCY = 3
+BATCH_VALIDATION_TOKENS_PER_ITEM = 200
+
+# Which path produced a generation result
+SOURCE_LLM = "llm"
+SOURCE_FAST_PATH = "fast_path"
+
+# Rule-based fast path for simple automations; requests parsed with lower
+# confidence go to the LLM
+DEFAULT_LOCAL_FAST_PATH = True
+FAST_PATH_MIN_CONFIDENCE = 0.8
+FAST_PATH_DOMAINS = ["light", "switch", "fan", "input_boolean"]
+FAST_PATH_MOTION_DEVICE_CLASSES = ["motion", "occupancy", "presence"]
+
 # Entity filtering
 EXCLUDED_DOMAINS = [
     "zone",
@@ -90,53 +336,69 @@ PREFERRED_DOMAINS = [
     "alarm_control_panel",
 ]
 
-# Prompt templates
-AUTOMATION_PROMPT = """
-Create a Home Assistant automation based on this request: {prompt}
-
-Available entities:
-{entities}
+# Response format shared by the generation prompts: the configuration and
+# a short explanation in one reply, so no second explanation request is
+# needed. Plain text rather than JSON keeps the YAML readable while it
+# streams to the panel.
+EXPLANATION_MARKER = "EXPLANATION:"
+RESPONSE_FORMAT = f"""Respond with the YAML configuration in a ```yaml code block, followed by
+a line starting with "{EXPLANATION_MARKER}" and two or three sentences
+explaining in plain language what the configuration does."""
 
-Current time: {current_time}
-Current states: {current_states}
+# Prompt templates. The system prompt holds only what rarely changes
+# (instructions, response format, service catalog and entity inventory) so
+# providers can cache it as a prompt prefix; the time, states and the
+# request itself follow in the user message (REQUEST_PROMPT).
+AUTOMATION_PROMPT = """You create Home Assistant automations.
 
-Generate a complete YAML automation configuration. Include:
+Generate a complete YAML automation configuration for the user's request. Include:
 1. A descriptive alias
 2. Appropriate trigger(s)
 3. Relevant condition(s) if needed
 4. Clear action(s)
 
-Respond with valid YAML only.
-"""
+{response_format}
 
-DASHBOARD_PROMPT = """
-Create a Home Assistant dashboard configuration based on this request: {prompt}
+Available services:
+{services}
 
 Available entities:
 {entities}
+"""
 
-Current states: {current_states}
+DASHBOARD_PROMPT = """You create Home Assistant dashboards.
 
-Generate a complete dashboard YAML configuration following Lovelace format. Include:
+Generate a complete dashboard YAML configuration following Lovelace format for the user's request. Include:
 1. Appropriate views and sections
 2. Relevant cards for the entities
 3. Proper layout and organization
 
-Respond with valid YAML only.
-"""
-
-SCRIPT_PROMPT = """
-Create a Home Assistant script based on this request: {prompt}
+{response_format}
 
 Available entities:
 {entities}
+"""
 
-Available services: {services}
+SCRIPT_PROMPT = """You create Home Assistant scripts.
 
-Generate a complete script YAML configuration. Include:
+Generate a complete script YAML configuration for the user's request. Include:
 1. A descriptive alias
 2. Clear sequence of actions
 3. Proper service calls with data
 
-Respond with valid YAML only.
+{response_format}
+
+Available services:
+{services}
+
+Available entities:
+{entities}
+"""
+
+REQUEST_PROMPT = """Current time: {current_time}
+
+Current states:
+{current_states}
+
+Request: {prompt}
 """
\ No newline at end of file
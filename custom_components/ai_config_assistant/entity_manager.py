@@ -1,7 +1,9 @@
 """Entity manager for AI Configuration Assistant."""
 import logging
 from typing import Any, Dict, List, Optional, Set, Tuple
+from bisect import bisect_left
 from dataclasses import dataclass
+import heapq
 import json
 import re
 from collections import defaultdict
@@ -17,6 +19,17 @@ from .const import EXCLUDED_DOMAINS, PREFERRED_DOMAINS
 
 _LOGGER = logging.getLogger(__name__)
 
+# Separators between the searchable words of entity IDs, names and queries
+_TOKEN_SPLIT_RE = re.compile(r"[\s_.]+")
+
+# Sorts after every character in index terms, closing a prefix range
+_PREFIX_END = "\U0010ffff"
+
+
+def _tokenize(text: str) -> List[str]:
+    """Split text into lowercase search words."""
+    return [token for token in _TOKEN_SPLIT_RE.split(text.lower()) if token]
+
 @dataclass
 class EntityInfo:
     """Information about a Home Assistant entity."""
@@ -58,6 +71,9 @@ class EntityManager:
         self._entities_by_domain: Dict[str, List[str]] = defaultdict(list)
         self._entities_by_area: Dict[str, List[str]] = defaultdict(list)
         self._search_index: Dict[str, Set[str]] = defaultdict(set)
+        # Sorted index terms; the terms starting with a prefix are a
+        # contiguous run found by bisection
+        self._search_terms: List[str] = []
         self._last_update = None
         
         # Register for state changes
@@ -79,6 +95,7 @@ class EntityManager:
         self._entities_by_domain.clear()
         self._entities_by_area.clear()
         self._search_index.clear()
+        self._search_terms = []
 
         # Process all entities
         for state in self.hass.states.async_all():
@@ -135,28 +152,21 @@ class EntityManager:
             # Build search index
             self._add_to_search_index(entity_info)
 
+        self._search_terms = sorted(self._search_index)
         self._last_update = dt_util.utcnow()
 
     def _add_to_search_index(self, entity_info: EntityInfo) -> None:
         """Add entity to search index."""
-        # Index by entity_id parts
-        parts = entity_info.entity_id.replace('_', ' ').split('.')
-        for part in parts:
-            self._search_index[part.lower()].add(entity_info.entity_id)
-        
-        # Index by name parts
-        name_parts = entity_info.name.lower().replace('_', ' ').split()
-        for part in name_parts:
-            self._search_index[part].add(entity_info.entity_id)
-        
-        # Index by domain
-        self._search_index[entity_info.domain].add(entity_info.entity_id)
-        
-        # Index by area
+        # Index by entity_id parts, name, area and device words; the
+        # domain is the first entity_id part
+        texts = [entity_info.entity_id, entity_info.name]
         if entity_info.area_name:
-            area_parts = entity_info.area_name.lower().replace('_', ' ').split()
-            for part in area_parts:
-                self._search_index[part].add(entity_info.entity_id)
+            texts.append(entity_info.area_name)
+        if entity_info.device_name:
+            texts.append(entity_info.device_name)
+        for text in texts:
+            for token in _tokenize(text):
+                self._search_index[token].add(entity_info.entity_id)
 
     @callback
     def _handle_state_changed(self, event: Event) -> None:
@@ -199,34 +209,88 @@ class EntityManager:
                         ))
             return suggestions[:limit]
 
-        query_lower = query.lower()
-        scored_results: List[Tuple[str, float]] = []
-
-        # Search through the index
-        for term, entity_ids in self._search_index.items():
-            if query_lower in term:
-                score = self._calculate_match_score(query_lower, term)
-                for entity_id in entity_ids:
-                    scored_results.append((entity_id, score))
-
-        # Sort by score and remove duplicates
-        seen_entities = set()
-        unique_results = []
-        for entity_id, score in sorted(scored_results, key=lambda x: x[1], reverse=True):
-            if entity_id not in seen_entities:
-                seen_entities.add(entity_id)
-                unique_results.append((entity_id, score))
-
-        # Filter by domain if specified
-        if domain_filter:
-            unique_results = [
-                (entity_id, score) for entity_id, score in unique_results
-                if entity_id.split('.')[0] in domain_filter
-            ]
-
-        # Convert to suggestions
+        domains = set(domain_filter) if domain_filter else None
+        words = _tokenize(query)
+
+        # A domain-qualified query like "light.kit" only searches that domain
+        domain, dot, rest = query.partition(".")
+        domain = domain.strip().lower()
+        if dot and domain in self._entities_by_domain:
+            if domains is not None and domain not in domains:
+                return []
+            domains = {domain}
+            words = _tokenize(rest)
+            if not words:
+                unique_results = [
+                    (entity_id, 1.0) for entity_id in self._entities_by_domain[domain][:limit]
+                ]
+                return self._to_suggestions(unique_results)
+
+        if not words:
+            return []
+        if len(words) == 1:
+            return self._to_suggestions(self._best_prefix_matches(words[0], domains, limit))
+
+        # Every word must begin some word of the entity; start from the
+        # word with the fewest matches and only check those entities
+        word_matches = sorted((self._match_prefix(word) for word in words), key=len)
+        candidates, others = word_matches[0], word_matches[1:]
+        scored_results = (
+            (entity_id, (score + sum(other[entity_id] for other in others)) / len(words))
+            for entity_id, score in candidates.items()
+            if (domains is None or entity_id.partition(".")[0] in domains)
+            and all(entity_id in other for other in others)
+        )
+        unique_results = heapq.nlargest(limit, scored_results, key=lambda result: result[1])
+
+        return self._to_suggestions(unique_results)
+
+    def _prefix_terms(self, prefix: str) -> List[str]:
+        """Return the index terms starting with ``prefix``."""
+        terms = self._search_terms
+        start = bisect_left(terms, prefix)
+        return terms[start:bisect_left(terms, prefix + _PREFIX_END, start)]
+
+    def _best_prefix_matches(
+        self, prefix: str, domains: Optional[Set[str]], limit: int
+    ) -> List[Tuple[str, float]]:
+        """Return the best ``limit`` entities with a word starting with ``prefix``.
+
+        Shorter words score higher, so words are visited shortest first
+        and the search stops as soon as ``limit`` entities are found.
+        """
+        results: Dict[str, float] = {}
+        for term in sorted(self._prefix_terms(prefix), key=len):
+            score = self._calculate_match_score(prefix, term)
+            for entity_id in self._search_index[term]:
+                if entity_id in results:
+                    continue
+                if domains is None or entity_id.partition(".")[0] in domains:
+                    results[entity_id] = score
+                    if len(results) >= limit:
+                        return list(results.items())
+        return list(results.items())
+
+    def _match_prefix(self, prefix: str) -> Dict[str, float]:
+        """Return the entities with a search word starting with ``prefix``.
+
+        Each entity maps to the score of its best matching word. The cost
+        grows with the number of matches, not with the size of the index.
+        """
+        matches: Dict[str, float] = {}
+        for term in self._prefix_terms(prefix):
+            score = self._calculate_match_score(prefix, term)
+            for entity_id in self._search_index[term]:
+                if entity_id not in matches or score > matches[entity_id]:
+                    matches[entity_id] = score
+        return matches
+
+    def _to_suggestions(
+        self, unique_results: List[Tuple[str, float]]
+    ) -> List[EntitySuggestion]:
+        """Convert scored entity IDs to suggestions."""
         suggestions = []
-        for entity_id, score in unique_results[:limit]:
+        for entity_id, score in unique_results:
             entity_info = self._entities_cache.get(entity_id)
             if entity_info:
                 context = f"{entity_info.domain}"
@@ -246,14 +310,11 @@ class EntityManager:
         return suggestions
 
     def _calculate_match_score(self, query: str, term: str) -> float:
-        """Calculate match score for search results."""
+        """Calculate the match score of a query word for a word it begins."""
         if query == term:
             return 1.0
-        if query in term:
-            return 0.8 - (len(term) - len(query)) * 0.1
-        if term.startswith(query):
-            return 0.7
-        return 0.5
+        # Shorter completions rank higher
+        return max(0.8 - (len(term) - len(query)) * 0.1, 0.1)
 
     async def get_entities_by_area(self, area_name: str) -> List[EntityInfo]:
         """Get all entities in a specific area."""
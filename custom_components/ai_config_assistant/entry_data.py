@@ -0,0 +1,76 @@
+"""Per-entry pipelines of AI Configuration Assistant.
+
+Every config entry runs its own pipeline: LLM client with its HTTP
+session and rate limits, generation cache, metrics and config generator,
+stored under ``hass.data[DOMAIN]["entries"][entry_id]``. All entries
+share one EntityManager index, stored under ``hass.data[DOMAIN]``.
+"""
+from typing import Any, Dict, List, Optional
+
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    ATTR_CONFIG_ENTRY_ID,
+    ATTR_PROFILE,
+    CONF_DEFAULT_MODEL,
+    CONF_LLM_PROVIDER,
+    DOMAIN,
+)
+
+
+def get_entry_data(
+    hass: HomeAssistant,
+    config_entry_id: Optional[str] = None,
+    profile: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    """Return the pipeline of the config entry a request selects.
+
+    An entry is selected by its ID or by its profile name, the entry's
+    title compared case-insensitively. Without either, the entry set up
+    first is used. Returns None if no loaded entry matches.
+    """
+    entries: Dict[str, Dict[str, Any]] = hass.data.get(DOMAIN, {}).get("entries", {})
+    if config_entry_id:
+        return entries.get(config_entry_id)
+    if profile:
+        wanted = profile.strip().casefold()
+        return next(
+            (
+                data for data in entries.values()
+                if data["config_entry"].title.casefold() == wanted
+            ),
+            None,
+        )
+    return next(iter(entries.values()), None)
+
+
+def get_selected_entry_data(
+    hass: HomeAssistant, request_data: Dict[str, Any]
+) -> Optional[Dict[str, Any]]:
+    """Return the pipeline selected by a request's entry and profile fields."""
+    return get_entry_data(
+        hass, request_data.get(ATTR_CONFIG_ENTRY_ID), request_data.get(ATTR_PROFILE)
+    )
+
+
+def selection_error(request_data: Dict[str, Any]) -> str:
+    """Return the error message for a request no loaded entry matches."""
+    if request_data.get(ATTR_CONFIG_ENTRY_ID):
+        return f"No loaded config entry with ID {request_data[ATTR_CONFIG_ENTRY_ID]}"
+    if request_data.get(ATTR_PROFILE):
+        return f"No loaded config entry named {request_data[ATTR_PROFILE]!r}"
+    return "Config generator not available"
+
+
+def entry_summaries(hass: HomeAssistant) -> List[Dict[str, Any]]:
+    """Return the ID, profile name, provider and status of each loaded entry."""
+    return [
+        {
+            ATTR_CONFIG_ENTRY_ID: entry_id,
+            ATTR_PROFILE: data["config_entry"].title,
+            "provider": data["config_entry"].data[CONF_LLM_PROVIDER],
+            "model": data["config_entry"].data.get(CONF_DEFAULT_MODEL),
+            "status": data["config_generator"].status,
+        }
+        for entry_id, data in hass.data.get(DOMAIN, {}).get("entries", {}).items()
+    ]
@@ -0,0 +1,293 @@
+"""Rule-based generation of simple automations for AI Configuration Assistant."""
+import logging
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.area_registry import async_get as async_get_area_registry
+
+from .const import (
+    FAST_PATH_DOMAINS,
+    FAST_PATH_MIN_CONFIDENCE,
+    FAST_PATH_MOTION_DEVICE_CLASSES,
+)
+from .entity_manager import EntityInfo, EntityManager
+
+_LOGGER = logging.getLogger(__name__)
+
+# Request phrasing that adds nothing to the intent
+_PREFIX_RE = re.compile(
+    r"^(?:please\s+|can you\s+|could you\s+)*"
+    r"(?:(?:create|make|add|write)\s+(?:me\s+)?(?:an?\s+)?automation\s+"
+    r"(?:to|that|which)\s+)?"
+)
+
+_ACTION = r"(?:turn|switch)\s+(?P<state>on|off)\s+(?P<target>.+?)"
+_TIME = (
+    r"at\s+(?P<hour>\d{1,2})(?:[:.](?P<minute>\d{2}))?\s*(?P<meridiem>[ap]\.?m\.?)?"
+    r"(?:\s+(?:every\s*day|daily|each\s+day))?"
+)
+_SUN = (
+    r"(?:at\s+|(?P<offset>\d+)\s*(?P<unit>minutes?|mins?|hours?)\s+(?P<relation>before|after)\s+)"
+    r"(?P<event>sunrise|sunset)(?:\s+(?:every\s*day|daily|each\s+day))?"
+)
+_MOTION = (
+    r"when(?:ever)?\s+(?:there\s+is\s+|there's\s+)?(?:motion|movement)\s+"
+    r"(?:is\s+)?(?:detected\s+)?in\s+(?:the\s+)?(?P<area>[\w' ]+?)"
+)
+_TRIGGER = f"(?:{_TIME}|{_SUN}|{_MOTION})"
+
+# Intents the fast path understands: the action before or after its trigger
+_INTENT_RES = (
+    re.compile(f"{_ACTION}\\s+{_TRIGGER}"),
+    re.compile(f"{_TRIGGER},?\\s+(?:then\\s+)?{_ACTION}"),
+)
+
+_DOMAIN_WORDS = {
+    "light": "light", "lights": "light", "lamp": "light", "lamps": "light",
+    "switch": "switch", "switches": "switch",
+    "fan": "fan", "fans": "fan",
+}
+_DOMAIN_TARGET_RE = re.compile(
+    r"(?:(?P<word>\w+)\s+in\s+(?P<area>.+)|(?P<area_first>.+?)\s+(?P<word_last>\w+))"
+)
+_EVERYTHING_RE = re.compile(
+    r"(?:everything|all\s+devices|all\s+the\s+devices)\s+in\s+(?:the\s+)?(?P<area>.+)"
+)
+_DETERMINER_RE = re.compile(r"^(?:all\s+(?:of\s+)?)?(?:the\s+|my\s+)?")
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def _normalize(text: str) -> str:
+    """Lowercase a phrase and collapse whitespace and trailing punctuation."""
+    return " ".join(text.lower().replace("_", " ").split()).strip(" .!?")
+
+
+def _words(text: str) -> frozenset:
+    """Return the words of a phrase, with plurals crudely stemmed."""
+    return frozenset(
+        word[:-1] if len(word) > 3 and word.endswith("s") else word
+        for word in _WORD_RE.findall(text.lower())
+    )
+
+
+def _similarity(first: frozenset, second: frozenset) -> float:
+    """Return the Jaccard similarity of two word sets."""
+    union = first | second
+    return len(first & second) / len(union) if union else 0.0
+
+
+# Words naming a kind of device rather than a particular one
+_GENERIC_WORDS = _words(" ".join([*_DOMAIN_WORDS, *FAST_PATH_DOMAINS]))
+
+
+@dataclass
+class FastPathResult:
+    """An automation produced without the LLM, with the parse confidence."""
+    config: Dict[str, Any]
+    entities: List[str]
+    explanation: str
+    confidence: float
+
+
+class FastPathGenerator:
+    """Generate common automation patterns locally, without an LLM call.
+
+    Handles requests of the form "turn on X at 7pm", "turn off everything
+    in the kitchen at sunrise" and "when motion in the hallway turn on the
+    hallway lights". Every part of the request must be understood and
+    every entity resolved; otherwise the request is left to the LLM.
+    """
+
+    def __init__(self, hass: HomeAssistant, entity_manager: EntityManager) -> None:
+        """Initialize the fast path."""
+        self.hass = hass
+        self._entity_manager = entity_manager
+
+    async def async_generate(self, prompt: str) -> Optional[FastPathResult]:
+        """Return an automation for the prompt, or None if it is not confidently understood."""
+        text = _PREFIX_RE.sub("", _normalize(prompt))
+        match = next(
+            (m for m in (regex.fullmatch(text) for regex in _INTENT_RES) if m), None
+        )
+        if match is None:
+            return None
+
+        parts = match.groupdict()
+        trigger = await self._async_trigger(parts)
+        target = await self._async_target(parts["target"])
+        if trigger is None or target is None:
+            return None
+
+        trigger_config, trigger_text, trigger_confidence = trigger
+        entities, target_text, target_confidence = target
+        confidence = trigger_confidence * target_confidence
+        if confidence < FAST_PATH_MIN_CONFIDENCE:
+            _LOGGER.debug("Fast path confidence %.2f too low for: %s", confidence, prompt)
+            return None
+
+        state = parts["state"]
+        domains = {entity.domain for entity in entities}
+        service_domain = domains.pop() if len(domains) == 1 else "homeassistant"
+        entity_ids = sorted(entity.entity_id for entity in entities)
+        config = {
+            "alias": f"Turn {state} {target_text} {trigger_text}",
+            "description": f"Created from: {prompt.strip()}",
+            "trigger": [trigger_config],
+            "action": [{
+                "service": f"{service_domain}.turn_{state}",
+                "target": {"entity_id": entity_ids[0] if len(entity_ids) == 1 else entity_ids},
+            }],
+            "mode": "single",
+        }
+        return FastPathResult(
+            config=config,
+            entities=entity_ids + trigger_config.get("entity_id", []),
+            explanation=f"This automation turns {state} {target_text} {trigger_text}.",
+            confidence=confidence,
+        )
+
+    async def _async_trigger(
+        self, parts: Dict[str, Optional[str]]
+    ) -> Optional[Tuple[Dict[str, Any], str, float]]:
+        """Build the trigger, its description and the parse confidence."""
+        if parts["hour"] is not None:
+            return self._time_trigger(parts)
+        if parts["event"] is not None:
+            return self._sun_trigger(parts)
+        return await self._async_motion_trigger(parts["area"])
+
+    def _time_trigger(
+        self, parts: Dict[str, Optional[str]]
+    ) -> Optional[Tuple[Dict[str, Any], str, float]]:
+        """Build a time trigger from "at 7pm", "at 7:30 am" or "at 19:30"."""
+        hour = int(parts["hour"])
+        minute = int(parts["minute"] or 0)
+        meridiem = parts["meridiem"]
+        confidence = 1.0
+        if meridiem:
+            if not 1 <= hour <= 12:
+                return None
+            hour = hour % 12 + (12 if meridiem.startswith("p") else 0)
+        elif parts["minute"] is None and hour <= 12:
+            # "at 7" could mean morning or evening
+            confidence = 0.5
+        if hour > 23 or minute > 59:
+            return None
+        at = f"{hour:02d}:{minute:02d}:00"
+        return {"platform": "time", "at": at}, f"at {at[:5]}", confidence
+
+    def _sun_trigger(
+        self, parts: Dict[str, Optional[str]]
+    ) -> Tuple[Dict[str, Any], str, float]:
+        """Build a sun trigger, with an offset for "30 minutes before sunset"."""
+        event = parts["event"]
+        trigger: Dict[str, Any] = {"platform": "sun", "event": event}
+        if parts["offset"] is None:
+            return trigger, f"at {event}", 1.0
+
+        amount = int(parts["offset"])
+        minutes = amount * 60 if parts["unit"].startswith("h") else amount
+        sign = "-" if parts["relation"] == "before" else ""
+        trigger["offset"] = f"{sign}{minutes // 60:02d}:{minutes % 60:02d}:00"
+        return trigger, f"{amount} {parts['unit']} {parts['relation']} {event}", 1.0
+
+    async def _async_motion_trigger(
+        self, area_phrase: str
+    ) -> Optional[Tuple[Dict[str, Any], str, float]]:
+        """Build a state trigger on the motion sensors of an area."""
+        area_name = self._area_name(area_phrase)
+        if area_name is None:
+            return None
+        sensors = sorted(
+            entity.entity_id
+            for entity in await self._entity_manager.get_entities_by_area(area_name)
+            if entity.domain == "binary_sensor"
+            and entity.attributes.get("device_class") in FAST_PATH_MOTION_DEVICE_CLASSES
+        )
+        if not sensors:
+            return None
+        trigger = {"platform": "state", "entity_id": sensors, "to": "on"}
+        return trigger, f"when motion is detected in the {area_name}", 1.0
+
+    async def _async_target(
+        self, phrase: str
+    ) -> Optional[Tuple[List[EntityInfo], str, float]]:
+        """Resolve the entities to switch, their description and the confidence."""
+        phrase = _DETERMINER_RE.sub("", phrase)
+
+        everything = _EVERYTHING_RE.fullmatch(phrase)
+        if everything:
+            area_name = self._area_name(everything["area"])
+            if area_name is None:
+                return None
+            entities = [
+                entity
+                for entity in await self._entity_manager.get_entities_by_area(area_name)
+                if entity.domain in FAST_PATH_DOMAINS
+            ]
+            return (entities, f"everything in the {area_name}", 1.0) if entities else None
+
+        by_domain = _DOMAIN_TARGET_RE.fullmatch(phrase)
+        if by_domain:
+            word = by_domain["word"] or by_domain["word_last"]
+            area_phrase = by_domain["area"] or by_domain["area_first"]
+            area_name = self._area_name(area_phrase)
+            if word in _DOMAIN_WORDS and area_name is not None:
+                domain = _DOMAIN_WORDS[word]
+                entities = [
+                    entity
+                    for entity in await self._entity_manager.get_entities_by_area(area_name)
+                    if entity.domain == domain
+                ]
+                if entities:
+                    return entities, f"the {area_name} {domain}s", 1.0
+
+        return await self._async_named_entity(phrase)
+
+    async def _async_named_entity(
+        self, phrase: str
+    ) -> Optional[Tuple[List[EntityInfo], str, float]]:
+        """Resolve a single entity by name or entity ID.
+
+        An exact name match is certain; otherwise the entity sharing the
+        most words with the phrase is used, with their overlap as the
+        confidence, unless another entity matches equally well.
+        """
+        wanted = _words(phrase) - _GENERIC_WORDS
+        if not wanted:
+            return None
+
+        scored: List[Tuple[float, EntityInfo]] = []
+        for domain in FAST_PATH_DOMAINS:
+            for entity in await self._entity_manager.get_entities_by_domain(domain):
+                if _normalize(entity.name) == phrase or entity.entity_id == phrase:
+                    return [entity], entity.name, 1.0
+                # Generic words like "light" are left out of the comparison,
+                # so "porch" and "porch light" both name "Porch Light"
+                score = max(
+                    _similarity(wanted, _words(entity.name) - _GENERIC_WORDS),
+                    _similarity(wanted, _words(entity.entity_id.split(".", 1)[1]) - _GENERIC_WORDS),
+                )
+                if score:
+                    scored.append((score, entity))
+
+        if not scored:
+            return None
+        scored.sort(key=lambda item: item[0], reverse=True)
+        best_score, best = scored[0]
+        if len(scored) > 1 and scored[1][0] == best_score:
+            return None
+        return [best], best.name, best_score
+
+    def _area_name(self, phrase: str) -> Optional[str]:
+        """Return the registered area name a phrase refers to."""
+        wanted = _normalize(phrase)
+        wanted = wanted[4:] if wanted.startswith("the ") else wanted
+        for area in async_get_area_registry(self.hass).areas.values():
+            if _normalize(area.name) == wanted or wanted in (
+                _normalize(alias) for alias in getattr(area, "aliases", ())
+            ):
+                return area.name
+        return None
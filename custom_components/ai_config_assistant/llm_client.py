@@ -1,23 +1,315 @@
 """LLM client manager for AI Configuration Assistant."""
 import logging
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, Union
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
-from dataclasses import dataclass
+import math
+import random
+import time
+from collections import deque
+from contextlib import aclosing
+from dataclasses import dataclass, field
 
+import aiohttp
+
+from homeassistant.const import CONF_API_KEY
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.aiohttp_client import async_create_clientsession
 
 from .const import (
     DEFAULT_MODELS,
     DEFAULT_TEMPERATURE, 
     DEFAULT_MAX_TOKENS,
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_RETRY_BASE_DELAY,
+    DEFAULT_RETRY_MAX_DELAY,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_COOLDOWN,
+    DEFAULT_HEDGE_DELAY,
+    HEDGE_MIN_DELAY,
+    HEDGE_MAX_DELAY,
+    LATENCY_EWMA_ALPHA,
+    LATENCY_WINDOW,
+    LATENCY_MIN_SAMPLES,
+    DEFAULT_REQUESTS_PER_MINUTE,
+    DEFAULT_TOKENS_PER_MINUTE,
+    DEFAULT_OLLAMA_KEEP_ALIVE,
+    MOCK_MODEL,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_EXPLANATION,
+    PRIORITY_VALIDATION,
+    BATCH_VALIDATION_TOKENS_PER_ITEM,
+    TASK_EXPLAIN,
+    TASK_GENERATE,
+    TASK_IMPROVE,
+    TASK_MODEL_OPTIONS,
+    TASK_VALIDATE,
+    CONF_LLM_PROVIDER,
+    CONF_DEFAULT_MODEL,
+    CONF_API_BASE,
     CONF_TEMPERATURE,
     CONF_MAX_TOKENS,
 )
+from .metrics import IntegrationMetrics
+from .model_router import ModelRouter
+from .providers import (
+    OllamaBackend,
+    ProviderBackend,
+    ProviderCompletion,
+    ProviderError,
+    create_backend,
+    parse_retry_after,
+)
+from .prompt_builder import count_message_tokens
+from .scheduler import RequestScheduler, SchedulerOverloadedError
+from .single_flight import SingleFlight, request_key
 
 _LOGGER = logging.getLogger(__name__)
 
+# litellm exception class names worth retrying
+_RETRYABLE_LITELLM_ERRORS = {
+    "RateLimitError",
+    "Timeout",
+    "APIConnectionError",
+    "ServiceUnavailableError",
+    "InternalServerError",
+}
+
+
+class CircuitOpenError(ProviderError):
+    """The provider is failing and requests are rejected without a call."""
+
+
+def _is_retryable(err: Exception) -> bool:
+    """Return True if a failed request may succeed when retried."""
+    if isinstance(err, ProviderError):
+        return err.retryable
+    if isinstance(err, asyncio.TimeoutError):
+        return True
+    return type(err).__name__ in _RETRYABLE_LITELLM_ERRORS
+
+
+def _retry_after(err: Exception) -> Optional[float]:
+    """Return the provider's requested retry delay in seconds, if any."""
+    retry_after = getattr(err, "retry_after", None)
+    if retry_after is None:
+        # litellm errors carry the raw HTTP response
+        headers = getattr(getattr(err, "response", None), "headers", None)
+        if headers:
+            retry_after = parse_retry_after(headers.get("retry-after"))
+    return retry_after
+
+
+class CircuitBreaker:
+    """Per-provider circuit breaker.
+
+    After ``failure_threshold`` consecutive transient failures the circuit
+    opens and requests fail fast for ``cooldown`` seconds. After that a
+    single request goes through as a probe while the others keep failing
+    fast: a success closes the circuit again, a failure re-opens it for
+    another cool-down.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        cooldown: float = CIRCUIT_COOLDOWN,
+    ) -> None:
+        """Initialize the circuit breaker."""
+        self._provider = provider
+        self._failure_threshold = failure_threshold
+        self._cooldown = cooldown
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        """Return closed, open or half_open."""
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at < self._cooldown:
+            return "open"
+        return "half_open"
+
+    def before_call(self) -> bool:
+        """Raise CircuitOpenError while the circuit is open or being probed.
+
+        Returns True if the caller is the half-open probe; it must call
+        ``end_probe`` once done, whatever the outcome.
+        """
+        if self._opened_at is None:
+            return False
+        remaining = self._opened_at + self._cooldown - time.monotonic()
+        if remaining > 0:
+            raise CircuitOpenError(
+                f"{self._provider} is unavailable after repeated failures; "
+                f"retrying in {remaining:.0f}s"
+            )
+        if self._probing:
+            raise CircuitOpenError(
+                f"{self._provider} is unavailable after repeated failures; "
+                "checking whether it recovered"
+            )
+        self._probing = True
+        return True
+
+    def end_probe(self) -> None:
+        """Allow the next probe after one ended without an outcome, e.g. cancelled."""
+        self._probing = False
+
+    def record_success(self) -> None:
+        """Close the circuit after the provider answered."""
+        if self._opened_at is not None:
+            _LOGGER.info("%s recovered, closing circuit", self._provider)
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        """Count a transient failure, opening the circuit at the threshold."""
+        self._failures += 1
+        self._probing = False
+        # A failed probe while half-open re-opens the circuit immediately
+        if self._opened_at is not None or self._failures >= self._failure_threshold:
+            self._opened_at = time.monotonic()
+            _LOGGER.warning(
+                "%s failed %d times in a row, pausing requests for %ds",
+                self._provider, self._failures, self._cooldown,
+            )
+
+
+class LatencyTracker:
+    """Recent latency of a provider as an EWMA and a p95 over a window."""
+
+    def __init__(
+        self, alpha: float = LATENCY_EWMA_ALPHA, window: int = LATENCY_WINDOW
+    ) -> None:
+        """Initialize the tracker."""
+        self._alpha = alpha
+        self._samples: deque = deque(maxlen=window)
+        self.ewma: Optional[float] = None
+
+    def record(self, seconds: float) -> None:
+        """Record the duration of a successful request."""
+        self._samples.append(seconds)
+        if self.ewma is None:
+            self.ewma = seconds
+        else:
+            self.ewma += self._alpha * (seconds - self.ewma)
+
+    @property
+    def p95(self) -> Optional[float]:
+        """Return the 95th percentile, or None until enough samples exist."""
+        if len(self._samples) < LATENCY_MIN_SAMPLES:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[math.ceil(0.95 * len(ordered)) - 1]
+
+    def hedge_delay(self) -> float:
+        """Return how long to wait before duplicating a request elsewhere."""
+        p95 = self.p95
+        if p95 is None:
+            return DEFAULT_HEDGE_DELAY
+        return min(max(p95, HEDGE_MIN_DELAY), HEDGE_MAX_DELAY)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the tracked latency in milliseconds."""
+        p95 = self.p95
+        return {
+            "ewma_ms": round(self.ewma * 1000) if self.ewma is not None else None,
+            "p95_ms": round(p95 * 1000) if p95 is not None else None,
+            "samples": len(self._samples),
+        }
+
+
+class TaskStats:
+    """Request count, latency and token usage of one kind of request."""
+
+    def __init__(self) -> None:
+        """Initialize the counters."""
+        self.requests = 0
+        self.errors = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.latency = LatencyTracker()
+        self.models: Dict[str, int] = {}
+
+    def record(
+        self,
+        seconds: float,
+        model: Optional[str],
+        prompt_tokens: Optional[int],
+        completion_tokens: Optional[int],
+    ) -> None:
+        """Record a completed request."""
+        self.requests += 1
+        self.latency.record(seconds)
+        self.prompt_tokens += prompt_tokens or 0
+        self.completion_tokens += completion_tokens or 0
+        self.models[model or ""] = self.models.get(model or "", 0) + 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the counters, with latency in milliseconds."""
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "latency": self.latency.as_dict(),
+            "models": dict(self.models),
+        }
+
+
+@dataclass
+class ProviderRoute:
+    """A configured provider, in failover order, with its recent latency."""
+    provider: str
+    backend: ProviderBackend
+    default_model: Optional[str]
+    latency: LatencyTracker = field(default_factory=LatencyTracker)
+    first_chunk_latency: LatencyTracker = field(default_factory=LatencyTracker)
+    prompt_tokens: int = 0
+    cached_tokens: int = 0
+    # Server-side timings of the latest request, for local servers
+    server_timings: Optional[Dict[str, float]] = None
+
+    def record_usage(self, completion: ProviderCompletion) -> None:
+        """Count the prompt tokens a provider reported, and how many were cached."""
+        self.prompt_tokens += completion.prompt_tokens or 0
+        self.cached_tokens += completion.cached_tokens or 0
+        if completion.timings:
+            self.server_timings = completion.timings
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Return the prompt tokens served from the provider's prompt cache."""
+        return {
+            "prompt_tokens": self.prompt_tokens,
+            "cached_tokens": self.cached_tokens,
+            "cached_ratio": (
+                round(self.cached_tokens / self.prompt_tokens, 3)
+                if self.prompt_tokens else 0.0
+            ),
+        }
+
+
+async def _next_chunk(chunks: AsyncIterator[ProviderCompletion]) -> Optional[ProviderCompletion]:
+    """Return the next chunk of a stream, or None once it is exhausted."""
+    try:
+        return await chunks.__anext__()
+    except StopAsyncIteration:
+        return None
+
+
+def _discard_tasks(tasks: Iterable[asyncio.Task]) -> None:
+    """Cancel requests that lost a race, ignoring the results of finished ones."""
+    for task in tasks:
+        if not task.done():
+            task.cancel()
+        elif not task.cancelled():
+            task.exception()
+
+
 @dataclass
 class LLMResponse:
     """Response from LLM."""
@@ -26,91 +318,252 @@ class LLMResponse:
     provider: str
     tokens_used: Optional[int] = None
     finish_reason: Optional[str] = None
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    cached_tokens: Optional[int] = None
 
 @dataclass 
 class LLMMessage:
     """Message for LLM conversation."""
     role: str  # "system", "user", "assistant"
     content: str
+    # Ask the provider to cache the prompt up to and including this message
+    cache_breakpoint: bool = False
+
+class LLMStream:
+    """Streamed LLM completion.
+
+    Iterate to receive content deltas as they arrive; once exhausted,
+    ``response`` holds the assembled completion. A stream that is not
+    read to the end must be closed, with ``aclose`` or by iterating it
+    in ``async with``, to give back its provider request slot.
+    """
+
+    def __init__(
+        self,
+        chunks: AsyncIterator[ProviderCompletion],
+        model: str,
+        provider: Optional[str],
+    ) -> None:
+        """Initialize the stream."""
+        self._chunks = chunks
+        self._model = model
+        self._provider = provider
+        self._iterator: Optional[AsyncIterator[str]] = None
+        self.response: Optional[LLMResponse] = None
+
+    async def __aenter__(self) -> "LLMStream":
+        """Return the stream; it is closed when the block exits."""
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        """Close the stream."""
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Stop the stream, closing the provider request behind it."""
+        if self._iterator is not None:
+            await self._iterator.aclose()
+        await self._chunks.aclose()
+
+    def set_source(self, provider: str, model: Optional[str]) -> None:
+        """Record which provider ended up serving the stream."""
+        self._provider = provider
+        self._model = model
+
+    @property
+    def provider(self) -> Optional[str]:
+        """Return the provider serving the stream."""
+        return self._provider
+
+    @property
+    def model(self) -> Optional[str]:
+        """Return the model serving the stream."""
+        return self._model
+
+    def __aiter__(self) -> AsyncIterator[str]:
+        """Return the iterator of content deltas."""
+        if self._iterator is None:
+            self._iterator = self._iterate()
+        return self._iterator
+
+    async def _iterate(self) -> AsyncIterator[str]:
+        """Yield content deltas as they arrive."""
+        parts: List[str] = []
+        tokens_used = None
+        prompt_tokens = None
+        completion_tokens = None
+        cached_tokens = None
+        finish_reason = None
+        async with aclosing(self._chunks) as chunks:
+            async for chunk in chunks:
+                if chunk.tokens_used is not None:
+                    tokens_used = chunk.tokens_used
+                if chunk.prompt_tokens is not None:
+                    prompt_tokens = chunk.prompt_tokens
+                if chunk.completion_tokens is not None:
+                    completion_tokens = chunk.completion_tokens
+                if chunk.cached_tokens is not None:
+                    cached_tokens = chunk.cached_tokens
+                if chunk.finish_reason:
+                    finish_reason = chunk.finish_reason
+                if chunk.content:
+                    parts.append(chunk.content)
+                    yield chunk.content
+
+        self.response = LLMResponse(
+            content="".join(parts),
+            model=self._model,
+            provider=self._provider,
+            tokens_used=tokens_used,
+            finish_reason=finish_reason,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            cached_tokens=cached_tokens,
+        )
 
 class LLMClientManager:
-    """Manage LLM client connections and requests."""
+    """Manage LLM client connections and requests.
 
-    def __init__(self, hass: HomeAssistant) -> None:
+    Providers are tried in their configured order. A request that the
+    current provider has not answered within its recent p95 latency is
+    hedged to the next provider; the first valid answer wins and the
+    other requests are cancelled. A failed provider fails over at once.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, metrics: Optional[IntegrationMetrics] = None
+    ) -> None:
         """Initialize the LLM client manager."""
         self.hass = hass
+        self._metrics = metrics or IntegrationMetrics()
         self._provider: Optional[str] = None
         self._api_key: Optional[str] = None
         self._default_model: Optional[str] = None
-        self._session = None
-        self._litellm = None
+        self._routes: List[ProviderRoute] = []
+        # Admission control: priority queue, concurrency and rate limits
+        self._scheduler = RequestScheduler(hass)
+        self._circuit_breakers: Dict[str, CircuitBreaker] = {}
+        self.hedged_requests = 0
+        self.failovers = 0
+        # Identical completions in flight share one provider request
+        self._in_flight: SingleFlight[LLMResponse] = SingleFlight()
+        self._router = ModelRouter()
+        self._task_stats = {task: TaskStats() for task in TASK_MODEL_OPTIONS}
+        self._ollama_keep_alive = DEFAULT_OLLAMA_KEEP_ALIVE
+        self._preload_task: Optional[asyncio.Task] = None
+        self._session: Optional[aiohttp.ClientSession] = None
 
     async def setup(
         self, 
         provider: str, 
         api_key: str, 
-        default_model: Optional[str] = None
+        default_model: Optional[str] = None,
+        api_base: Optional[str] = None,
+        fallbacks: Optional[List[Dict[str, Any]]] = None,
+        requests_per_minute: int = DEFAULT_REQUESTS_PER_MINUTE,
+        tokens_per_minute: int = DEFAULT_TOKENS_PER_MINUTE,
+        task_models: Optional[Dict[str, Optional[str]]] = None,
+        auto_route: bool = False,
+        ollama_keep_alive: int = DEFAULT_OLLAMA_KEEP_ALIVE,
     ) -> None:
-        """Set up the LLM client."""
+        """Set up the LLM client.
+
+        ``fallbacks`` lists further providers in failover order, each a
+        dict with the same keys as the config entry data. The rate limits
+        apply to each provider separately. ``task_models`` maps tasks
+        (generate, validate, explain, improve) to the model to use for
+        them; with ``auto_route`` other requests that do not need the
+        default model go to the provider's small model. Ollama servers
+        keep their model loaded for ``ollama_keep_alive`` minutes after
+        each request and are asked to load it right away.
+        """
         self._provider = provider
         self._api_key = api_key
         self._default_model = default_model or DEFAULT_MODELS.get(provider)
-        
-        # Import litellm dynamically in a thread to avoid blocking
-        loop = asyncio.get_event_loop()
-        
-        def _import_litellm():
-            """Import litellm in thread executor."""
-            try:
-                import litellm
-                return litellm
-            except ImportError as err:
-                _LOGGER.error("Failed to import litellm: %s", err)
-                raise
+        self._scheduler.set_limits(requests_per_minute, tokens_per_minute)
+        self._router.configure(provider, self._default_model, task_models, auto_route)
+        self._ollama_keep_alive = ollama_keep_alive
+        # A session of the config entry's own, detached by Home Assistant
+        # when the entry unloads; the scheduler caps how many of the
+        # shared pool's connections the entry's requests hold
+        if self._session is None:
+            self._session = async_create_clientsession(self.hass)
         
         try:
-            with ThreadPoolExecutor(max_workers=1) as executor:
-                self._litellm = await loop.run_in_executor(executor, _import_litellm)
-            
-            # Configure the provider
-            await self._configure_provider(provider, api_key)
+            routes = [
+                await self._async_create_route(
+                    provider, api_key, self._default_model, api_base
+                )
+            ]
+            for fallback in fallbacks or []:
+                fallback_provider = fallback[CONF_LLM_PROVIDER]
+                routes.append(
+                    await self._async_create_route(
+                        fallback_provider,
+                        fallback.get(CONF_API_KEY, ""),
+                        fallback.get(CONF_DEFAULT_MODEL)
+                        or DEFAULT_MODELS.get(fallback_provider),
+                        fallback.get(CONF_API_BASE),
+                    )
+                )
+            self._routes = routes
+            # Loading a local model can take a minute; never wait for it
+            self._preload_task = self.hass.async_create_background_task(
+                self._async_preload_models(), "ai_config_assistant model preload"
+            )
             
-            _LOGGER.info("LLM client setup completed for provider: %s", provider)
+            _LOGGER.info(
+                "LLM client setup completed for providers: %s",
+                ", ".join(
+                    f"{route.provider} ({type(route.backend).__name__})"
+                    for route in routes
+                ),
+            )
             
         except Exception as err:
             _LOGGER.error("Failed to setup LLM client: %s", err)
             raise
 
-    async def _configure_provider(self, provider: str, api_key: str) -> None:
-        """Configure the specific LLM provider."""
-        import os
-        
-        if provider == "openai":
-            os.environ["OPENAI_API_KEY"] = api_key
-            self._litellm.openai_key = api_key
-        elif provider == "anthropic":
-            os.environ["ANTHROPIC_API_KEY"] = api_key
-            self._litellm.anthropic_key = api_key
-        elif provider == "google":
-            os.environ["GEMINI_API_KEY"] = api_key
-            self._litellm.vertex_ai_key = api_key
-        elif provider == "mistral":
-            os.environ["MISTRAL_API_KEY"] = api_key
-            self._litellm.mistral_key = api_key
-        elif provider == "groq":
-            os.environ["GROQ_API_KEY"] = api_key
-            self._litellm.groq_key = api_key
-        elif provider == "openrouter":
-            # OpenRouter uses OpenAI-compatible API
-            os.environ["OPENROUTER_API_KEY"] = api_key
-            # Set custom API base for OpenRouter
-            os.environ["OPENAI_API_BASE"] = "https://openrouter.ai/api/v1"
-            os.environ["OPENAI_API_KEY"] = api_key
-        # Ollama doesn't need API key configuration
-        elif provider == "ollama":
-            pass
-        else:
-            _LOGGER.warning("Unknown provider: %s", provider)
+    async def _async_create_route(
+        self,
+        provider: str,
+        api_key: str,
+        default_model: Optional[str],
+        api_base: Optional[str],
+    ) -> ProviderRoute:
+        """Create and set up the backend of one provider."""
+        # Native backends share this client's pooled HTTP session and
+        # never import litellm; other providers fall back to litellm
+        backend = create_backend(self.hass, provider, api_key, api_base, self._session)
+        if isinstance(backend, OllamaBackend):
+            backend.set_keep_alive(self._ollama_keep_alive)
+        await backend.async_setup()
+        return ProviderRoute(provider, backend, default_model)
+
+    async def _async_preload_models(self) -> None:
+        """Load the default model of each Ollama server ahead of the first request."""
+        for route in self._routes:
+            if not isinstance(route.backend, OllamaBackend) or not route.default_model:
+                continue
+            try:
+                timings = await route.backend.async_preload(route.default_model)
+            except ProviderError as err:
+                _LOGGER.warning(
+                    "Could not preload %s on %s: %s", route.default_model, route.provider, err
+                )
+                continue
+            self._record_usage(route, ProviderCompletion(content="", timings=timings))
+            _LOGGER.info(
+                "Preloaded %s on %s in %.1fs",
+                route.default_model, route.provider, timings.get("load", 0.0),
+            )
+
+    def _record_usage(self, route: ProviderRoute, completion: ProviderCompletion) -> None:
+        """Record the usage and server timings a provider reported."""
+        route.record_usage(completion)
+        if completion.timings:
+            self._metrics.record_server_timings(route.provider, completion.timings)
 
     async def generate_completion(
         self,
@@ -118,10 +571,20 @@ class LLMClientManager:
         model: Optional[str] = None,
         temperature: Optional[float] = None,
         max_tokens: Optional[int] = None,
+        stream: bool = False,
+        priority: int = PRIORITY_INTERACTIVE,
+        task: str = TASK_GENERATE,
         **kwargs
-    ) -> LLMResponse:
-        """Generate a completion from the LLM."""
-        if not self._litellm:
+    ) -> Union[LLMResponse, LLMStream]:
+        """Generate a completion from the LLM.
+
+        With ``stream=True`` an ``LLMStream`` is returned instead, which
+        yields content deltas as the provider produces them. Concurrent
+        identical non-streamed requests are answered by a single call.
+        Requests are admitted by the scheduler in ``priority`` order;
+        latency and token usage are recorded under ``task``.
+        """
+        if not self._routes:
             raise RuntimeError("LLM client not initialized")
 
         # Use defaults if not specified
@@ -129,69 +592,489 @@ class LLMClientManager:
         temperature = temperature if temperature is not None else DEFAULT_TEMPERATURE
         max_tokens = max_tokens or DEFAULT_MAX_TOKENS
 
-        # Convert messages to the format expected by litellm
+        # Convert messages to the chat format expected by the backends;
+        # backends that support explicit prompt caching honour the markers
         formatted_messages = [
-            {"role": msg.role, "content": msg.content}
+            {"role": msg.role, "content": msg.content, "cache_breakpoint": True}
+            if msg.cache_breakpoint
+            else {"role": msg.role, "content": msg.content}
             for msg in messages
         ]
+        # Size for the rate limiter, settled against actual usage;
+        # providers count max_tokens against the limit up front
+        estimated_tokens = count_message_tokens(formatted_messages, model) + max_tokens
 
-        def _sync_completion():
-            """Run the synchronous completion in a thread."""
-            try:
-                # Use synchronous completion in thread
-                response = self._litellm.completion(
-                    model=model,
-                    messages=formatted_messages,
-                    temperature=temperature,
-                    max_tokens=max_tokens,
-                    **kwargs
-                )
-                return response
-            except Exception as err:
-                _LOGGER.error("Error in sync completion: %s", err)
-                raise
+        def route_model(index: int, route: ProviderRoute) -> Optional[str]:
+            """Return the model to request from a provider."""
+            # A requested model names a model of the primary provider
+            return model if index == 0 else route.default_model
+
+        task_stats = self._task_stats[task]
+        if stream:
+            llm_stream = LLMStream(
+                self._track_stream(
+                    task_stats,
+                    model,
+                    lambda: llm_stream,
+                    self._stream_hedged(
+                        lambda index, route: self._stream_with_retries(
+                            route,
+                            priority,
+                            estimated_tokens,
+                            lambda: route.backend.async_stream(
+                                model=route_model(index, route),
+                                messages=formatted_messages,
+                                temperature=temperature,
+                                max_tokens=max_tokens,
+                                **kwargs
+                            ),
+                        ),
+                        lambda index, route: llm_stream.set_source(
+                            route.provider, route_model(index, route)
+                        ),
+                    ),
+                ),
+                model,
+                self._provider,
+            )
+            return llm_stream
 
+        started = time.monotonic()
         try:
-            # Run the blocking API call in a thread executor
-            loop = asyncio.get_event_loop()
-            with ThreadPoolExecutor(max_workers=1) as executor:
-                response = await loop.run_in_executor(executor, _sync_completion)
+            response = await self._in_flight.run(
+                request_key(formatted_messages, model, temperature, max_tokens, kwargs),
+                lambda: self._metered(
+                    self._complete(
+                        route_model,
+                        formatted_messages,
+                        temperature,
+                        max_tokens,
+                        priority,
+                        estimated_tokens,
+                        **kwargs
+                    )
+                ),
+            )
+        except Exception:
+            task_stats.errors += 1
+            raise
+        task_stats.record(
+            time.monotonic() - started,
+            response.model,
+            response.prompt_tokens,
+            response.completion_tokens,
+        )
+        return response
+
+    async def _metered(self, completion: Awaitable[LLMResponse]) -> LLMResponse:
+        """Count a provider request, its token usage and estimated cost.
+
+        Runs once per provider request, so completions shared by several
+        callers are only counted once.
+        """
+        try:
+            response = await completion
+        except Exception:
+            self._metrics.record_llm_error()
+            raise
+        self._metrics.record_llm_request(
+            response.provider,
+            response.model,
+            response.prompt_tokens,
+            response.completion_tokens,
+            response.cached_tokens,
+        )
+        return response
+
+    async def _track_stream(
+        self,
+        task_stats: TaskStats,
+        model: Optional[str],
+        source: Callable[[], LLMStream],
+        chunks: AsyncIterator[ProviderCompletion],
+    ) -> AsyncIterator[ProviderCompletion]:
+        """Pass a stream through, recording its duration and token usage."""
+        started = time.monotonic()
+        prompt_tokens = completion_tokens = cached_tokens = None
+        try:
+            async with aclosing(chunks):
+                async for chunk in chunks:
+                    if chunk.prompt_tokens is not None:
+                        prompt_tokens = chunk.prompt_tokens
+                    if chunk.completion_tokens is not None:
+                        completion_tokens = chunk.completion_tokens
+                    if chunk.cached_tokens is not None:
+                        cached_tokens = chunk.cached_tokens
+                    yield chunk
+        except Exception:
+            task_stats.errors += 1
+            self._metrics.record_llm_error()
+            raise
+        task_stats.record(time.monotonic() - started, model, prompt_tokens, completion_tokens)
+        stream = source()
+        self._metrics.record_llm_request(
+            stream.provider, stream.model, prompt_tokens, completion_tokens, cached_tokens
+        )
 
-            # Extract response content
-            content = response.choices[0].message.content
-            tokens_used = response.usage.total_tokens if hasattr(response, 'usage') else None
-            finish_reason = response.choices[0].finish_reason
+    async def _complete(
+        self,
+        route_model: Callable[[int, ProviderRoute], Optional[str]],
+        formatted_messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        priority: int,
+        estimated_tokens: int,
+        **kwargs
+    ) -> LLMResponse:
+        """Run a non-streamed completion across the configured providers."""
+        try:
+            index, route, completion = await self._complete_hedged(
+                lambda index, route: self._call_with_retries(
+                    route,
+                    priority,
+                    estimated_tokens,
+                    lambda: route.backend.async_complete(
+                        model=route_model(index, route),
+                        messages=formatted_messages,
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                        **kwargs
+                    ),
+                )
+            )
 
             return LLMResponse(
-                content=content,
-                model=model,
-                provider=self._provider,
-                tokens_used=tokens_used,
-                finish_reason=finish_reason,
+                content=completion.content,
+                model=route_model(index, route),
+                provider=route.provider,
+                tokens_used=completion.tokens_used,
+                finish_reason=completion.finish_reason,
+                prompt_tokens=completion.prompt_tokens,
+                completion_tokens=completion.completion_tokens,
+                cached_tokens=completion.cached_tokens,
             )
 
         except Exception as err:
             _LOGGER.error("Error generating completion: %s", err)
             raise
 
+    async def _complete_hedged(
+        self,
+        call: Callable[[int, ProviderRoute], Awaitable[ProviderCompletion]],
+    ) -> Tuple[int, ProviderRoute, ProviderCompletion]:
+        """Run a completion across the providers, hedging slow ones.
+
+        Returns the index and route of the provider that answered first
+        with content, together with its completion.
+        """
+        routes = self._routes
+        pending: Dict[asyncio.Task, int] = {}
+        next_index = 0
+        last_error: Optional[Exception] = None
+
+        def launch() -> None:
+            """Start the request on the next provider."""
+            nonlocal next_index
+            pending[asyncio.create_task(call(next_index, routes[next_index]))] = next_index
+            next_index += 1
+
+        launch()
+        try:
+            while pending:
+                can_hedge = next_index < len(routes)
+                done, _ = await asyncio.wait(
+                    pending,
+                    timeout=(
+                        routes[next_index - 1].latency.hedge_delay()
+                        if can_hedge else None
+                    ),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    self.hedged_requests += 1
+                    _LOGGER.debug(
+                        "%s has not answered yet, hedging to %s",
+                        routes[next_index - 1].provider, routes[next_index].provider,
+                    )
+                    launch()
+                    continue
+
+                for task in done:
+                    index = pending.pop(task)
+                    try:
+                        completion = task.result()
+                        if not completion.content:
+                            raise ProviderError(
+                                f"{routes[index].provider} returned an empty response"
+                            )
+                    except Exception as err:  # pylint: disable=broad-except
+                        last_error = err
+                        if next_index < len(routes):
+                            self.failovers += 1
+                            _LOGGER.warning(
+                                "%s failed (%s), failing over to %s",
+                                routes[index].provider, err, routes[next_index].provider,
+                            )
+                            launch()
+                        continue
+                    return index, routes[index], completion
+        finally:
+            # The slower requests lost the race
+            _discard_tasks(pending)
+
+        assert last_error is not None
+        raise last_error
+
+    async def _stream_hedged(
+        self,
+        open_stream: Callable[[int, ProviderRoute], AsyncIterator[ProviderCompletion]],
+        on_winner: Callable[[int, ProviderRoute], None],
+    ) -> AsyncIterator[ProviderCompletion]:
+        """Stream from the provider that delivers its first chunk first.
+
+        Hedging uses each provider's time-to-first-chunk p95; once a
+        provider has produced output the other streams are cancelled.
+        """
+        routes = self._routes
+        pending: Dict[asyncio.Task, Tuple[int, AsyncIterator[ProviderCompletion]]] = {}
+        next_index = 0
+        last_error: Optional[Exception] = None
+        winner: Optional[AsyncIterator[ProviderCompletion]] = None
+        first_chunk: Optional[ProviderCompletion] = None
+
+        def launch() -> None:
+            """Open the stream on the next provider."""
+            nonlocal next_index
+            chunks = open_stream(next_index, routes[next_index])
+            pending[asyncio.create_task(_next_chunk(chunks))] = (next_index, chunks)
+            next_index += 1
+
+        launch()
+        try:
+            while pending and winner is None:
+                can_hedge = next_index < len(routes)
+                done, _ = await asyncio.wait(
+                    pending,
+                    timeout=(
+                        routes[next_index - 1].first_chunk_latency.hedge_delay()
+                        if can_hedge else None
+                    ),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    self.hedged_requests += 1
+                    _LOGGER.debug(
+                        "%s has not started streaming yet, hedging to %s",
+                        routes[next_index - 1].provider, routes[next_index].provider,
+                    )
+                    launch()
+                    continue
+
+                for task in done:
+                    index, chunks = pending.pop(task)
+                    try:
+                        first_chunk = task.result()
+                        if first_chunk is None:
+                            raise ProviderError(
+                                f"{routes[index].provider} returned an empty response"
+                            )
+                    except Exception as err:  # pylint: disable=broad-except
+                        last_error = err
+                        if next_index < len(routes):
+                            self.failovers += 1
+                            _LOGGER.warning(
+                                "%s failed (%s), failing over to %s",
+                                routes[index].provider, err, routes[next_index].provider,
+                            )
+                            launch()
+                        continue
+                    winner = chunks
+                    on_winner(index, routes[index])
+                    break
+        finally:
+            # The slower streams lost the race; a stream that already has
+            # a chunk waiting is closed so it gives back its request slot
+            _discard_tasks(pending)
+            for task, (_, chunks) in pending.items():
+                if task.done():
+                    await chunks.aclose()
+
+        if winner is None:
+            assert last_error is not None
+            raise last_error
+
+        try:
+            yield first_chunk
+            async for chunk in winner:
+                yield chunk
+        finally:
+            await winner.aclose()
+
+    def _circuit_breaker(self, provider: str) -> CircuitBreaker:
+        """Return the circuit breaker of a provider."""
+        if provider not in self._circuit_breakers:
+            self._circuit_breakers[provider] = CircuitBreaker(provider)
+        return self._circuit_breakers[provider]
+
+    def _retry_delay(self, attempt: int, retry_after: Optional[float]) -> Optional[float]:
+        """Return the delay before the next attempt, or None to give up.
+
+        Exponential backoff with jitter, never shorter than the provider's
+        Retry-After. A Retry-After beyond the maximum delay is not waited
+        out; the error is surfaced instead.
+        """
+        ceiling = min(DEFAULT_RETRY_MAX_DELAY, DEFAULT_RETRY_BASE_DELAY * 2 ** attempt)
+        backoff = ceiling / 2 + random.uniform(0, ceiling / 2)
+        if retry_after is None:
+            return backoff
+        if retry_after > DEFAULT_RETRY_MAX_DELAY:
+            return None
+        return max(retry_after, backoff)
+
+    async def _call_with_retries(
+        self,
+        route: ProviderRoute,
+        priority: int,
+        estimated_tokens: int,
+        call: Callable[[], Awaitable[ProviderCompletion]],
+    ) -> ProviderCompletion:
+        """Run a provider call with retries and the circuit breaker."""
+        breaker = self._circuit_breaker(route.provider)
+        attempt = 0
+        while True:
+            probe = breaker.before_call()
+            try:
+                # Every attempt is admitted by the scheduler, so retries
+                # also respect the priority order and rate limits
+                async with self._scheduler.slot(
+                    route.provider, priority, estimated_tokens
+                ) as slot:
+                    started = time.monotonic()
+                    result = await call()
+                    slot.tokens_used = result.tokens_used
+            except SchedulerOverloadedError:
+                raise
+            except Exception as err:
+                if not _is_retryable(err):
+                    # The provider answered; the request itself was bad
+                    breaker.record_success()
+                    raise
+                breaker.record_failure()
+                delay = self._retry_delay(attempt, _retry_after(err))
+                if attempt >= DEFAULT_MAX_RETRIES or delay is None:
+                    raise
+                _LOGGER.warning(
+                    "%s request failed (%s), retrying in %.1fs",
+                    route.provider, err, delay,
+                )
+                await asyncio.sleep(delay)
+                attempt += 1
+            else:
+                elapsed = time.monotonic() - started
+                route.latency.record(elapsed)
+                self._metrics.record_provider_latency(route.provider, elapsed)
+                self._record_usage(route, result)
+                breaker.record_success()
+                return result
+            finally:
+                # A probe that was cancelled or shed lets the next one through
+                if probe:
+                    breaker.end_probe()
+
+    async def _stream_with_retries(
+        self,
+        route: ProviderRoute,
+        priority: int,
+        estimated_tokens: int,
+        open_stream: Callable[[], AsyncIterator[ProviderCompletion]],
+    ) -> AsyncIterator[ProviderCompletion]:
+        """Stream a provider call with retries and the circuit breaker.
+
+        Only failures before the first chunk are retried; once text has
+        been delivered to the caller a failure is surfaced as is.
+        """
+        breaker = self._circuit_breaker(route.provider)
+        attempt = 0
+        while True:
+            probe = breaker.before_call()
+            started = False
+            try:
+                slot = await self._scheduler.acquire(
+                    route.provider, priority, estimated_tokens
+                )
+                # The slot is freed in a plain finally rather than by the
+                # slot() context manager, so closing this generator at its
+                # yield gives the slot back at once
+                try:
+                    start_time = time.monotonic()
+                    async with aclosing(open_stream()) as chunks:
+                        async for chunk in chunks:
+                            if not started:
+                                route.first_chunk_latency.record(
+                                    time.monotonic() - start_time
+                                )
+                            started = True
+                            if chunk.tokens_used is not None:
+                                slot.tokens_used = chunk.tokens_used
+                            self._record_usage(route, chunk)
+                            yield chunk
+                finally:
+                    self._scheduler.release(slot)
+            except SchedulerOverloadedError:
+                raise
+            except Exception as err:
+                if not _is_retryable(err):
+                    breaker.record_success()
+                    raise
+                breaker.record_failure()
+                delay = self._retry_delay(attempt, _retry_after(err))
+                if started or attempt >= DEFAULT_MAX_RETRIES or delay is None:
+                    raise
+                _LOGGER.warning(
+                    "%s stream failed (%s), retrying in %.1fs",
+                    route.provider, err, delay,
+                )
+                await asyncio.sleep(delay)
+                attempt += 1
+            else:
+                elapsed = time.monotonic() - start_time
+                route.latency.record(elapsed)
+                self._metrics.record_provider_latency(route.provider, elapsed)
+                breaker.record_success()
+                return
+            finally:
+                if probe:
+                    breaker.end_probe()
+
     async def generate_config(
         self,
         prompt: str,
         system_prompt: Optional[str] = None,
         model: Optional[str] = None,
+        task: str = TASK_GENERATE,
+        config_type: Optional[str] = None,
         **kwargs
-    ) -> LLMResponse:
-        """Generate configuration using the LLM."""
+    ) -> Union[LLMResponse, LLMStream]:
+        """Generate configuration using the LLM.
+
+        Without an explicit ``model`` the model is chosen for the task.
+        The system prompt is marked as a cache breakpoint, so it should
+        hold only what stays the same between requests.
+        """
+        model = model or self.model_for(task, config_type, prompt)
         messages = []
         
         if system_prompt:
-            messages.append(LLMMessage(role="system", content=system_prompt))
+            messages.append(
+                LLMMessage(role="system", content=system_prompt, cache_breakpoint=True)
+            )
         
         messages.append(LLMMessage(role="user", content=prompt))
 
         return await self.generate_completion(
             messages=messages,
             model=model,
+            task=task,
             **kwargs
         )
 
@@ -216,11 +1099,59 @@ class LLMClientManager:
         """
 
         user_prompt = f"Validate this {config_type} configuration:\n\n```yaml\n{config_yaml}\n```"
+        kwargs.setdefault("priority", PRIORITY_VALIDATION)
+
+        return await self.generate_config(
+            prompt=user_prompt,
+            system_prompt=system_prompt,
+            model=model,
+            task=TASK_VALIDATE,
+            config_type=config_type,
+            **kwargs
+        )
+
+    async def validate_configs(
+        self,
+        configs: List[Tuple[int, str]],
+        config_type: str,
+        model: Optional[str] = None,
+        **kwargs
+    ) -> LLMResponse:
+        """Validate several configurations in one request.
+
+        ``configs`` pairs each configuration with the index it is reported
+        under in the response's ``results`` list.
+        """
+        system_prompt = f"""You are a Home Assistant configuration validator.
+        Analyze each of the following {config_type} YAML configurations and identify any errors, warnings, or suggestions.
+        
+        Return your response in this JSON format, with one entry per configuration:
+        {{
+            "results": [
+                {{
+                    "index": <configuration number>,
+                    "valid": true/false,
+                    "errors": ["list of errors"],
+                    "warnings": ["list of warnings"],
+                    "suggestions": ["list of improvements"]
+                }}
+            ]
+        }}
+        """
+
+        user_prompt = "\n\n".join(
+            f"Configuration {index}:\n```yaml\n{config_yaml}\n```"
+            for index, config_yaml in configs
+        )
+        kwargs.setdefault("priority", PRIORITY_VALIDATION)
+        kwargs.setdefault("max_tokens", BATCH_VALIDATION_TOKENS_PER_ITEM * len(configs))
 
         return await self.generate_config(
             prompt=user_prompt,
             system_prompt=system_prompt,
             model=model,
+            task=TASK_VALIDATE,
+            config_type=config_type,
             **kwargs
         )
 
@@ -253,6 +1184,8 @@ Provide the updated configuration:"""
             prompt=user_prompt,
             system_prompt=system_prompt,
             model=model,
+            task=TASK_IMPROVE,
+            config_type=config_type,
             **kwargs
         )
 
@@ -270,21 +1203,17 @@ Provide the updated configuration:"""
         """
 
         user_prompt = f"Explain this {config_type} configuration:\n\n```yaml\n{config_yaml}\n```"
+        kwargs.setdefault("priority", PRIORITY_EXPLANATION)
 
         return await self.generate_config(
             prompt=user_prompt,
             system_prompt=system_prompt,
             model=model,
+            task=TASK_EXPLAIN,
+            config_type=config_type,
             **kwargs
         )
 
-    async def cleanup(self) -> None:
-        """Clean up resources."""
-        self._litellm = None
-        self._provider = None
-        self._api_key = None
-        _LOGGER.info("LLM client cleaned up")
-    
     async def get_available_models(self) -> List[str]:
         """Get list of available models for the current provider."""
         if not self._provider:
@@ -303,19 +1232,24 @@ Provide the updated configuration:"""
             "mistral": ["mistral-large-latest", "mistral-medium-latest", "mistral-small-latest"],
             "groq": ["llama3-70b-8192", "llama3-8b-8192", "mixtral-8x7b-32768"],
             "ollama": ["llama2", "llama3", "mistral", "codellama"],
+            "mock": [MOCK_MODEL],
         }
 
         return model_mappings.get(self._provider, [self._default_model])
 
     async def cleanup(self) -> None:
         """Clean up resources."""
-        if self._session and not self._session.closed:
-            await self._session.close()
-        
+        if self._preload_task and not self._preload_task.done():
+            self._preload_task.cancel()
+        if self._session is not None:
+            # Home Assistant owns the connector; detach rather than close
+            self._session.detach()
+            self._session = None
+        self._routes = []
         self._provider = None
         self._api_key = None
         self._default_model = None
-        self._litellm = None
+        _LOGGER.info("LLM client cleaned up")
 
     @property
     def is_configured(self) -> bool:
@@ -323,9 +1257,62 @@ Provide the updated configuration:"""
         return (
             self._provider is not None 
             and self._api_key is not None 
-            and self._litellm is not None
+            and bool(self._routes)
         )
 
+    @property
+    def circuit_states(self) -> Dict[str, str]:
+        """Get the circuit breaker state of each provider used so far."""
+        return {
+            provider: breaker.state
+            for provider, breaker in self._circuit_breakers.items()
+        }
+
+    @property
+    def provider_stats(self) -> Dict[str, Any]:
+        """Get latency and prompt caching per provider and the hedging counters."""
+        return {
+            "providers": {
+                route.provider: {
+                    **route.latency.as_dict(),
+                    "first_chunk": route.first_chunk_latency.as_dict(),
+                    "hedge_delay_s": round(route.latency.hedge_delay(), 2),
+                    "prompt_cache": route.cache_stats(),
+                    "server_timings": route.server_timings,
+                }
+                for route in self._routes
+            },
+            "hedged_requests": self.hedged_requests,
+            "failovers": self.failovers,
+        }
+
+    def model_for(
+        self,
+        task: str,
+        config_type: Optional[str] = None,
+        prompt: Optional[str] = None,
+    ) -> Optional[str]:
+        """Return the model configured or routed for a kind of request."""
+        return self._router.model_for(task, config_type, prompt)
+
+    @property
+    def task_stats(self) -> Dict[str, Any]:
+        """Get latency and token usage per task, and the model routing."""
+        return {
+            "tasks": {task: stats.as_dict() for task, stats in self._task_stats.items()},
+            "routing": self._router.stats,
+        }
+
+    @property
+    def scheduler_stats(self) -> Dict[str, Any]:
+        """Get the request queue depth and queue waits per priority."""
+        return self._scheduler.stats
+
+    @property
+    def coalesced_calls(self) -> int:
+        """Return how many completions joined an identical one in flight."""
+        return self._in_flight.coalesced
+
     @property
     def provider(self) -> Optional[str]:
         """Get the current provider."""
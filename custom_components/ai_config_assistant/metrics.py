@@ -0,0 +1,204 @@
+"""In-memory performance metrics for AI Configuration Assistant."""
+import bisect
+import math
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from .const import (
+    METRICS_BUCKET_GROWTH,
+    METRICS_MAX_LATENCY_MS,
+    METRICS_MIN_LATENCY_MS,
+    METRICS_WINDOW,
+    OLLAMA_TIMING_PHASES,
+)
+from .prompt_builder import estimate_cost
+
+
+def _bucket_bounds() -> List[float]:
+    """Return the upper bounds of the latency buckets in milliseconds."""
+    bounds = [METRICS_MIN_LATENCY_MS]
+    while bounds[-1] < METRICS_MAX_LATENCY_MS:
+        bounds.append(bounds[-1] * METRICS_BUCKET_GROWTH)
+    return bounds
+
+
+# Shared by every histogram; about 80 buckets, each within 15% of its neighbour
+_BOUNDS = _bucket_bounds()
+
+
+def _bucket_value(index: int) -> float:
+    """Return the geometric middle of a bucket in milliseconds."""
+    if index == 0:
+        return _BOUNDS[0]
+    # The overflow bucket has no upper bound; report the largest one
+    upper = _BOUNDS[min(index, len(_BOUNDS) - 1)]
+    return round(upper / math.sqrt(METRICS_BUCKET_GROWTH), 1)
+
+
+class Histogram:
+    """Latency histogram over a sliding window, with fixed log-spaced buckets.
+
+    Recording is a bisect and an increment and the memory is constant, no
+    matter how many samples arrive. Percentiles are read from the buckets
+    of the current and the previous window, so they follow recent latency
+    within the bucket resolution.
+    """
+
+    def __init__(self, window: float = METRICS_WINDOW) -> None:
+        """Initialize the histogram."""
+        self._window = window
+        self._current = [0] * (len(_BOUNDS) + 1)
+        self._previous = [0] * (len(_BOUNDS) + 1)
+        self._window_start = time.monotonic()
+        self.count = 0
+
+    def _rotate(self) -> None:
+        """Start a new window once the current one is over."""
+        elapsed = time.monotonic() - self._window_start
+        if elapsed < self._window:
+            return
+        # After a whole idle window the previous one is stale as well
+        self._previous = self._current if elapsed < 2 * self._window else [0] * len(self._current)
+        self._current = [0] * len(self._current)
+        self._window_start = time.monotonic()
+
+    def record(self, seconds: float) -> None:
+        """Record a duration."""
+        self._rotate()
+        self._current[bisect.bisect_left(_BOUNDS, seconds * 1000)] += 1
+        self.count += 1
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Return a percentile in milliseconds, or None without recent samples."""
+        self._rotate()
+        counts = [a + b for a, b in zip(self._current, self._previous)]
+        total = sum(counts)
+        if not total:
+            return None
+        rank = fraction * total
+        seen = 0
+        for index, count in enumerate(counts):
+            seen += count
+            if seen >= rank:
+                return _bucket_value(index)
+        return _bucket_value(len(counts) - 1)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the p50 and p95 in milliseconds and the sample count."""
+        return {
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "samples": self.count,
+        }
+
+
+class IntegrationMetrics:
+    """Request counts, latency histograms, token usage and spend.
+
+    Generation requests are timed per pipeline stage; LLM requests are
+    timed per provider and their usage priced with ``estimate_cost``.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self.requests = 0
+        self.errors = 0
+        self.llm_requests = 0
+        self.llm_errors = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.estimated_cost = 0.0
+        self.stages: Dict[str, Histogram] = defaultdict(Histogram)
+        self.providers: Dict[str, Histogram] = defaultdict(Histogram)
+        # Phases reported by local servers, keyed "<provider>_<phase>"
+        self.server_phases: Dict[str, Histogram] = defaultdict(Histogram)
+
+    @contextmanager
+    def time_stage(self, stage: str) -> Iterator[None]:
+        """Time a block as one stage of the generation pipeline.
+
+        Blocks that raise are not recorded, so failures and cancellations
+        do not skew the latency.
+        """
+        started = time.monotonic()
+        yield
+        self.record_stage(stage, time.monotonic() - started)
+
+    def record_stage(self, stage: str, seconds: float) -> None:
+        """Record the duration of a stage of the generation pipeline."""
+        self.stages[stage].record(seconds)
+
+    def record_request(self, success: bool) -> None:
+        """Count a finished generation request."""
+        self.requests += 1
+        if not success:
+            self.errors += 1
+
+    def record_llm_request(
+        self,
+        provider: Optional[str],
+        model: Optional[str],
+        prompt_tokens: Optional[int],
+        completion_tokens: Optional[int],
+        cached_tokens: Optional[int] = None,
+    ) -> None:
+        """Count a successful LLM request and add its usage and cost."""
+        self.llm_requests += 1
+        self.prompt_tokens += prompt_tokens or 0
+        self.completion_tokens += completion_tokens or 0
+        cost = estimate_cost(provider, model, prompt_tokens, completion_tokens, cached_tokens)
+        if cost:
+            self.estimated_cost += cost
+
+    def record_llm_error(self) -> None:
+        """Count a failed LLM request."""
+        self.llm_requests += 1
+        self.llm_errors += 1
+
+    def record_provider_latency(self, provider: str, seconds: float) -> None:
+        """Record how long a provider took to answer."""
+        self.providers[provider].record(seconds)
+
+    def record_server_timings(self, provider: str, timings: Dict[str, float]) -> None:
+        """Record the model load and evaluation times a local server reported."""
+        for phase in OLLAMA_TIMING_PHASES:
+            if phase in timings:
+                self.server_phases[f"{provider}_{phase}"].record(timings[phase])
+
+    @staticmethod
+    def _rate(errors: int, requests: int) -> float:
+        """Return an error rate in percent."""
+        return round(errors / requests * 100, 1) if requests else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        """Return the percentage of generation requests that failed."""
+        return self._rate(self.errors, self.requests)
+
+    @property
+    def llm_error_rate(self) -> float:
+        """Return the percentage of LLM requests that failed."""
+        return self._rate(self.llm_errors, self.llm_requests)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return all metrics, with latency in milliseconds."""
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "error_rate": self.error_rate,
+            "llm_requests": self.llm_requests,
+            "llm_errors": self.llm_errors,
+            "llm_error_rate": self.llm_error_rate,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "estimated_cost": round(self.estimated_cost, 6),
+            "stages": {stage: hist.as_dict() for stage, hist in self.stages.items()},
+            "providers": {
+                provider: hist.as_dict() for provider, hist in self.providers.items()
+            },
+            "server_phases": {
+                phase: hist.as_dict() for phase, hist in self.server_phases.items()
+            },
+        }
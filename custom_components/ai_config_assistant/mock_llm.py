@@ -0,0 +1,288 @@
+"""Deterministic mock LLM for AI Configuration Assistant load testing.
+
+Replays recorded responses with configurable latency, token rate and
+error injection. ``MockReplay`` backs the built-in ``mock`` provider; run
+this module to serve the same replay as an OpenAI-compatible server:
+
+    python -m custom_components.ai_config_assistant.mock_llm \\
+        --recordings recordings.json --latency 0.8 --tokens-per-second 40
+
+and point the ``openai`` provider's API base at ``http://127.0.0.1:8089/v1``.
+
+A recordings file is a JSON object with the profile fields below and a
+``responses`` list of ``{"match": "<regex>", "content": "<reply>"}``
+entries. The first response whose pattern occurs in the last user
+message is replayed; requests matching none get one of the responses
+without a pattern, picked by a stable hash of the request.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import re
+import time
+from dataclasses import dataclass, field, fields
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+from .const import (
+    EXPLANATION_MARKER,
+    MOCK_DEFAULT_ERROR_RATE,
+    MOCK_DEFAULT_ERROR_STATUS,
+    MOCK_DEFAULT_LATENCY,
+    MOCK_DEFAULT_TOKENS_PER_SECOND,
+    MOCK_MODEL,
+    MOCK_SERVER_PORT,
+)
+from .prompt_builder import count_message_tokens, count_tokens
+
+_LOGGER = logging.getLogger(__name__)
+
+# Replayed when no recordings are configured; follows the response format
+# the generation prompts ask for
+_DEFAULT_RESPONSE = f"""```yaml
+alias: Mock automation
+description: Replayed by the mock LLM provider
+trigger:
+  - platform: time
+    at: "07:00:00"
+action:
+  - service: light.turn_on
+    target:
+      entity_id: light.living_room
+mode: single
+```
+{EXPLANATION_MARKER} This automation turns on the living room light at 7:00 every day.
+"""
+
+# Stream chunks split after whitespace, so each carries about one word
+_CHUNK_RE = re.compile(r"\S+\s*|\s+")
+
+
+@dataclass
+class MockProfile:
+    """Timing, failure behaviour and recorded responses of the mock LLM.
+
+    ``latency`` is the time to the first token and ``jitter`` the largest
+    random addition to it; the completion then arrives at
+    ``tokens_per_second`` (0 for instantly). ``error_rate`` of requests
+    fail with HTTP ``error_status``. ``seed`` makes jitter and errors
+    repeatable.
+    """
+    latency: float = MOCK_DEFAULT_LATENCY
+    jitter: float = 0.0
+    tokens_per_second: float = MOCK_DEFAULT_TOKENS_PER_SECOND
+    error_rate: float = MOCK_DEFAULT_ERROR_RATE
+    error_status: int = MOCK_DEFAULT_ERROR_STATUS
+    seed: int = 0
+    responses: List[Dict[str, str]] = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "MockProfile":
+        """Create a profile from a recordings file's contents."""
+        known = {f.name for f in fields(cls)}
+        return cls(**{key: value for key, value in data.items() if key in known})
+
+
+def load_profile(path: str) -> MockProfile:
+    """Read a recordings file."""
+    with open(path, encoding="utf-8") as file:
+        return MockProfile.from_dict(json.load(file))
+
+
+class MockError(Exception):
+    """An injected failure, carrying the HTTP status to report."""
+
+    def __init__(self, status: int) -> None:
+        """Initialize the error."""
+        super().__init__(f"Injected mock failure (HTTP {status})")
+        self.status = status
+
+
+class MockReplay:
+    """Pick and pace the replayed response for each request."""
+
+    def __init__(self, profile: Optional[MockProfile] = None) -> None:
+        """Initialize the replay."""
+        self.profile = profile or MockProfile()
+        self._rng = random.Random(self.profile.seed)
+        self._patterns: List[Tuple[re.Pattern, str]] = []
+        self._fallbacks: List[str] = []
+        for response in self.profile.responses:
+            if response.get("match"):
+                self._patterns.append(
+                    (re.compile(response["match"], re.IGNORECASE), response["content"])
+                )
+            else:
+                self._fallbacks.append(response["content"])
+        if not self._fallbacks:
+            self._fallbacks.append(_DEFAULT_RESPONSE)
+        self.requests = 0
+        self.failures = 0
+
+    def pick(self, messages: List[Dict[str, Any]]) -> str:
+        """Return the recorded response for a request."""
+        request = next(
+            (m["content"] for m in reversed(messages) if m["role"] == "user"), ""
+        )
+        for pattern, content in self._patterns:
+            if pattern.search(request):
+                return content
+        digest = hashlib.sha256(request.encode("utf-8")).digest()
+        return self._fallbacks[int.from_bytes(digest[:4], "big") % len(self._fallbacks)]
+
+    def start(self) -> float:
+        """Count a request; return its first-token delay or raise an injected error."""
+        self.requests += 1
+        if self.profile.error_rate and self._rng.random() < self.profile.error_rate:
+            self.failures += 1
+            raise MockError(self.profile.error_status)
+        return self.profile.latency + self._rng.uniform(0, self.profile.jitter)
+
+    def token_delay(self, tokens: int) -> float:
+        """Return the time it takes to produce ``tokens`` tokens."""
+        if self.profile.tokens_per_second <= 0:
+            return 0.0
+        return tokens / self.profile.tokens_per_second
+
+    @staticmethod
+    def usage(messages: List[Dict[str, Any]], content: str) -> Tuple[int, int]:
+        """Return the prompt and completion token counts of a reply."""
+        return count_message_tokens(messages), count_tokens(content)
+
+    async def async_complete(self, messages: List[Dict[str, Any]]) -> str:
+        """Wait as long as the profile says and return the whole reply."""
+        content = self.pick(messages)
+        await asyncio.sleep(self.start() + self.token_delay(count_tokens(content)))
+        return content
+
+    async def async_stream(self, messages: List[Dict[str, Any]]) -> AsyncIterator[str]:
+        """Yield the reply in word-sized chunks at the profile's token rate."""
+        content = self.pick(messages)
+        await asyncio.sleep(self.start())
+        for chunk in _CHUNK_RE.findall(content):
+            await asyncio.sleep(self.token_delay(count_tokens(chunk)))
+            yield chunk
+
+
+def create_app(replay: MockReplay) -> web.Application:
+    """Create an OpenAI-compatible chat completions server for a replay."""
+
+    async def chat_completions(request: web.Request) -> web.StreamResponse:
+        """Answer a chat completion request, streamed or not."""
+        body = await request.json()
+        messages = body.get("messages", [])
+        model = body.get("model", MOCK_MODEL)
+        completion_id = f"chatcmpl-mock-{replay.requests}"
+        try:
+            if not body.get("stream"):
+                content = await replay.async_complete(messages)
+                prompt_tokens, completion_tokens = replay.usage(messages, content)
+                return web.json_response({
+                    "id": completion_id,
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }],
+                    "usage": {
+                        "prompt_tokens": prompt_tokens,
+                        "completion_tokens": completion_tokens,
+                        "total_tokens": prompt_tokens + completion_tokens,
+                    },
+                })
+
+            chunks = replay.async_stream(messages)
+            # Surface an injected error as a status, before any bytes are sent
+            first = await chunks.__anext__()
+        except MockError as err:
+            return web.json_response(
+                {"error": {"message": str(err), "type": "mock_error"}},
+                status=err.status,
+                headers={"Retry-After": "1"} if err.status == 429 else None,
+            )
+
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        parts = [first]
+
+        async def send(data: Dict[str, Any]) -> None:
+            """Write one server-sent event."""
+            await response.write(f"data: {json.dumps(data)}\n\n".encode("utf-8"))
+
+        def chunk_event(delta: Dict[str, Any], finish_reason: Optional[str]) -> Dict[str, Any]:
+            """Build a streamed completion chunk."""
+            return {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+
+        await send(chunk_event({"role": "assistant", "content": first}, None))
+        async for chunk in chunks:
+            parts.append(chunk)
+            await send(chunk_event({"content": chunk}, None))
+        prompt_tokens, completion_tokens = replay.usage(messages, "".join(parts))
+        await send({
+            **chunk_event({}, "stop"),
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        })
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+    async def models(request: web.Request) -> web.Response:
+        """List the single mock model."""
+        return web.json_response(
+            {"object": "list", "data": [{"id": MOCK_MODEL, "object": "model"}]}
+        )
+
+    async def stats(request: web.Request) -> web.Response:
+        """Report how many requests were served and failed on purpose."""
+        return web.json_response(
+            {"requests": replay.requests, "failures": replay.failures}
+        )
+
+    app = web.Application()
+    app.router.add_post("/v1/chat/completions", chat_completions)
+    app.router.add_get("/v1/models", models)
+    app.router.add_get("/stats", stats)
+    return app
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run the mock server from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recordings", help="JSON recordings file")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=MOCK_SERVER_PORT)
+    parser.add_argument("--latency", type=float, help="seconds to the first token")
+    parser.add_argument("--jitter", type=float, help="largest random extra latency")
+    parser.add_argument("--tokens-per-second", type=float, help="0 sends the reply at once")
+    parser.add_argument("--error-rate", type=float, help="fraction of requests to fail")
+    parser.add_argument("--error-status", type=int, help="HTTP status of injected failures")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    profile = load_profile(args.recordings) if args.recordings else MockProfile()
+    for name in ("latency", "jitter", "tokens_per_second", "error_rate", "error_status", "seed"):
+        if getattr(args, name) is not None:
+            setattr(profile, name, getattr(args, name))
+
+    logging.basicConfig(level=logging.INFO)
+    web.run_app(create_app(MockReplay(profile)), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Per-task model selection for AI Configuration Assistant."""
+import logging
+from collections import defaultdict
+from typing import Any, Dict, Optional
+
+from .const import (
+    ROUTER_MAX_SMALL_PROMPT_TOKENS,
+    ROUTER_SIMPLE_CONFIG_TYPES,
+    ROUTER_SMALL_TASKS,
+    SMALL_MODELS,
+    TASK_GENERATE,
+)
+from .prompt_builder import count_tokens
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ModelRouter:
+    """Choose the model for each kind of request.
+
+    A model configured for the task always wins. Otherwise, with automatic
+    routing on, explanations, validation and short requests for simple
+    config types go to the provider's small model; everything else uses
+    the default model.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the router."""
+        self._default_model: Optional[str] = None
+        self._small_model: Optional[str] = None
+        self._task_models: Dict[str, str] = {}
+        self._auto_route = False
+        self.routed: Dict[str, int] = defaultdict(int)
+
+    def configure(
+        self,
+        provider: str,
+        default_model: Optional[str],
+        task_models: Optional[Dict[str, Optional[str]]] = None,
+        auto_route: bool = False,
+    ) -> None:
+        """Set the default model, per-task overrides and automatic routing."""
+        self._default_model = default_model
+        self._small_model = SMALL_MODELS.get(provider)
+        # Empty option values mean "use the default"
+        self._task_models = {
+            task: model for task, model in (task_models or {}).items() if model
+        }
+        self._auto_route = auto_route
+
+    def model_for(
+        self,
+        task: str,
+        config_type: Optional[str] = None,
+        prompt: Optional[str] = None,
+    ) -> Optional[str]:
+        """Return the model to use for a request."""
+        if task in self._task_models:
+            return self._task_models[task]
+        if self._auto_route and self._small_model and self._is_simple(task, config_type, prompt):
+            self.routed[task] += 1
+            return self._small_model
+        return self._default_model
+
+    def _is_simple(
+        self, task: str, config_type: Optional[str], prompt: Optional[str]
+    ) -> bool:
+        """Return True if the small model is good enough for the request."""
+        if task in ROUTER_SMALL_TASKS:
+            return True
+        return (
+            task == TASK_GENERATE
+            and config_type in ROUTER_SIMPLE_CONFIG_TYPES
+            and prompt is not None
+            and count_tokens(prompt, self._default_model) <= ROUTER_MAX_SMALL_PROMPT_TOKENS
+        )
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Return the routing settings and how many requests were routed."""
+        return {
+            "auto_route": self._auto_route,
+            "small_model": self._small_model if self._auto_route else None,
+            "task_models": dict(self._task_models),
+            "routed_to_small_model": dict(self.routed),
+        }
@@ -0,0 +1,191 @@
+"""Token counting and budgeted prompt assembly for AI Configuration Assistant."""
+import math
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .const import (
+    CACHED_PROMPT_PRICE_RATIO,
+    MODEL_FAMILY_CHARS_PER_TOKEN,
+    MODEL_PRICES,
+    UNMETERED_PROVIDERS,
+)
+
+# Words and single punctuation marks; tokenizers split roughly along these
+_PIECE_RE = re.compile(r"\w+|[^\w\s]")
+
+# Tokens the chat format adds around every message
+_MESSAGE_OVERHEAD = 4
+
+# Model name fragments identifying each tokenizer family
+_FAMILY_MARKERS = (
+    ("claude", "anthropic"),
+    ("gpt", "openai"),
+    ("o1", "openai"),
+    ("o3", "openai"),
+    ("gemini", "gemini"),
+    ("mistral", "mistral"),
+    ("mixtral", "mistral"),
+    ("codestral", "mistral"),
+    ("llama", "llama"),
+)
+
+
+def model_family(model: Optional[str]) -> str:
+    """Return the tokenizer family of a model name."""
+    name = _bare_model_name(model)
+    for marker, family in _FAMILY_MARKERS:
+        if name.startswith(marker) or f"-{marker}" in name:
+            return family
+    return "default"
+
+
+def _bare_model_name(model: Optional[str]) -> str:
+    """Strip routing prefixes like ``openai/`` from a model name."""
+    return (model or "").lower().rsplit("/", 1)[-1]
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """Approximate the token count of ``text`` for the model's tokenizer.
+
+    Words are split into sub-word tokens at the family's average token
+    length and every punctuation mark counts as one token; this tracks BPE
+    tokenizers within a few percent without loading their vocabularies.
+    """
+    chars_per_token = MODEL_FAMILY_CHARS_PER_TOKEN.get(
+        model_family(model), MODEL_FAMILY_CHARS_PER_TOKEN["default"]
+    )
+    tokens = 0
+    for piece in _PIECE_RE.findall(text):
+        if len(piece) == 1:
+            tokens += 1
+        else:
+            tokens += math.ceil(len(piece) / chars_per_token)
+    return tokens
+
+
+def count_message_tokens(
+    messages: Iterable[Dict[str, str]], model: Optional[str] = None
+) -> int:
+    """Approximate the prompt tokens of a chat request."""
+    return sum(
+        count_tokens(message["content"], model) + _MESSAGE_OVERHEAD
+        for message in messages
+    )
+
+
+def estimate_cost(
+    provider: Optional[str],
+    model: Optional[str],
+    prompt_tokens: Optional[int],
+    completion_tokens: Optional[int],
+    cached_tokens: Optional[int] = None,
+) -> Optional[float]:
+    """Estimate the cost of a request in US dollars, or None if unknown.
+
+    ``cached_tokens`` of the prompt tokens were read from the provider's
+    prompt cache and are charged at the discounted rate.
+    """
+    if provider in UNMETERED_PROVIDERS:
+        return 0.0
+    if prompt_tokens is None and completion_tokens is None:
+        return None
+
+    name = _bare_model_name(model)
+    # Longest matching prefix wins, so gpt-4o-mini is not priced as gpt-4o
+    prefixes = [prefix for prefix in MODEL_PRICES if name.startswith(prefix)]
+    if not prefixes:
+        return None
+    input_price, output_price = MODEL_PRICES[max(prefixes, key=len)]
+    cached_ratio = CACHED_PROMPT_PRICE_RATIO.get(
+        model_family(model), CACHED_PROMPT_PRICE_RATIO["default"]
+    )
+    cached = min(cached_tokens or 0, prompt_tokens or 0)
+    input_tokens = (prompt_tokens or 0) - cached + cached * cached_ratio
+    cost = (input_tokens * input_price + (completion_tokens or 0) * output_price) / 1_000_000
+    return round(cost, 6)
+
+
+@dataclass
+class PromptPlan:
+    """A prompt assembled within a token budget.
+
+    ``text`` is the system prompt, which stays the same across requests
+    for the same entities and can be cached by the provider; ``request``
+    is the user message carrying the volatile context and the request.
+    """
+    text: str
+    request: str
+    tokens: int
+    entities_included: List[str]
+    entities_dropped: List[str]
+
+
+def build_budgeted_prompt(
+    template: str,
+    request_template: str,
+    fields: Dict[str, str],
+    entity_lines: Dict[str, str],
+    state_lines: Dict[str, str],
+    budget: int,
+    model: Optional[str] = None,
+) -> PromptPlan:
+    """Fill the entity slots of a prompt within a token budget.
+
+    ``entity_lines`` maps entity IDs to their line in the ``{entities}``
+    slot of the system prompt, most relevant first; ``state_lines`` maps
+    entity IDs to their line in the ``{current_states}`` slot of the
+    request. Entities are added in relevance order, each costing both
+    lines, until the budget is spent; the remaining, lowest-ranked ones are
+    left out and summarized in a single line. Included entities are listed
+    by entity ID, so the same selection always gives the same prefix.
+    """
+    # States of entities outside the inventory are always listed
+    extra_states = [
+        line for entity_id, line in state_lines.items() if entity_id not in entity_lines
+    ]
+
+    def fill(entities: List[str], states: List[str]) -> Tuple[str, str]:
+        """Format the system prompt and the request."""
+        return (
+            template.format(entities="\n".join(entities), **fields),
+            request_template.format(current_states="\n".join(states), **fields),
+        )
+
+    text, request = fill([], extra_states)
+    remaining = budget - count_tokens(text, model) - count_tokens(request, model)
+
+    included: List[str] = []
+    entity_ids = list(entity_lines)
+    for entity_id in entity_ids:
+        lines = [entity_lines[entity_id]]
+        if entity_id in state_lines:
+            lines.append(state_lines[entity_id])
+        # Each line also costs its newline
+        line_tokens = sum(count_tokens(line, model) + 1 for line in lines)
+        if line_tokens > remaining:
+            break
+        included.append(entity_id)
+        remaining -= line_tokens
+
+    dropped = entity_ids[len(included):]
+    listed = sorted(included)
+    entities = [entity_lines[entity_id] for entity_id in listed]
+    if dropped:
+        entities.append(f"- ({len(dropped)} less relevant entities omitted)")
+    if not entities:
+        entities.append("No specific entities identified")
+    states = [
+        state_lines[entity_id] for entity_id in listed if entity_id in state_lines
+    ] + extra_states
+    if not states:
+        states.append("No current states available")
+
+    text, request = fill(entities, states)
+    return PromptPlan(
+        text=text,
+        request=request,
+        tokens=count_tokens(text, model) + count_tokens(request, model),
+        entities_included=included,
+        entities_dropped=dropped,
+    )
@@ -0,0 +1,879 @@
+"""Provider backends for AI Configuration Assistant."""
+import abc
+import asyncio
+import json
+import logging
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
+
+import aiohttp
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    ANTHROPIC_API_VERSION,
+    DEFAULT_OLLAMA_KEEP_ALIVE,
+    DEFAULT_REQUEST_TIMEOUT,
+    MOCK_RECORDINGS_FILE,
+    OLLAMA_PRELOAD_TIMEOUT,
+    OLLAMA_TIMING_PHASES,
+    PROVIDER_API_BASES,
+    PROVIDER_WIRE_FORMATS,
+)
+
+from .mock_llm import MockError, MockProfile, MockReplay, load_profile
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ProviderError(Exception):
+    """Error returned by an LLM provider."""
+
+    def __init__(
+        self,
+        message: str,
+        status: Optional[int] = None,
+        retry_after: Optional[float] = None,
+    ) -> None:
+        """Initialize the error."""
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self) -> bool:
+        """Return True if the same request may succeed when retried."""
+        return self.status is not None and self.status >= 500
+
+
+class ProviderAuthenticationError(ProviderError):
+    """The provider rejected the API key."""
+
+
+class ProviderRateLimitError(ProviderError):
+    """The provider rate limited the request."""
+
+    @property
+    def retryable(self) -> bool:
+        """Rate limits clear up on their own."""
+        return True
+
+
+class ProviderQuotaError(ProviderRateLimitError):
+    """The account quota or credit is exhausted."""
+
+    @property
+    def retryable(self) -> bool:
+        """Retrying does not help until the account is topped up."""
+        return False
+
+
+class ProviderTimeoutError(ProviderError):
+    """The provider did not answer in time."""
+
+    @property
+    def retryable(self) -> bool:
+        """Timeouts are usually transient."""
+        return True
+
+
+class ProviderConnectionError(ProviderError):
+    """The provider could not be reached."""
+
+    @property
+    def retryable(self) -> bool:
+        """Connection failures are usually transient."""
+        return True
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given in seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (retry_at - dt_util.utcnow()).total_seconds())
+
+
+@dataclass
+class ProviderCompletion:
+    """Normalized completion returned by a backend."""
+    content: str
+    tokens_used: Optional[int] = None
+    finish_reason: Optional[str] = None
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    cached_tokens: Optional[int] = None
+    # Server-side phase durations in seconds, from backends reporting them
+    timings: Optional[Dict[str, float]] = None
+
+
+def _plain_messages(messages: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+    """Drop cache breakpoint markers for providers that cache prefixes on their own."""
+    return [{"role": m["role"], "content": m["content"]} for m in messages]
+
+
+class ProviderBackend(abc.ABC):
+    """Base class for LLM provider backends."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        provider: str,
+        api_key: Optional[str],
+        api_base: Optional[str] = None,
+    ) -> None:
+        """Initialize the backend."""
+        self.hass = hass
+        self.provider = provider
+        self._api_key = api_key
+        self._api_base = (api_base or PROVIDER_API_BASES.get(provider, "")).rstrip("/")
+
+    async def async_setup(self) -> None:
+        """Prepare the backend for use."""
+
+    @abc.abstractmethod
+    async def async_complete(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        **kwargs: Any,
+    ) -> ProviderCompletion:
+        """Run a chat completion."""
+
+    async def async_stream(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        **kwargs: Any,
+    ) -> AsyncIterator[ProviderCompletion]:
+        """Stream a chat completion as content deltas.
+
+        Each yielded completion carries the new text in ``content``; usage
+        and the finish reason arrive on whichever chunk reports them.
+        Backends without native streaming yield the whole completion once.
+        """
+        yield await self.async_complete(
+            model, messages, temperature, max_tokens, **kwargs
+        )
+
+    def _strip_provider_prefix(self, model: str) -> str:
+        """Strip a litellm-style "provider/" prefix from a model name."""
+        prefix = f"{self.provider}/"
+        if model.startswith(prefix):
+            return model[len(prefix):]
+        return model
+
+
+class HTTPProviderBackend(ProviderBackend):
+    """Backend talking to a provider over Home Assistant's shared HTTP session."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        provider: str,
+        api_key: Optional[str],
+        api_base: Optional[str] = None,
+        session: Optional[aiohttp.ClientSession] = None,
+    ) -> None:
+        """Initialize the backend.
+
+        ``session`` is the pooled keep-alive session to send requests on;
+        its owner detaches it. Without one, Home Assistant's shared session
+        is used.
+        """
+        super().__init__(hass, provider, api_key, api_base)
+        self._session: aiohttp.ClientSession = session or async_get_clientsession(hass)
+        self._timeout = aiohttp.ClientTimeout(total=DEFAULT_REQUEST_TIMEOUT)
+
+    def _headers(self) -> Dict[str, str]:
+        """Return the request headers."""
+        return {"Content-Type": "application/json"}
+
+    async def _post(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """POST a JSON payload and return the decoded JSON response."""
+        url = f"{self._api_base}{path}"
+        try:
+            async with self._session.post(
+                url, json=payload, headers=self._headers(), timeout=self._timeout
+            ) as resp:
+                if resp.status >= 400:
+                    body = await resp.text()
+                    raise self._error_for_status(resp.status, body, resp.headers)
+                return await resp.json(content_type=None)
+        except asyncio.TimeoutError as err:
+            raise ProviderTimeoutError(
+                f"{self.provider} request timed out after {DEFAULT_REQUEST_TIMEOUT}s"
+            ) from err
+        except aiohttp.ClientError as err:
+            raise ProviderConnectionError(
+                f"{self.provider} connection failed: {err}"
+            ) from err
+
+    async def _post_stream(
+        self, path: str, payload: Dict[str, Any]
+    ) -> AsyncIterator[str]:
+        """POST a JSON payload and yield the non-empty response lines."""
+        url = f"{self._api_base}{path}"
+        # No total timeout while streaming; only stalls between chunks abort
+        timeout = aiohttp.ClientTimeout(total=None, sock_read=DEFAULT_REQUEST_TIMEOUT)
+        try:
+            async with self._session.post(
+                url, json=payload, headers=self._headers(), timeout=timeout
+            ) as resp:
+                if resp.status >= 400:
+                    body = await resp.text()
+                    raise self._error_for_status(resp.status, body, resp.headers)
+                async for raw_line in resp.content:
+                    line = raw_line.decode("utf-8").strip()
+                    if line:
+                        yield line
+        except asyncio.TimeoutError as err:
+            raise ProviderTimeoutError(
+                f"{self.provider} stream stalled for {DEFAULT_REQUEST_TIMEOUT}s"
+            ) from err
+        except aiohttp.ClientError as err:
+            raise ProviderConnectionError(
+                f"{self.provider} connection failed: {err}"
+            ) from err
+
+    async def _post_sse(
+        self, path: str, payload: Dict[str, Any]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """POST a JSON payload and yield the decoded server-sent events."""
+        async for line in self._post_stream(path, payload):
+            if not line.startswith("data:"):
+                continue
+            data = line[len("data:"):].strip()
+            if data == "[DONE]":
+                return
+            yield json.loads(data)
+
+    def _error_for_status(
+        self, status: int, body: str, headers: Any
+    ) -> ProviderError:
+        """Map an HTTP error status to a provider error."""
+        message = f"{self.provider} returned HTTP {status}: {body[:300]}"
+        if status in (401, 403):
+            return ProviderAuthenticationError(message, status)
+        if status == 429:
+            if "insufficient_quota" in body or "credit" in body.lower():
+                return ProviderQuotaError(message, status)
+            return ProviderRateLimitError(
+                message, status, parse_retry_after(headers.get("Retry-After"))
+            )
+        if status in (408, 504):
+            return ProviderTimeoutError(message, status)
+        return ProviderError(
+            message, status, parse_retry_after(headers.get("Retry-After"))
+        )
+
+
+class OpenAICompatibleBackend(HTTPProviderBackend):
+    """Backend for the OpenAI chat completions wire format.
+
+    Used for OpenAI itself and for the providers exposing the same API
+    (OpenRouter, Groq, Mistral).
+    """
+
+    def _headers(self) -> Dict[str, str]:
+        """Return the request headers."""
+        headers = super()._headers()
+        if self._api_key:
+            headers["Authorization"] = f"Bearer {self._api_key}"
+        if self.provider == "openrouter":
+            headers["X-Title"] = "Aight"
+        return headers
+
+    async def async_complete(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        **kwargs: Any,
+    ) -> ProviderCompletion:
+        """Run a chat completion."""
+        # OpenAI-compatible APIs cache long prompt prefixes automatically
+        payload = {
+            "model": self._strip_provider_prefix(model),
+            "messages": _plain_messages(messages),
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            **kwargs,
+        }
+        data = await self._post("/chat/completions", payload)
+
+        choice = data["choices"][0]
+        usage = data.get("usage") or {}
+        return ProviderCompletion(
+            content=choice["message"].get("content") or "",
+            tokens_used=usage.get("total_tokens"),
+            finish_reason=choice.get("finish_reason"),
+            prompt_tokens=usage.get("prompt_tokens"),
+            completion_tokens=usage.get("completion_tokens"),
+            cached_tokens=(usage.get("prompt_tokens_details") or {}).get("cached_tokens"),
+        )
+
+    async def async_stream(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        **kwargs: Any,
+    ) -> AsyncIterator[ProviderCompletion]:
+        """Stream a chat completion as content deltas."""
+        payload = {
+            "model": self._strip_provider_prefix(model),
+            "messages": _plain_messages(messages),
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stream": True,
+            **kwargs,
+        }
+        if self.provider == "openai":
+            # Ask for a final chunk carrying token usage
+            payload["stream_options"] = {"include_usage": True}
+
+        async for event in self._post_sse("/chat/completions", payload):
+            usage = event.get("usage") or {}
+            choices = event.get("choices") or [{}]
+            yield ProviderCompletion(
+                content=(choices[0].get("delta") or {}).get("content") or "",
+                tokens_used=usage.get("total_tokens"),
+                finish_reason=choices[0].get("finish_reason"),
+                prompt_tokens=usage.get("prompt_tokens"),
+                completion_tokens=usage.get("completion_tokens"),
+                cached_tokens=(usage.get("prompt_tokens_details") or {}).get("cached_tokens"),
+            )
+
+
+class AnthropicBackend(HTTPProviderBackend):
+    """Backend for the Anthropic messages wire format."""
+
+    def _headers(self) -> Dict[str, str]:
+        """Return the request headers."""
+        headers = super()._headers()
+        headers["x-api-key"] = self._api_key or ""
+        headers["anthropic-version"] = ANTHROPIC_API_VERSION
+        return headers
+
+    @staticmethod
+    def _messages(
+        messages: List[Dict[str, Any]]
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Split messages into system blocks and chat messages.
+
+        Anthropic takes the system prompt as a top-level field and caches
+        the prompt prefix up to each block marked with ``cache_control``.
+        """
+        system: List[Dict[str, Any]] = []
+        chat: List[Dict[str, Any]] = []
+        for message in messages:
+            block: Dict[str, Any] = {"type": "text", "text": message["content"]}
+            if message.get("cache_breakpoint"):
+                block["cache_control"] = {"type": "ephemeral"}
+            if message["role"] == "system":
+                system.append(block)
+            elif "cache_control" in block:
+                chat.append({"role": message["role"], "content": [block]})
+            else:
+                chat.append({"role": message["role"], "content": message["content"]})
+        return system, chat
+
+    @staticmethod
+    def _prompt_usage(usage: Dict[str, Any]) -> Tuple[Optional[int], Optional[int]]:
+        """Return the total and cache-read prompt tokens of a usage block.
+
+        ``input_tokens`` leaves out the tokens read from or written to the
+        cache, so they are added back for the total.
+        """
+        if usage.get("input_tokens") is None:
+            return None, None
+        cached = usage.get("cache_read_input_tokens") or 0
+        created = usage.get("cache_creation_input_tokens") or 0
+        return usage["input_tokens"] + cached + created, cached
+
+    async def async_complete(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        **kwargs: Any,
+    ) -> ProviderCompletion:
+        """Run a chat completion."""
+        system, chat = self._messages(messages)
+        payload: Dict[str, Any] = {
+            "model": self._strip_provider_prefix(model),
+            "messages": chat,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            **kwargs,
+        }
+        if system:
+            payload["system"] = system
+        data = await self._post("/v1/messages", payload)
+
+        content = "".join(
+            block.get("text", "")
+            for block in data.get("content", [])
+            if block.get("type") == "text"
+        )
+        usage = data.get("usage") or {}
+        prompt_tokens, cached_tokens = self._prompt_usage(usage)
+        completion_tokens = usage.get("output_tokens")
+        return ProviderCompletion(
+            content=content,
+            tokens_used=(prompt_tokens or 0) + (completion_tokens or 0) if usage else None,
+            finish_reason=data.get("stop_reason"),
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            cached_tokens=cached_tokens,
+        )
+
+    async def async_stream(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        **kwargs: Any,
+    ) -> AsyncIterator[ProviderCompletion]:
+        """Stream a chat completion as content deltas."""
+        system, chat = self._messages(messages)
+        payload: Dict[str, Any] = {
+            "model": self._strip_provider_prefix(model),
+            "messages": chat,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stream": True,
+            **kwargs,
+        }
+        if system:
+            payload["system"] = system
+
+        prompt_tokens = cached_tokens = None
+        async for event in self._post_sse("/v1/messages", payload):
+            event_type = event.get("type")
+            if event_type == "message_start":
+                usage = (event.get("message") or {}).get("usage") or {}
+                prompt_tokens, cached_tokens = self._prompt_usage(usage)
+            elif event_type == "content_block_delta":
+                yield ProviderCompletion(
+                    content=(event.get("delta") or {}).get("text", "")
+                )
+            elif event_type == "message_delta":
+                completion_tokens = (event.get("usage") or {}).get("output_tokens")
+                yield ProviderCompletion(
+                    content="",
+                    tokens_used=(prompt_tokens or 0) + (completion_tokens or 0),
+                    finish_reason=(event.get("delta") or {}).get("stop_reason"),
+                    prompt_tokens=prompt_tokens,
+                    completion_tokens=completion_tokens,
+                    cached_tokens=cached_tokens,
+                )
+            elif event_type == "error":
+                raise ProviderError(
+                    f"{self.provider} stream error: {event.get('error')}"
+                )
+
+
+def _keep_alive(minutes: int) -> Union[str, int]:
+    """Return the Ollama keep_alive value for a number of minutes."""
+    # Ollama reads any negative number as "keep loaded"
+    return -1 if minutes < 0 else f"{minutes}m"
+
+
+def _ollama_timings(data: Dict[str, Any]) -> Dict[str, float]:
+    """Return the phase durations Ollama reports in nanoseconds, in seconds."""
+    return {
+        phase: data[f"{phase}_duration"] / 1e9
+        for phase in ("total", *OLLAMA_TIMING_PHASES)
+        if data.get(f"{phase}_duration") is not None
+    }
+
+
+class OllamaBackend(HTTPProviderBackend):
+    """Backend for the Ollama chat API.
+
+    Every request asks the server to keep the model loaded for
+    ``keep_alive``, and ``async_preload`` loads a model ahead of the first
+    request. Completions carry the server's load and evaluation timings,
+    which tell model load time from inference time.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        provider: str,
+        api_key: Optional[str],
+        api_base: Optional[str] = None,
+        session: Optional[aiohttp.ClientSession] = None,
+    ) -> None:
+        """Initialize the backend."""
+        super().__init__(hass, provider, api_key, api_base, session)
+        self.keep_alive: Union[str, int] = _keep_alive(DEFAULT_OLLAMA_KEEP_ALIVE)
+
+    def set_keep_alive(self, minutes: int) -> None:
+        """Set how long the server keeps a model loaded after each request."""
+        self.keep_alive = _keep_alive(minutes)
+
+    async def async_preload(self, model: str) -> Dict[str, float]:
+        """Load a model into memory and return the server timings.
+
+        A generate request without a prompt only loads the model.
+        """
+        url = f"{self._api_base}/api/generate"
+        payload = {"model": self._strip_provider_prefix(model), "keep_alive": self.keep_alive}
+        try:
+            async with self._session.post(
+                url,
+                json=payload,
+                headers=self._headers(),
+                timeout=aiohttp.ClientTimeout(total=OLLAMA_PRELOAD_TIMEOUT),
+            ) as resp:
+                if resp.status >= 400:
+                    body = await resp.text()
+                    raise self._error_for_status(resp.status, body, resp.headers)
+                data = await resp.json(content_type=None)
+        except asyncio.TimeoutError as err:
+            raise ProviderTimeoutError(
+                f"{self.provider} did not load {model} within {OLLAMA_PRELOAD_TIMEOUT}s"
+            ) from err
+        except aiohttp.ClientError as err:
+            raise ProviderConnectionError(
+                f"{self.provider} connection failed: {err}"
+            ) from err
+        return _ollama_timings(data)
+
+    async def async_complete(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        **kwargs: Any,
+    ) -> ProviderCompletion:
+        """Run a chat completion."""
+        payload = {
+            "model": self._strip_provider_prefix(model),
+            "messages": _plain_messages(messages),
+            "stream": False,
+            "keep_alive": self.keep_alive,
+            "options": {
+                "temperature": temperature,
+                "num_predict": max_tokens,
+                **kwargs,
+            },
+        }
+        data = await self._post("/api/chat", payload)
+
+        prompt_tokens = data.get("prompt_eval_count")
+        completion_tokens = data.get("eval_count")
+        return ProviderCompletion(
+            content=(data.get("message") or {}).get("content", ""),
+            tokens_used=(prompt_tokens or 0) + (completion_tokens or 0),
+            finish_reason=data.get("done_reason"),
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            timings=_ollama_timings(data),
+        )
+
+    async def async_stream(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        **kwargs: Any,
+    ) -> AsyncIterator[ProviderCompletion]:
+        """Stream a chat completion as content deltas."""
+        payload = {
+            "model": self._strip_provider_prefix(model),
+            "messages": _plain_messages(messages),
+            "stream": True,
+            "keep_alive": self.keep_alive,
+            "options": {
+                "temperature": temperature,
+                "num_predict": max_tokens,
+                **kwargs,
+            },
+        }
+        # Ollama streams newline-delimited JSON objects
+        async for line in self._post_stream("/api/chat", payload):
+            data = json.loads(line)
+            if data.get("error"):
+                raise ProviderError(f"{self.provider} stream error: {data['error']}")
+            content = (data.get("message") or {}).get("content", "")
+            if not data.get("done"):
+                yield ProviderCompletion(content=content)
+                continue
+            prompt_tokens = data.get("prompt_eval_count")
+            completion_tokens = data.get("eval_count")
+            yield ProviderCompletion(
+                content=content,
+                tokens_used=(prompt_tokens or 0) + (completion_tokens or 0),
+                finish_reason=data.get("done_reason"),
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                timings=_ollama_timings(data),
+            )
+
+
+class MockBackend(ProviderBackend):
+    """Offline backend replaying recorded responses, for load testing.
+
+    Recordings and the latency, token rate and error injection profile
+    are read from ``MOCK_RECORDINGS_FILE`` in the config directory when it
+    exists. Injected failures surface as the provider errors the real
+    backends raise, so retries and failover behave as in production.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        provider: str,
+        api_key: Optional[str],
+        api_base: Optional[str] = None,
+    ) -> None:
+        """Initialize the backend."""
+        super().__init__(hass, provider, api_key, api_base)
+        self.replay = MockReplay()
+
+    async def async_setup(self) -> None:
+        """Load the recordings file, if there is one."""
+        path = self.hass.config.path(MOCK_RECORDINGS_FILE)
+
+        def _load() -> Optional[MockProfile]:
+            """Read the recordings file from disk."""
+            try:
+                return load_profile(path)
+            except FileNotFoundError:
+                return None
+
+        profile = await self.hass.async_add_executor_job(_load)
+        if profile is not None:
+            self.replay = MockReplay(profile)
+            _LOGGER.info(
+                "Mock provider replaying %d recorded responses from %s",
+                len(profile.responses), path,
+            )
+
+    def _error(self, err: MockError) -> ProviderError:
+        """Map an injected failure to the error a real backend raises."""
+        message = f"{self.provider} returned HTTP {err.status}: {err}"
+        if err.status in (401, 403):
+            return ProviderAuthenticationError(message, err.status)
+        if err.status == 429:
+            return ProviderRateLimitError(message, err.status, 1.0)
+        if err.status in (408, 504):
+            return ProviderTimeoutError(message, err.status)
+        return ProviderError(message, err.status)
+
+    def _completion(
+        self, messages: List[Dict[str, Any]], reply: str, content: str
+    ) -> ProviderCompletion:
+        """Build the completion carrying the token usage of a replayed reply."""
+        prompt_tokens, completion_tokens = self.replay.usage(messages, reply)
+        return ProviderCompletion(
+            content=content,
+            tokens_used=prompt_tokens + completion_tokens,
+            finish_reason="stop",
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+        )
+
+    async def async_complete(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        **kwargs: Any,
+    ) -> ProviderCompletion:
+        """Replay a completion."""
+        try:
+            content = await self.replay.async_complete(messages)
+        except MockError as err:
+            raise self._error(err) from err
+        return self._completion(messages, content, content)
+
+    async def async_stream(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        **kwargs: Any,
+    ) -> AsyncIterator[ProviderCompletion]:
+        """Replay a completion as content deltas at the profile's token rate."""
+        parts: List[str] = []
+        try:
+            async for chunk in self.replay.async_stream(messages):
+                parts.append(chunk)
+                yield ProviderCompletion(content=chunk)
+        except MockError as err:
+            raise self._error(err) from err
+        # Usage arrives on a final, empty chunk like in OpenAI streams
+        yield self._completion(messages, "".join(parts), "")
+
+
+# litellm's own name for providers whose model names lack its prefix
+_LITELLM_PROVIDERS = {
+    "google": "gemini",
+}
+
+
+class LiteLLMBackend(ProviderBackend):
+    """Fallback backend delegating to litellm for the long tail of providers."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        provider: str,
+        api_key: Optional[str],
+        api_base: Optional[str] = None,
+    ) -> None:
+        """Initialize the backend."""
+        super().__init__(hass, provider, api_key, api_base)
+        self._litellm = None
+
+    async def async_setup(self) -> None:
+        """Import litellm."""
+        # Import litellm on Home Assistant's shared executor; the import is
+        # slow and blocking, but only has to happen once per process
+        def _import_litellm():
+            """Import litellm in thread executor."""
+            try:
+                import litellm
+                return litellm
+            except ImportError as err:
+                _LOGGER.error("Failed to import litellm: %s", err)
+                raise
+
+        self._litellm = await self.hass.async_add_executor_job(_import_litellm)
+
+    def _call_kwargs(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Add this backend's credentials to the arguments of a litellm call.
+
+        litellm falls back to process-wide environment variables and module
+        globals; passing the key and API base with every call keeps backends
+        of different providers and entries from overwriting each other.
+        """
+        call_kwargs = dict(kwargs)
+        if self._api_key:
+            call_kwargs.setdefault("api_key", self._api_key)
+        if self._api_base:
+            call_kwargs.setdefault("api_base", self._api_base)
+        if self.provider in _LITELLM_PROVIDERS:
+            call_kwargs.setdefault("custom_llm_provider", _LITELLM_PROVIDERS[self.provider])
+        return call_kwargs
+
+    async def async_complete(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        **kwargs: Any,
+    ) -> ProviderCompletion:
+        """Run a chat completion."""
+        if not self._litellm:
+            raise RuntimeError("litellm backend not initialized")
+
+        response = await self._litellm.acompletion(
+            model=model,
+            messages=_plain_messages(messages),
+            temperature=temperature,
+            max_tokens=max_tokens,
+            **self._call_kwargs(kwargs)
+        )
+
+        usage = getattr(response, "usage", None)
+        return ProviderCompletion(
+            content=response.choices[0].message.content,
+            tokens_used=usage.total_tokens if usage else None,
+            finish_reason=response.choices[0].finish_reason,
+            prompt_tokens=getattr(usage, "prompt_tokens", None),
+            completion_tokens=getattr(usage, "completion_tokens", None),
+            cached_tokens=getattr(
+                getattr(usage, "prompt_tokens_details", None), "cached_tokens", None
+            ),
+        )
+
+    async def async_stream(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        **kwargs: Any,
+    ) -> AsyncIterator[ProviderCompletion]:
+        """Stream a chat completion as content deltas."""
+        if not self._litellm:
+            raise RuntimeError("litellm backend not initialized")
+
+        response = await self._litellm.acompletion(
+            model=model,
+            messages=_plain_messages(messages),
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True,
+            **self._call_kwargs(kwargs)
+        )
+        async for chunk in response:
+            usage = getattr(chunk, "usage", None)
+            choice = chunk.choices[0] if chunk.choices else None
+            yield ProviderCompletion(
+                content=(choice.delta.content or "") if choice else "",
+                tokens_used=getattr(usage, "total_tokens", None),
+                finish_reason=choice.finish_reason if choice else None,
+                prompt_tokens=getattr(usage, "prompt_tokens", None),
+                completion_tokens=getattr(usage, "completion_tokens", None),
+                cached_tokens=getattr(
+                    getattr(usage, "prompt_tokens_details", None), "cached_tokens", None
+                ),
+            )
+
+
+_WIRE_FORMAT_BACKENDS = {
+    "openai": OpenAICompatibleBackend,
+    "anthropic": AnthropicBackend,
+    "ollama": OllamaBackend,
+    "mock": MockBackend,
+}
+
+
+def create_backend(
+    hass: HomeAssistant,
+    provider: str,
+    api_key: Optional[str],
+    api_base: Optional[str] = None,
+    session: Optional[aiohttp.ClientSession] = None,
+) -> ProviderBackend:
+    """Create the backend for a provider, falling back to litellm.
+
+    Native HTTP backends send their requests on ``session`` when given.
+    """
+    backend_cls = _WIRE_FORMAT_BACKENDS.get(PROVIDER_WIRE_FORMATS.get(provider))
+    if backend_cls is None:
+        _LOGGER.debug("No native backend for %s, using litellm", provider)
+        return LiteLLMBackend(hass, provider, api_key, api_base)
+    if issubclass(backend_cls, HTTPProviderBackend):
+        return backend_cls(hass, provider, api_key, api_base, session)
+    return backend_cls(hass, provider, api_key, api_base)
@@ -0,0 +1,307 @@
+"""Priority request scheduler for AI Configuration Assistant."""
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import (
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_MAX_QUEUE_DEPTH,
+    DEFAULT_REQUESTS_PER_MINUTE,
+    DEFAULT_TOKENS_PER_MINUTE,
+    PRIORITY_NAMES,
+    UNMETERED_PROVIDERS,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class SchedulerOverloadedError(Exception):
+    """The request queue is full and the request was shed."""
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at ``per_minute`` tokens a minute.
+
+    The bucket may go into debt when a request turns out to cost more than
+    estimated; later requests then wait for the debt to be repaid.
+    """
+
+    def __init__(self, per_minute: float) -> None:
+        """Initialize a full bucket."""
+        self._capacity = per_minute
+        self._rate = per_minute / 60
+        self._tokens = per_minute
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        """Add the tokens earned since the last update."""
+        now = time.monotonic()
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def time_until(self, amount: float) -> float:
+        """Return the seconds until ``amount`` tokens are available."""
+        self._refill()
+        # A request larger than the whole bucket waits for a full bucket
+        needed = min(amount, self._capacity) - self._tokens
+        return max(0.0, needed / self._rate)
+
+    def consume(self, amount: float) -> None:
+        """Take tokens out of the bucket."""
+        self._refill()
+        self._tokens -= amount
+
+    def refund(self, amount: float) -> None:
+        """Return tokens that were reserved but not used."""
+        self._refill()
+        self._tokens = min(self._capacity, self._tokens + amount)
+
+
+@dataclass(order=True)
+class _Waiter:
+    """A request waiting for admission."""
+    priority: int
+    sequence: int
+    provider: str = field(compare=False)
+    tokens: int = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    enqueued: float = field(compare=False)
+
+
+class QueueWaitStats:
+    """Count and total queue wait of admitted requests per priority."""
+
+    def __init__(self) -> None:
+        """Initialize the counters."""
+        self.admitted = 0
+        self.shed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait: float) -> None:
+        """Record the queue wait of an admitted request."""
+        self.admitted += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the counters with waits in milliseconds."""
+        return {
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "avg_wait_ms": round(self.total_wait / self.admitted * 1000) if self.admitted else 0,
+            "max_wait_ms": round(self.max_wait * 1000),
+        }
+
+
+class RequestScheduler:
+    """Admit provider requests by priority within rate and concurrency limits.
+
+    Requests queue in priority order (interactive generation first,
+    background work last) and are admitted while fewer than
+    ``max_concurrent`` are running and the provider's requests-per-minute
+    and tokens-per-minute buckets allow it. When the queue is full the
+    lowest-priority request is shed.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        max_concurrent: int = DEFAULT_MAX_CONCURRENT_REQUESTS,
+        max_queue_depth: int = DEFAULT_MAX_QUEUE_DEPTH,
+    ) -> None:
+        """Initialize the scheduler."""
+        self.hass = hass
+        self._max_concurrent = max_concurrent
+        self._max_queue_depth = max_queue_depth
+        self._requests_per_minute = DEFAULT_REQUESTS_PER_MINUTE
+        self._tokens_per_minute = DEFAULT_TOKENS_PER_MINUTE
+        self._queue: List[_Waiter] = []
+        self._sequence = itertools.count()
+        self._running = 0
+        self._rpm_buckets: Dict[str, TokenBucket] = {}
+        self._tpm_buckets: Dict[str, TokenBucket] = {}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._stats = {priority: QueueWaitStats() for priority in range(len(PRIORITY_NAMES))}
+
+    def set_limits(self, requests_per_minute: int, tokens_per_minute: int) -> None:
+        """Set the per-provider rate limits, resetting the buckets."""
+        self._requests_per_minute = requests_per_minute
+        self._tokens_per_minute = tokens_per_minute
+        self._rpm_buckets.clear()
+        self._tpm_buckets.clear()
+
+    @asynccontextmanager
+    async def slot(
+        self, provider: str, priority: int, estimated_tokens: int
+    ) -> AsyncIterator["RequestSlot"]:
+        """Wait for admission and hold a request slot for the block."""
+        request_slot = await self.acquire(provider, priority, estimated_tokens)
+        try:
+            yield request_slot
+        finally:
+            self.release(request_slot)
+
+    async def acquire(
+        self, provider: str, priority: int, estimated_tokens: int
+    ) -> "RequestSlot":
+        """Wait for admission and return the request slot.
+
+        The caller must ``release`` the slot. Async generators use this
+        instead of ``slot`` so they can free it in their own ``finally``
+        when closed early.
+        """
+        await self._acquire(provider, priority, estimated_tokens)
+        return RequestSlot(self, provider, estimated_tokens)
+
+    async def _acquire(self, provider: str, priority: int, tokens: int) -> None:
+        """Queue a request and wait until it is admitted."""
+        if len(self._queue) >= self._max_queue_depth:
+            self._shed_for(priority)
+
+        waiter = _Waiter(
+            priority,
+            next(self._sequence),
+            provider,
+            tokens,
+            self.hass.loop.create_future(),
+            time.monotonic(),
+        )
+        heapq.heappush(self._queue, waiter)
+        self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if (
+                waiter.future.done()
+                and not waiter.future.cancelled()
+                and waiter.future.exception() is None
+            ):
+                # Admitted just as the caller gave up; free the slot again
+                self._running -= 1
+                self._dispatch()
+            elif waiter in self._queue:
+                self._queue.remove(waiter)
+                heapq.heapify(self._queue)
+            raise
+
+    def _shed_for(self, priority: int) -> None:
+        """Make room for a request of ``priority`` or reject it."""
+        lowest = max(self._queue)
+        if lowest.priority <= priority:
+            self._stats[priority].shed += 1
+            raise SchedulerOverloadedError(
+                f"Too many queued AI requests ({len(self._queue)}); "
+                f"{PRIORITY_NAMES[priority]} request rejected"
+            )
+        self._queue.remove(lowest)
+        heapq.heapify(self._queue)
+        self._stats[lowest.priority].shed += 1
+        lowest.future.set_exception(
+            SchedulerOverloadedError(
+                f"{PRIORITY_NAMES[lowest.priority]} request dropped to make "
+                f"room for a {PRIORITY_NAMES[priority]} request"
+            )
+        )
+
+    @callback
+    def _dispatch(self) -> None:
+        """Admit queued requests in priority order while limits allow."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        retry_in: Optional[float] = None
+        blocked: Set[str] = set()
+        for waiter in sorted(self._queue):
+            if self._running >= self._max_concurrent:
+                break
+            if waiter.provider in blocked:
+                # Never let a lower-priority request overtake on the same provider
+                continue
+
+            wait = self._time_until_allowed(waiter)
+            if wait > 0:
+                blocked.add(waiter.provider)
+                retry_in = wait if retry_in is None else min(retry_in, wait)
+                continue
+
+            self._queue.remove(waiter)
+            self._consume(waiter)
+            self._running += 1
+            self._stats[waiter.priority].record(time.monotonic() - waiter.enqueued)
+            waiter.future.set_result(None)
+
+        heapq.heapify(self._queue)
+        if retry_in is not None:
+            self._timer = self.hass.loop.call_later(retry_in, self._dispatch)
+
+    def _buckets(self, provider: str) -> Optional[List[TokenBucket]]:
+        """Return the RPM and TPM buckets of a metered provider."""
+        if provider in UNMETERED_PROVIDERS:
+            return None
+        if provider not in self._rpm_buckets:
+            self._rpm_buckets[provider] = TokenBucket(self._requests_per_minute)
+            self._tpm_buckets[provider] = TokenBucket(self._tokens_per_minute)
+        return [self._rpm_buckets[provider], self._tpm_buckets[provider]]
+
+    def _time_until_allowed(self, waiter: _Waiter) -> float:
+        """Return the seconds until the provider's buckets admit a request."""
+        buckets = self._buckets(waiter.provider)
+        if buckets is None:
+            return 0.0
+        rpm, tpm = buckets
+        return max(rpm.time_until(1), tpm.time_until(waiter.tokens))
+
+    def _consume(self, waiter: _Waiter) -> None:
+        """Charge an admitted request against the provider's buckets."""
+        buckets = self._buckets(waiter.provider)
+        if buckets is not None:
+            rpm, tpm = buckets
+            rpm.consume(1)
+            tpm.consume(waiter.tokens)
+
+    def release(self, request_slot: "RequestSlot") -> None:
+        """Free a slot and settle the token estimate against actual usage."""
+        self._running -= 1
+        buckets = self._buckets(request_slot.provider)
+        if buckets is not None and request_slot.tokens_used is not None:
+            difference = request_slot.estimated_tokens - request_slot.tokens_used
+            if difference > 0:
+                buckets[1].refund(difference)
+            else:
+                buckets[1].consume(-difference)
+        self._dispatch()
+
+    @property
+    def queue_depth(self) -> int:
+        """Return the number of requests waiting for admission."""
+        return len(self._queue)
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Return queue depth, running requests and waits per priority."""
+        return {
+            "queue_depth": len(self._queue),
+            "running": self._running,
+            "priorities": {
+                PRIORITY_NAMES[priority]: stats.as_dict()
+                for priority, stats in self._stats.items()
+            },
+        }
+
+
+@dataclass
+class RequestSlot:
+    """An admitted request; report ``tokens_used`` once it is known."""
+    scheduler: RequestScheduler
+    provider: str
+    estimated_tokens: int
+    tokens_used: Optional[int] = None
@@ -0,0 +1,249 @@
+"""Performance sensors for AI Configuration Assistant."""
+from dataclasses import dataclass
+from datetime import timedelta
+import logging
+from typing import Any, Callable, Dict, List
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import PERCENTAGE, EntityCategory, UnitOfTime
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.typing import StateType
+
+from .const import (
+    CONF_FALLBACK_PROVIDERS,
+    CONF_LLM_PROVIDER,
+    DOMAIN,
+    METRICS_STAGES,
+    OLLAMA_TIMING_PHASES,
+    PROVIDER_WIRE_FORMATS,
+    STAGE_LLM,
+    STAGE_POST_PROCESS,
+    STAGE_PREPARE,
+    STAGE_TOTAL,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# The metrics live in memory, so polling them is cheap
+SCAN_INTERVAL = timedelta(seconds=30)
+
+# Display names of the timed pipeline stages
+_STAGE_NAMES = {
+    STAGE_TOTAL: "Generation",
+    STAGE_PREPARE: "Prompt preparation",
+    STAGE_LLM: "LLM",
+    STAGE_POST_PROCESS: "Post-processing",
+}
+
+# Display names of the phases reported by Ollama servers
+_PHASE_NAMES = {
+    "load": "model load",
+    "prompt_eval": "prompt evaluation",
+    "eval": "generation",
+}
+
+UNIT_TOKENS = "tokens"
+UNIT_USD = "USD"
+
+
+@dataclass(frozen=True, kw_only=True)
+class AssistantSensorEntityDescription(SensorEntityDescription):
+    """Describes a sensor reading a value from the integration's data."""
+    value_fn: Callable[[Dict[str, Any]], StateType]
+
+
+def _prompt_cache_ratio(data: Dict[str, Any]) -> StateType:
+    """Return the percentage of prompt tokens read from provider prompt caches."""
+    providers = data["llm_client"].provider_stats["providers"].values()
+    prompt_tokens = sum(p["prompt_cache"]["prompt_tokens"] for p in providers)
+    cached_tokens = sum(p["prompt_cache"]["cached_tokens"] for p in providers)
+    return round(cached_tokens / prompt_tokens * 100, 1) if prompt_tokens else 0.0
+
+
+SENSORS: tuple[AssistantSensorEntityDescription, ...] = (
+    AssistantSensorEntityDescription(
+        key="requests",
+        name="Generation requests",
+        icon="mdi:counter",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda data: data["metrics"].requests,
+    ),
+    AssistantSensorEntityDescription(
+        key="error_rate",
+        name="Generation error rate",
+        icon="mdi:alert-circle-outline",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda data: data["metrics"].error_rate,
+    ),
+    AssistantSensorEntityDescription(
+        key="llm_requests",
+        name="LLM requests",
+        icon="mdi:counter",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda data: data["metrics"].llm_requests,
+    ),
+    AssistantSensorEntityDescription(
+        key="llm_error_rate",
+        name="LLM error rate",
+        icon="mdi:alert-circle-outline",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda data: data["metrics"].llm_error_rate,
+    ),
+    AssistantSensorEntityDescription(
+        key="prompt_tokens",
+        name="Prompt tokens",
+        icon="mdi:text-box-outline",
+        native_unit_of_measurement=UNIT_TOKENS,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda data: data["metrics"].prompt_tokens,
+    ),
+    AssistantSensorEntityDescription(
+        key="completion_tokens",
+        name="Completion tokens",
+        icon="mdi:text-box-outline",
+        native_unit_of_measurement=UNIT_TOKENS,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda data: data["metrics"].completion_tokens,
+    ),
+    AssistantSensorEntityDescription(
+        key="estimated_cost",
+        name="Estimated spend",
+        device_class=SensorDeviceClass.MONETARY,
+        native_unit_of_measurement=UNIT_USD,
+        state_class=SensorStateClass.TOTAL,
+        suggested_display_precision=4,
+        value_fn=lambda data: round(data["metrics"].estimated_cost, 6),
+    ),
+    AssistantSensorEntityDescription(
+        key="cache_hit_ratio",
+        name="Generation cache hit ratio",
+        icon="mdi:cached",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda data: round(data["generation_cache"].stats["hit_ratio"] * 100, 1),
+    ),
+    AssistantSensorEntityDescription(
+        key="prompt_cache_ratio",
+        name="Prompt cache hit ratio",
+        icon="mdi:cached",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=_prompt_cache_ratio,
+    ),
+    AssistantSensorEntityDescription(
+        key="queue_depth",
+        name="Request queue depth",
+        icon="mdi:tray-full",
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda data: data["llm_client"].scheduler_stats["queue_depth"],
+    ),
+)
+
+
+def _latency_sensors(
+    key: str, name: str, histograms: Callable[[Dict[str, Any]], Dict[str, Any]], label: str
+) -> List[AssistantSensorEntityDescription]:
+    """Describe the p50 and p95 latency sensors of one histogram."""
+    return [
+        AssistantSensorEntityDescription(
+            key=f"{key}_latency_p{percentile}",
+            name=f"{name} latency p{percentile}",
+            device_class=SensorDeviceClass.DURATION,
+            native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+            state_class=SensorStateClass.MEASUREMENT,
+            value_fn=lambda data, percentile=percentile: (
+                histograms(data)[label].percentile(percentile / 100)
+                if label in histograms(data) else None
+            ),
+        )
+        for percentile in (50, 95)
+    ]
+
+
+def _providers(entry: ConfigEntry) -> List[str]:
+    """Return the configured providers in failover order."""
+    providers = [entry.data[CONF_LLM_PROVIDER]]
+    for fallback in entry.data.get(CONF_FALLBACK_PROVIDERS, []):
+        if fallback[CONF_LLM_PROVIDER] not in providers:
+            providers.append(fallback[CONF_LLM_PROVIDER])
+    return providers
+
+
+async def async_setup_entry(
+    hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
+) -> None:
+    """Set up the performance sensors."""
+    descriptions = list(SENSORS)
+    for stage in METRICS_STAGES:
+        descriptions.extend(
+            _latency_sensors(
+                f"stage_{stage}",
+                _STAGE_NAMES[stage],
+                lambda data: data["metrics"].stages,
+                stage,
+            )
+        )
+    for provider in _providers(entry):
+        descriptions.extend(
+            _latency_sensors(
+                f"provider_{provider}",
+                provider.capitalize(),
+                lambda data: data["metrics"].providers,
+                provider,
+            )
+        )
+        # Local servers report model load time apart from inference time
+        if PROVIDER_WIRE_FORMATS.get(provider) == "ollama":
+            for phase in OLLAMA_TIMING_PHASES:
+                descriptions.extend(
+                    _latency_sensors(
+                        f"provider_{provider}_{phase}",
+                        f"{provider.capitalize()} {_PHASE_NAMES[phase]}",
+                        lambda data: data["metrics"].server_phases,
+                        f"{provider}_{phase}",
+                    )
+                )
+
+    async_add_entities(
+        AssistantMetricSensor(entry, description) for description in descriptions
+    )
+
+
+class AssistantMetricSensor(SensorEntity):
+    """A performance metric of the assistant."""
+
+    entity_description: AssistantSensorEntityDescription
+    _attr_has_entity_name = True
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(
+        self, entry: ConfigEntry, description: AssistantSensorEntityDescription
+    ) -> None:
+        """Initialize the sensor."""
+        self.entity_description = description
+        self._entry_id = entry.entry_id
+        self._attr_unique_id = f"{entry.entry_id}_{description.key}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, entry.entry_id)},
+            name=entry.title or "AI Configuration Assistant",
+            entry_type=DeviceEntryType.SERVICE,
+        )
+
+    async def async_update(self) -> None:
+        """Read the current value of the metric from this entry's pipeline."""
+        data = self.hass.data.get(DOMAIN, {}).get("entries", {}).get(self._entry_id, {})
+        try:
+            self._attr_native_value = self.entity_description.value_fn(data)
+        except KeyError:
+            # The entry is being unloaded
+            self._attr_native_value = None
@@ -0,0 +1,69 @@
+"""Coalescing of identical in-flight requests for AI Configuration Assistant."""
+import asyncio
+import hashlib
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict, Generic, Optional, TypeVar
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+
+def request_key(*parts: Any) -> str:
+    """Hash the parts of a request into a coalescing key."""
+    encoded = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class SingleFlight(Generic[_T]):
+    """Share one in-flight call between concurrent callers with the same key.
+
+    The first caller starts the call as a task; callers arriving while it
+    runs await the same task and receive the same result or exception.
+    The call is cancelled only once every caller waiting on it is gone.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the single-flight group."""
+        self._calls: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[str, int] = {}
+        self.coalesced = 0
+
+    async def run(self, key: Optional[str], call: Callable[[], Awaitable[_T]]) -> _T:
+        """Run ``call``, or join the identical call already in flight."""
+        if key is None:
+            return await call()
+
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(call())
+            self._calls[key] = task
+            self._waiters[key] = 0
+            task.add_done_callback(lambda _: self._forget(key, task))
+        else:
+            self.coalesced += 1
+            _LOGGER.debug("Joining identical request already in flight")
+
+        self._waiters[key] += 1
+        try:
+            # Shielded so one impatient caller does not cancel the others
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done() and self._waiters.get(key) == 1:
+                task.cancel()
+            raise
+        finally:
+            if self._calls.get(key) is task:
+                self._waiters[key] -= 1
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        """Drop a finished call so the next request starts afresh."""
+        if self._calls.get(key) is task:
+            del self._calls[key]
+            del self._waiters[key]
+
+    @property
+    def in_flight(self) -> int:
+        """Return the number of distinct calls currently running."""
+        return len(self._calls)
@@ -0,0 +1,115 @@
+"""WebSocket API for AI Configuration Assistant."""
+import logging
+from typing import Any, Dict
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+
+from .const import (
+    ATTR_CONFIG_ENTRY_ID,
+    ATTR_PROFILE,
+    WS_TYPE_GENERATE_STREAM,
+    WS_TYPE_VALIDATE_BATCH,
+)
+from .entry_data import get_selected_entry_data, selection_error
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@callback
+def async_register_websocket_commands(hass: HomeAssistant) -> None:
+    """Register WebSocket commands."""
+    websocket_api.async_register_command(hass, ws_generate_stream)
+    websocket_api.async_register_command(hass, ws_validate_batch)
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): WS_TYPE_GENERATE_STREAM,
+        vol.Required("prompt"): str,
+        vol.Optional("config_type", default="automation"): str,
+        vol.Optional("context", default={}): dict,
+        vol.Optional("entities", default=[]): [str],
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): str,
+        vol.Optional(ATTR_PROFILE): str,
+    }
+)
+@callback
+def ws_generate_stream(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: Dict[str, Any],
+) -> None:
+    """Stream a configuration generation as subscription events.
+
+    The client receives ``stage`` and ``token`` events while the pipeline
+    runs, then a single ``result`` event. Unsubscribing cancels the request.
+    """
+    entry_data = get_selected_entry_data(hass, msg)
+    if not entry_data:
+        selected = ATTR_CONFIG_ENTRY_ID in msg or ATTR_PROFILE in msg
+        connection.send_error(
+            msg["id"], "not_found" if selected else "not_ready", selection_error(msg)
+        )
+        return
+    config_generator = entry_data["config_generator"]
+
+    async def _forward_events() -> None:
+        """Forward pipeline events to the subscriber."""
+        async for event in config_generator.async_generate_config_stream(
+            prompt=msg["prompt"],
+            config_type=msg["config_type"],
+            context=msg["context"],
+            include_entities=msg["entities"],
+        ):
+            connection.send_message(websocket_api.event_message(msg["id"], event))
+
+    task = hass.async_create_task(_forward_events())
+    connection.subscriptions[msg["id"]] = task.cancel
+    connection.send_result(msg["id"])
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): WS_TYPE_VALIDATE_BATCH,
+        vol.Required("configs"): [str],
+        vol.Optional("config_type", default="automation"): str,
+        vol.Optional("use_llm", default=True): bool,
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): str,
+        vol.Optional(ATTR_PROFILE): str,
+    }
+)
+@callback
+def ws_validate_batch(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: Dict[str, Any],
+) -> None:
+    """Validate many configurations, streaming results as subscription events.
+
+    The client receives an ``item`` event per configuration as it
+    completes, then a ``summary`` event. Unsubscribing cancels the rest.
+    """
+    entry_data = get_selected_entry_data(hass, msg)
+    if not entry_data:
+        selected = ATTR_CONFIG_ENTRY_ID in msg or ATTR_PROFILE in msg
+        connection.send_error(
+            msg["id"], "not_found" if selected else "not_ready", selection_error(msg)
+        )
+        return
+    config_generator = entry_data["config_generator"]
+
+    async def _forward_events() -> None:
+        """Forward validation results to the subscriber."""
+        async for event in config_generator.async_validate_batch(
+            configs=msg["configs"],
+            config_type=msg["config_type"],
+            use_llm=msg["use_llm"],
+        ):
+            connection.send_message(websocket_api.event_message(msg["id"], event))
+
+    task = hass.async_create_task(_forward_events())
+    connection.subscriptions[msg["id"]] = task.cancel
+    connection.send_result(msg["id"])
@@ -11,6 +11,13 @@ if (!customElements.get('ai-config-panel')) {
     this._conversationMessages = [];
     this._conversationContext = {};
     this._isProcessing = false;
+    this._activeGeneration = null;
+    this._chatRequestId = 0;
+  }
+
+  disconnectedCallback() {
+    // Closing the panel aborts the request in flight
+    this._abortActiveGeneration();
   }
 
   set hass(hass) {
@@ -559,6 +566,13 @@ if (!customElements.get('ai-config-panel')) {
           30% { opacity: 1; }
         }
 
+        .streaming-config {
+          margin: 0;
+          font-family: var(--code-font-family, monospace);
+          font-size: 12px;
+          white-space: pre-wrap;
+        }
+
         .chat-input-container {
           padding: 16px;
           background: var(--card-background-color);
@@ -1997,7 +2011,6 @@ entities:
   async _sendChatMessage() {
     const root = this.shadowRoot;
     const chatInput = root.getElementById('chat-input');
-    const chatSendBtn = root.getElementById('chat-send-btn');
     
     if (!chatInput || !chatInput.value.trim()) return;
     
@@ -2006,10 +2019,17 @@ entities:
     // Add user message
     this._addChatMessage('user', message);
     
-    // Clear input and disable send button
+    // A new prompt supersedes the request still in flight
+    if (this._abortActiveGeneration()) {
+      this._hideTypingIndicator();
+      this._addChatMessage('system', 'Cancelled the previous request.');
+    }
+    const requestId = ++this._chatRequestId;
+    
+    // Clear input; the send button stays enabled so a new prompt can
+    // replace a slow request
     chatInput.value = '';
     chatInput.style.height = 'auto';
-    chatSendBtn.disabled = true;
     this._isProcessing = true;
     
     // Update status
@@ -2050,12 +2070,21 @@ entities:
       this._hideTypingIndicator();
       this._addChatMessage('assistant', `Sorry, I encountered an error: ${error.message}`);
     } finally {
-      chatSendBtn.disabled = false;
-      this._isProcessing = false;
-      this._updateChatStatus('Ready');
+      // A superseded request leaves the state to the one replacing it
+      if (requestId === this._chatRequestId) {
+        this._isProcessing = false;
+        this._updateChatStatus('Ready');
+      }
     }
   }
 
+  _abortActiveGeneration() {
+    if (!this._activeGeneration) return false;
+    this._activeGeneration.abort();
+    this._activeGeneration = null;
+    return true;
+  }
+
   _isRefinementRequest(message) {
     const lower = message.toLowerCase();
     const refinementKeywords = [
@@ -2077,12 +2106,13 @@ entities:
       const refinedPrompt = `${this._conversationContext.originalPrompt}. ${refinementRequest}`;
       
       // Generate refined configuration
-      const result = await this._hass.callService('ai_config_assistant', 'generate_config', {
+      const result = await this._generateStreaming({
         prompt: refinedPrompt,
         type: configType,
         entities: this._conversationContext.confirmedEntities ? this._conversationContext.confirmedEntities.map(e => (e.entity || e).entity_id) : [],
         return_response: true
       });
+      if (result && result.cancelled) return;
       
       this._hideTypingIndicator();
       
@@ -2097,6 +2127,9 @@ entities:
           config: result.config,
           configType: configType
         });
+        if (result.explanation && !result.explanation_pending) {
+          this._addChatMessage('assistant', result.explanation);
+        }
         
         setTimeout(() => this._attachConfigPreviewListeners(), 100);
       } else if (result && !result.success) {
@@ -2422,9 +2455,10 @@ Please share this information when reporting issues.
         return_response: true
       };
 
-      console.log('Making service call with:', serviceCall);
-      const result = await this._hass.callService('ai_config_assistant', 'generate_config', serviceCall);
-      console.log('Service call result:', result);
+      console.log('Making streaming generation request with:', serviceCall);
+      const result = await this._generateStreaming(serviceCall);
+      console.log('Generation result:', result);
+      if (result && result.cancelled) return;
       
       // Hide typing indicator
       this._hideTypingIndicator();
@@ -2447,6 +2481,11 @@ Please share this information when reporting issues.
           configType: configType
         });
         
+        // A deferred explanation is added when it arrives
+        if (result.explanation && !result.explanation_pending) {
+          this._addChatMessage('assistant', result.explanation);
+        }
+        
         // Set up event listeners for the new buttons
         setTimeout(() => this._attachConfigPreviewListeners(), 100);
         
@@ -2508,6 +2547,120 @@ Please share this information when reporting issues.
     }
   }
 
+  async _generateStreaming(serviceCall) {
+    // Stream tokens and pipeline stages over the WebSocket API so the user
+    // sees output as soon as the provider produces it
+    const stageLabels = {
+      warming: 'Warming up...',
+      resolving_entities: 'Finding entities...',
+      generating: 'Generating...',
+      post_processing: 'Checking configuration...',
+      cache_hit: 'Found a cached result'
+    };
+    let streamEl = null;
+    let streamed = '';
+    let generation = null;
+
+    try {
+      return await new Promise((resolve, reject) => {
+        let unsubscribe = null;
+        let finished = false;
+        let pendingExplanation = false;
+        generation = {
+          // Unsubscribing cancels the generation on the server, including
+          // the provider request
+          abort: () => {
+            finished = true;
+            if (unsubscribe) unsubscribe();
+            resolve({ success: false, cancelled: true });
+          }
+        };
+        this._activeGeneration = generation;
+
+        this._hass.connection.subscribeMessage((event) => {
+          if (finished && event.type !== 'explanation') return;
+          if (event.type === 'stage') {
+            this._updateChatStatus(stageLabels[event.stage] || 'Processing...');
+          } else if (event.type === 'candidate') {
+            // A near-duplicate earlier request; show it while the fresh one streams
+            this._addChatMessage('system', `This looks like an earlier request (${Math.round(event.similarity * 100)}% similar). Here is that result while a fresh one is generated:`);
+            this._addChatMessage('config-preview', '', {
+              config: event.config,
+              configType: serviceCall.type
+            });
+            setTimeout(() => this._attachConfigPreviewListeners(), 100);
+          } else if (event.type === 'token') {
+            if (!streamEl) {
+              this._hideTypingIndicator();
+              streamEl = this._addStreamingMessage();
+            }
+            streamed += event.text;
+            streamEl.textContent = streamed;
+            const messagesContainer = this.shadowRoot.getElementById('chat-messages');
+            if (messagesContainer) {
+              messagesContainer.scrollTop = messagesContainer.scrollHeight;
+            }
+          } else if (event.type === 'explanation') {
+            // Deferred explanation of an already delivered config
+            this._addChatMessage('assistant', event.explanation);
+            if (unsubscribe) unsubscribe();
+          } else if (event.type === 'result') {
+            finished = true;
+            // Stay subscribed for a deferred explanation; the server ends
+            // the stream after delivering it
+            pendingExplanation = Boolean(event.explanation_pending);
+            if (unsubscribe && !pendingExplanation) unsubscribe();
+            resolve({
+              success: event.success,
+              config: event.config,
+              explanation: event.explanation,
+              entities_used: event.entities_used,
+              warnings: event.warnings,
+              request_id: event.request_id,
+              explanation_pending: event.explanation_pending,
+              error: event.success ? undefined : (event.warnings[0] || 'Configuration generation failed')
+            });
+          }
+        }, {
+          type: 'ai_config_assistant/generate_stream',
+          prompt: serviceCall.prompt,
+          config_type: serviceCall.type,
+          entities: serviceCall.entities
+        }).then((unsub) => {
+          unsubscribe = unsub;
+          if (finished && !pendingExplanation) unsub();
+        }, reject);
+      });
+    } catch (error) {
+      if (error && error.code === 'unknown_command') {
+        // Older integration backend without the streaming command
+        return await this._hass.callService('ai_config_assistant', 'generate_config', serviceCall);
+      }
+      throw error;
+    } finally {
+      if (this._activeGeneration === generation) {
+        this._activeGeneration = null;
+      }
+      // The streamed draft is replaced by the final config preview card
+      if (streamEl) {
+        streamEl.closest('.chat-message').remove();
+      }
+    }
+  }
+
+  _addStreamingMessage() {
+    const messagesContainer = this.shadowRoot.getElementById('chat-messages');
+    const messageEl = document.createElement('div');
+    messageEl.className = 'chat-message assistant';
+    messageEl.innerHTML = `
+      <div class="message-bubble">
+        <pre class="streaming-config"></pre>
+      </div>
+    `;
+    messagesContainer.appendChild(messageEl);
+    return messageEl.querySelector('.streaming-config');
+  }
+
   _attachEntityConfirmListeners() {
     const root = this.shadowRoot;
     
@@ -0,0 +1,32 @@
+"""Fixtures for the AI Configuration Assistant tests.
+
+The tests drive their own event loop and stand in a minimal object for
+Home Assistant, so they run without a Home Assistant instance. Run from
+the repository root:
+
+    python -m pytest tests -q
+"""
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Iterator
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture
+def loop() -> Iterator[asyncio.AbstractEventLoop]:
+    """Return a fresh event loop, closed after the test."""
+    event_loop = asyncio.new_event_loop()
+    yield event_loop
+    event_loop.run_until_complete(event_loop.shutdown_asyncgens())
+    event_loop.close()
+
+
+@pytest.fixture
+def hass(loop: asyncio.AbstractEventLoop) -> SimpleNamespace:
+    """Return the parts of Home Assistant the request pipeline uses."""
+    return SimpleNamespace(loop=loop)
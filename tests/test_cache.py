@@ -0,0 +1,106 @@
+"""Tests for near-duplicate prompt matching."""
+import pytest
+
+from custom_components.ai_config_assistant.cache import (
+    SimilarPromptIndex,
+    prompt_shingles,
+)
+
+PROMPT = "turn on the kitchen lights at sunset"
+REPHRASED = "please turn on kitchen light at sunset"
+KITCHEN = ["light.kitchen_ceiling"]
+
+
+def indexed(prompt: str = PROMPT, entities=KITCHEN) -> SimilarPromptIndex:
+    """Return an index holding one prompt under the key "cached"."""
+    index = SimilarPromptIndex()
+    index.add("cached", prompt, "automation", entities)
+    return index
+
+
+def test_shingles_ignore_filler_and_plurals():
+    """Rephrasings reduce to the same shingles."""
+    assert prompt_shingles(PROMPT) == prompt_shingles(REPHRASED)
+
+
+def test_finds_rephrased_prompt():
+    """A rephrased prompt about the same entities matches."""
+    assert indexed().find(REPHRASED, "automation", KITCHEN) == ("cached", 1.0)
+    key, similarity = indexed().find("kitchen lights on at sunset", "automation", KITCHEN)
+    assert key == "cached" and 0.75 <= similarity < 1.0
+
+
+def test_different_numbers_never_match():
+    """Prompts differing only in a time or level do not match."""
+    index = indexed("dim the kitchen lights to 30% at 7pm")
+    assert index.find("dim the kitchen lights to 30% at 8pm", "automation", KITCHEN) is None
+    assert index.find("dim the kitchen lights to 50% at 7pm", "automation", KITCHEN) is None
+    assert index.find("dim kitchen light to 30% at 7pm", "automation", KITCHEN) is not None
+
+
+def test_different_entities_never_match():
+    """The same words about other entities do not match."""
+    index = indexed()
+    assert index.find(PROMPT, "automation", ["light.kitchen_island"]) is None
+    assert index.find(PROMPT, "automation", KITCHEN + ["light.kitchen_island"]) is None
+    assert index.find(PROMPT, "automation", []) is None
+
+
+@pytest.mark.parametrize(
+    "prompt",
+    [
+        "turn off the kitchen lights 10 minutes after sunset",
+        "turn on the kitchen lights 10 minutes before sunset",
+        "do not turn on the kitchen lights 10 minutes after sunset",
+        "don't turn on the kitchen lights 10 minutes after sunset",
+        "never turn on the kitchen lights 10 minutes after sunset",
+    ],
+)
+def test_opposite_meaning_never_matches(prompt):
+    """Prompts differing in a word that flips their meaning do not match."""
+    index = indexed("turn on the kitchen lights 10 minutes after sunset")
+    assert index.find(
+        "please turn on kitchen light 10 minutes after sunset", "automation", KITCHEN
+    ) is not None
+    assert index.find(prompt, "automation", KITCHEN) is None
+
+
+@pytest.mark.parametrize(
+    ("cached", "prompt"),
+    [
+        (
+            "when motion in the hallway turn on the hallway light",
+            "when motion in the hallway turn off the hallway light",
+        ),
+        ("open the kitchen blinds when it is sunny", "close the kitchen blinds when it is sunny"),
+        ("lock the kitchen door when everyone leaves", "unlock the kitchen door when everyone leaves"),
+        ("arm the kitchen alarm when everyone leaves", "disarm the kitchen alarm when everyone leaves"),
+        ("start the kitchen fan when it is humid", "stop the kitchen fan when it is humid"),
+        ("turn on the kitchen fan when humidity is above 60", "turn on the kitchen fan when humidity is below 60"),
+        ("enable the kitchen motion lights at night", "disable the kitchen motion lights at night"),
+        ("turn on kitchen light when no one is home", "turn on kitchen light when someone is home"),
+    ],
+)
+def test_opposite_actions_never_match(cached, prompt):
+    """Opposite actions, comparisons and negations about the same entities do not match."""
+    assert indexed(cached).find(prompt, "automation", KITCHEN) is None
+    assert indexed(prompt).find(cached, "automation", KITCHEN) is None
+
+
+def test_config_type_must_match():
+    """A prompt cached for one config type does not answer another."""
+    assert indexed().find(PROMPT, "script", KITCHEN) is None
+
+
+def test_below_threshold_does_not_match():
+    """A prompt sharing too few words does not match."""
+    index = indexed()
+    assert index.find("turn on the kitchen fan when humid", "automation", KITCHEN) is None
+
+
+def test_removed_prompt_no_longer_matches():
+    """Removing a key drops it from every bucket."""
+    index = indexed()
+    index.remove("cached")
+    assert index.find(PROMPT, "automation", KITCHEN) is None
+    assert not index._buckets
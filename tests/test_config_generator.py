@@ -0,0 +1,66 @@
+"""Tests for the configuration generator's batch validation."""
+from types import SimpleNamespace
+from typing import List, Optional
+
+from custom_components.ai_config_assistant import config_generator
+from custom_components.ai_config_assistant.config_generator import ConfigGenerator
+from custom_components.ai_config_assistant.const import TASK_VALIDATE
+from custom_components.ai_config_assistant.llm_client import LLMClientManager, ProviderRoute
+from custom_components.ai_config_assistant.mock_llm import MockProfile, MockReplay
+from custom_components.ai_config_assistant.providers import MockBackend
+
+CONFIG = """alias: Porch light {index}
+trigger:
+  - platform: sun
+    event: sunset
+action:
+  - service: light.turn_on
+    target:
+      entity_id: light.porch
+"""
+
+
+def test_batches_are_sized_for_the_validation_model(loop, hass, monkeypatch):
+    """Packing and the review request use the model routed for validation."""
+    backend = MockBackend(hass, "mock", None)
+    backend.replay = MockReplay(
+        MockProfile(latency=0.0, tokens_per_second=0, responses=[{"content": '{"results": []}'}])
+    )
+    llm_client = LLMClientManager(hass)
+    llm_client._provider, llm_client._api_key = "mock", ""
+    llm_client._routes = [ProviderRoute("mock", backend, "mock-default")]
+    llm_client._router.configure("mock", "mock-default", {TASK_VALIDATE: "mock-validate"})
+
+    counted: List[Optional[str]] = []
+    requested: List[Optional[str]] = []
+    count_tokens = config_generator.count_tokens
+    monkeypatch.setattr(
+        config_generator,
+        "count_tokens",
+        lambda text, model=None: counted.append(model) or count_tokens(text, model),
+    )
+    validate_configs = llm_client.validate_configs
+
+    async def record_model(configs, config_type, **kwargs):
+        """Note the model a review is sent to."""
+        requested.append(kwargs.get("model"))
+        return await validate_configs(configs, config_type, **kwargs)
+
+    monkeypatch.setattr(llm_client, "validate_configs", record_model)
+
+    generator = ConfigGenerator(hass)
+    generator.setup(
+        llm_client,
+        SimpleNamespace(_entities_cache={"light.porch": None}),
+        local_fast_path=False,
+    )
+
+    async def validate() -> list:
+        """Validate three configurations."""
+        configs = [CONFIG.format(index=index) for index in range(3)]
+        return [event async for event in generator.async_validate_batch(configs, "automation")]
+
+    events = loop.run_until_complete(validate())
+    assert events[-1]["type"] == "summary"
+    assert set(counted) == {"mock-validate"}
+    assert requested == ["mock-validate"] * events[-1]["llm_requests"]
@@ -0,0 +1,121 @@
+"""Tests for entity autocomplete matching."""
+from types import SimpleNamespace
+from typing import List, Optional
+
+import pytest
+
+from homeassistant.core import State
+
+from custom_components.ai_config_assistant import entity_manager
+from custom_components.ai_config_assistant.entity_manager import EntityManager
+
+STATES = [
+    State("light.living_room_lamp", "on", {"friendly_name": "Living Room Lamp"}),
+    State("light.kitchen_ceiling", "off", {"friendly_name": "Kitchen Ceiling"}),
+    State("light.mushroom", "off", {"friendly_name": "Mushroom Lamp"}),
+    State("switch.kettle", "off", {"friendly_name": "Kettle"}),
+    State("sensor.bedroom_temperature", "21.5", {"friendly_name": "Bedroom Temperature"}),
+]
+
+# The kettle is only known to be in the kitchen through its area
+ENTITY_REGISTRY = SimpleNamespace(
+    entities={"switch.kettle": SimpleNamespace(area_id="kitchen", device_id=None)}
+)
+AREA_REGISTRY = SimpleNamespace(areas={"kitchen": SimpleNamespace(name="Kitchen")})
+
+
+@pytest.fixture
+def suggest(loop, monkeypatch):
+    """Return a function listing the entity IDs suggested for a query."""
+    monkeypatch.setattr(entity_manager, "async_get_entity_registry", lambda _: ENTITY_REGISTRY)
+    monkeypatch.setattr(
+        entity_manager, "async_get_device_registry", lambda _: SimpleNamespace(devices={})
+    )
+    monkeypatch.setattr(entity_manager, "async_get_area_registry", lambda _: AREA_REGISTRY)
+    hass = SimpleNamespace(
+        states=SimpleNamespace(async_all=lambda: list(STATES)),
+        bus=SimpleNamespace(async_listen=lambda *args, **kwargs: None),
+    )
+    manager = EntityManager(hass)
+    loop.run_until_complete(manager.initialize())
+
+    def run(query: str, domain_filter: Optional[List[str]] = None) -> List[str]:
+        """Return the suggested entity IDs, best first."""
+        suggestions = loop.run_until_complete(
+            manager.get_entity_suggestions(query, domain_filter=domain_filter)
+        )
+        return [suggestion.entity_id for suggestion in suggestions]
+
+    return run
+
+
+@pytest.mark.parametrize(
+    ("query", "expected"),
+    [
+        # Words of the entity ID, name and area match from their start
+        ("kitch", {"light.kitchen_ceiling", "switch.kettle"}),
+        ("KITCH", {"light.kitchen_ceiling", "switch.kettle"}),
+        ("room", {"light.living_room_lamp"}),
+        ("lamp", {"light.living_room_lamp", "light.mushroom"}),
+        ("light", {"light.living_room_lamp", "light.kitchen_ceiling", "light.mushroom"}),
+        # Text inside a word no longer matches: "room" does not find
+        # "bedroom" or "mushroom", nor "itche" "kitchen"
+        ("itche", set()),
+        ("oom", set()),
+        ("zzz", set()),
+    ],
+)
+def test_words_match_from_their_start(suggest, query, expected):
+    """A query matches the entities with a word beginning with it."""
+    assert set(suggest(query)) == expected
+
+
+def test_exact_word_ranks_first(suggest):
+    """A whole-word match outranks a longer word the query only begins."""
+    assert suggest("kettle") == ["switch.kettle"]
+    assert suggest("ket")[0] == "switch.kettle"
+    assert suggest("temperature") == ["sensor.bedroom_temperature"]
+
+
+@pytest.mark.parametrize(
+    ("query", "expected"),
+    [
+        ("kitchen cei", ["light.kitchen_ceiling"]),
+        ("living lamp", ["light.living_room_lamp"]),
+        # Every word must begin a word of the entity
+        ("kitchen lamp", []),
+        ("living oom", []),
+    ],
+)
+def test_every_word_must_match(suggest, query, expected):
+    """Multi-word queries intersect the matches of each word."""
+    assert suggest(query) == expected
+
+
+@pytest.mark.parametrize(
+    ("query", "domain_filter", "expected"),
+    [
+        ("light.kit", None, ["light.kitchen_ceiling"]),
+        ("switch.kit", None, ["switch.kettle"]),
+        ("sensor.kit", None, []),
+        ("light.kit", ["switch"], []),
+        ("light.living lamp", None, ["light.living_room_lamp"]),
+        # A dot after a word that is not a domain just separates words
+        ("kitchen.cei", None, ["light.kitchen_ceiling"]),
+    ],
+)
+def test_domain_qualified_query(suggest, query, domain_filter, expected):
+    """"domain.rest" searches only that domain for the rest of the query."""
+    assert suggest(query, domain_filter) == expected
+
+
+def test_bare_domain_lists_its_entities(suggest):
+    """A domain and a dot alone list the entities of that domain."""
+    assert set(suggest("light.")) == {
+        "light.living_room_lamp", "light.kitchen_ceiling", "light.mushroom"
+    }
+
+
+def test_domain_filter(suggest):
+    """The domain filter restricts plain queries too."""
+    assert suggest("kit", ["switch"]) == ["switch.kettle"]
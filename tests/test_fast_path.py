@@ -0,0 +1,184 @@
+"""Tests for generating simple automations without the LLM."""
+from types import SimpleNamespace
+from typing import List, Optional
+
+import pytest
+
+from custom_components.ai_config_assistant import fast_path
+from custom_components.ai_config_assistant.entity_manager import EntityInfo
+from custom_components.ai_config_assistant.fast_path import (
+    FastPathGenerator,
+    FastPathResult,
+)
+
+AREAS = {
+    "kitchen": SimpleNamespace(name="Kitchen", aliases=set()),
+    "hallway": SimpleNamespace(name="Hallway", aliases={"hall"}),
+}
+
+
+def entity(
+    entity_id: str, name: str, area: Optional[str] = None, **attributes
+) -> EntityInfo:
+    """Return an entity as the entity manager describes it."""
+    return EntityInfo(
+        entity_id, name, entity_id.split(".")[0], "off", attributes, area_name=area
+    )
+
+
+ENTITIES = [
+    entity("light.kitchen_ceiling", "Kitchen Ceiling", "Kitchen"),
+    entity("light.kitchen_island", "Kitchen Island", "Kitchen"),
+    entity("switch.coffee_maker", "Coffee Maker", "Kitchen"),
+    entity("sensor.kitchen_temperature", "Kitchen Temperature", "Kitchen"),
+    entity("light.hallway", "Hallway Light", "Hallway"),
+    entity("binary_sensor.hall_motion", "Hall Motion", "Hallway", device_class="motion"),
+    entity("binary_sensor.hall_door", "Hall Door", "Hallway", device_class="door"),
+    entity("light.porch", "Porch Light"),
+    entity("light.garden_left", "Garden Left"),
+    entity("light.garden_right", "Garden Right"),
+]
+
+
+class EntityIndex:
+    """The lookups of the entity manager the fast path uses."""
+
+    async def get_entities_by_area(self, area_name: str) -> List[EntityInfo]:
+        """Return the entities of an area."""
+        return [e for e in ENTITIES if (e.area_name or "").lower() == area_name.lower()]
+
+    async def get_entities_by_domain(self, domain: str) -> List[EntityInfo]:
+        """Return the entities of a domain."""
+        return [e for e in ENTITIES if e.domain == domain]
+
+
+@pytest.fixture
+def generate(loop, hass, monkeypatch):
+    """Return a function running the fast path on a prompt."""
+    monkeypatch.setattr(
+        fast_path, "async_get_area_registry", lambda _: SimpleNamespace(areas=AREAS)
+    )
+    generator = FastPathGenerator(hass, EntityIndex())
+
+    def run(prompt: str) -> Optional[FastPathResult]:
+        """Generate an automation for the prompt."""
+        return loop.run_until_complete(generator.async_generate(prompt))
+
+    return run
+
+
+@pytest.mark.parametrize(
+    ("prompt", "at"),
+    [
+        ("turn on the porch light at 7pm", "19:00:00"),
+        ("Please create an automation to turn on the porch light at 9:30 am", "09:30:00"),
+        ("turn on the porch light at 12am", "00:00:00"),
+        ("turn on porch light at 19:30 every day", "19:30:00"),
+        ("at 6.15pm, turn on the porch light", "18:15:00"),
+    ],
+)
+def test_time_trigger(generate, prompt, at):
+    """Clock times in 12- and 24-hour notation become time triggers."""
+    result = generate(prompt)
+    assert result.config["trigger"] == [{"platform": "time", "at": at}]
+    assert result.config["action"] == [
+        {"service": "light.turn_on", "target": {"entity_id": "light.porch"}}
+    ]
+    assert result.confidence == 1.0
+
+
+@pytest.mark.parametrize(
+    "prompt", ["turn on the porch light at 7", "turn on the porch light at 13pm"]
+)
+def test_ambiguous_or_invalid_time_is_left_to_the_llm(generate, prompt):
+    """"At 7" could be morning or evening; "13pm" is no time at all."""
+    assert generate(prompt) is None
+
+
+@pytest.mark.parametrize(
+    ("prompt", "trigger"),
+    [
+        ("turn off the porch light at sunrise", {"platform": "sun", "event": "sunrise"}),
+        (
+            "turn on the porch light 30 minutes before sunset",
+            {"platform": "sun", "event": "sunset", "offset": "-00:30:00"},
+        ),
+        (
+            "turn off the porch light 2 hours after sunrise",
+            {"platform": "sun", "event": "sunrise", "offset": "02:00:00"},
+        ),
+    ],
+)
+def test_sun_trigger(generate, prompt, trigger):
+    """Sunrise and sunset, with an optional offset, become sun triggers."""
+    assert generate(prompt).config["trigger"] == [trigger]
+
+
+def test_motion_trigger_uses_the_areas_motion_sensors(generate):
+    """A motion trigger watches the motion sensors of the area, by alias too."""
+    result = generate("when there is motion detected in the hall, turn on hallway light")
+    assert result.config["trigger"] == [
+        {"platform": "state", "entity_id": ["binary_sensor.hall_motion"], "to": "on"}
+    ]
+    assert result.entities == ["light.hallway", "binary_sensor.hall_motion"]
+
+
+def test_motion_in_area_without_sensors_is_left_to_the_llm(generate):
+    """Without a motion sensor in the area there is nothing to trigger on."""
+    assert generate("when motion in the kitchen turn on the kitchen lights") is None
+
+
+def test_everything_in_area(generate):
+    """"Everything in" an area switches its switchable entities only."""
+    action = generate("turn off everything in the kitchen at sunrise").config["action"]
+    assert action == [{
+        "service": "homeassistant.turn_off",
+        "target": {
+            "entity_id": ["light.kitchen_ceiling", "light.kitchen_island", "switch.coffee_maker"]
+        },
+    }]
+
+
+@pytest.mark.parametrize(
+    "prompt",
+    ["turn on kitchen lights at sunset", "turn on the lights in the kitchen at sunset"],
+)
+def test_domain_in_area(generate, prompt):
+    """A device kind and an area, in either order, select those entities."""
+    action = generate(prompt).config["action"]
+    assert action == [{
+        "service": "light.turn_on",
+        "target": {"entity_id": ["light.kitchen_ceiling", "light.kitchen_island"]},
+    }]
+
+
+@pytest.mark.parametrize(
+    "prompt",
+    [
+        "turn off the coffee maker at 9pm",
+        "turn off switch.coffee_maker at 9pm",
+        "turn off the coffee maker switch at 9pm",
+    ],
+)
+def test_named_entity(generate, prompt):
+    """An entity is found by its name or entity ID, with or without its kind."""
+    assert generate(prompt).entities == ["switch.coffee_maker"]
+
+
+@pytest.mark.parametrize(
+    "prompt",
+    [
+        # Two entities match equally well
+        "turn on the garden light at 7pm",
+        # No such entity
+        "turn on the garage light at 7pm",
+        # Too little of the name to be sure
+        "turn off coffee at 9pm",
+        # Not an intent the fast path knows
+        "flash the lights when the doorbell rings",
+        "turn on the porch light at 7pm and turn it off at 11pm",
+    ],
+)
+def test_unclear_requests_are_left_to_the_llm(generate, prompt):
+    """Anything not fully understood goes to the LLM."""
+    assert generate(prompt) is None
@@ -0,0 +1,374 @@
+"""Tests for the LLM client's provider request handling."""
+import asyncio
+import gc
+import time
+from datetime import timedelta
+from email.utils import format_datetime
+from typing import Any, Dict, List
+
+import pytest
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.ai_config_assistant import llm_client
+from custom_components.ai_config_assistant.const import (
+    CIRCUIT_COOLDOWN,
+    DEFAULT_HEDGE_DELAY,
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_RETRY_BASE_DELAY,
+    DEFAULT_RETRY_MAX_DELAY,
+    HEDGE_MAX_DELAY,
+    HEDGE_MIN_DELAY,
+    LATENCY_MIN_SAMPLES,
+)
+from custom_components.ai_config_assistant.llm_client import (
+    CircuitBreaker,
+    CircuitOpenError,
+    LatencyTracker,
+    LLMClientManager,
+    LLMMessage,
+    ProviderRoute,
+)
+from custom_components.ai_config_assistant.mock_llm import MockProfile, MockReplay
+from custom_components.ai_config_assistant.providers import (
+    MockBackend,
+    ProviderError,
+    parse_retry_after,
+)
+
+REPLY = "alias: Kitchen lights at sunset"
+
+
+def mock_manager(hass, *profiles: MockProfile) -> LLMClientManager:
+    """Return a client routed to a mock provider per profile, in failover order."""
+    manager = LLMClientManager(hass)
+    manager._routes = []
+    for index, profile in enumerate(profiles):
+        backend = MockBackend(hass, "mock", None)
+        backend.replay = MockReplay(profile)
+        manager._routes.append(ProviderRoute(f"mock{index}", backend, "mock-replay"))
+    return manager
+
+
+def replying(**kwargs: Any) -> MockProfile:
+    """Return a mock profile answering ``REPLY``, at once unless told otherwise."""
+    options: Dict[str, Any] = {
+        "latency": 0.0, "tokens_per_second": 0, "responses": [{"content": REPLY}]
+    }
+    return MockProfile(**{**options, **kwargs})
+
+
+def test_stream_closed_early_releases_slot(loop, hass):
+    """Leaving a stream after the first delta gives back its request slot."""
+    manager = mock_manager(hass, replying())
+    errors: List[Dict[str, Any]] = []
+    loop.set_exception_handler(lambda _loop, context: errors.append(context))
+
+    async def read_first_delta() -> str:
+        """Read one delta and leave the stream."""
+        stream = await manager.generate_completion(
+            [LLMMessage("user", "hi")], stream=True
+        )
+        async with stream:
+            async for delta in stream:
+                break
+        return delta
+
+    assert loop.run_until_complete(read_first_delta()) == "alias: "
+    assert manager._scheduler.stats["running"] == 0
+
+    gc.collect()
+    loop.run_until_complete(asyncio.sleep(0))
+    assert errors == []
+
+
+def test_stream_aclose_releases_slot(loop, hass):
+    """Closing a stream explicitly gives back its request slot."""
+    manager = mock_manager(hass, replying())
+
+    async def read_first_delta() -> None:
+        """Read one delta and close the stream."""
+        stream = await manager.generate_completion(
+            [LLMMessage("user", "hi")], stream=True
+        )
+        async for _ in stream:
+            assert manager._scheduler.stats["running"] == 1
+            break
+        await stream.aclose()
+
+    loop.run_until_complete(read_first_delta())
+    assert manager._scheduler.stats["running"] == 0
+
+
+def test_stream_read_to_end(loop, hass):
+    """A stream read to the end assembles the response and frees its slot."""
+    manager = mock_manager(hass, replying())
+
+    async def read_all() -> str:
+        """Read the whole stream."""
+        stream = await manager.generate_completion(
+            [LLMMessage("user", "hi")], stream=True
+        )
+        deltas = [delta async for delta in stream]
+        assert stream.response.content == "".join(deltas)
+        return stream.response.content
+
+    assert loop.run_until_complete(read_all()) == REPLY
+    assert manager._scheduler.stats["running"] == 0
+
+
+@pytest.fixture
+def clock(monkeypatch) -> List[float]:
+    """Freeze the monotonic clock; advance it by adding to ``clock[0]``."""
+    now = [1000.0]
+    monkeypatch.setattr(llm_client.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_circuit_opens_at_threshold(clock):
+    """Consecutive failures open the circuit; requests then fail fast."""
+    breaker = CircuitBreaker("mock", failure_threshold=3, cooldown=60)
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.before_call()
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_success_resets_failure_count(clock):
+    """Only failures in a row count towards the threshold."""
+    breaker = CircuitBreaker("mock", failure_threshold=2, cooldown=60)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+
+def test_circuit_half_opens_after_cooldown(clock):
+    """After the cool-down a probe goes through; its outcome decides the state."""
+    breaker = CircuitBreaker("mock", failure_threshold=1, cooldown=60)
+    breaker.record_failure()
+    clock[0] += 60
+    assert breaker.state == "half_open"
+    breaker.before_call()
+
+    # A failed probe re-opens the circuit for a whole cool-down
+    breaker.record_failure()
+    assert breaker.state == "open"
+    clock[0] += 59
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    clock[0] += 1
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_half_open_circuit_lets_one_probe_through(clock):
+    """While a probe is in flight, other requests keep failing fast."""
+    breaker = CircuitBreaker("mock", failure_threshold=1, cooldown=60)
+    assert breaker.before_call() is False
+    breaker.record_failure()
+    clock[0] += 60
+
+    assert breaker.before_call() is True
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    # A probe ending without an outcome, e.g. cancelled, frees the next one
+    breaker.end_probe()
+    assert breaker.before_call() is True
+    breaker.record_success()
+    assert breaker.before_call() is False
+    assert breaker.before_call() is False
+
+
+def test_half_open_provider_gets_a_single_request(loop, hass):
+    """Concurrent requests to a half-open provider send only one to the backend."""
+    manager = mock_manager(hass, replying(latency=0.05))
+    breaker = manager._circuit_breaker("mock0")
+    breaker.record_failure()
+    breaker._opened_at = time.monotonic() - CIRCUIT_COOLDOWN
+
+    async def run() -> List[Any]:
+        """Send two different requests at once."""
+        return await asyncio.gather(
+            manager.generate_completion([LLMMessage("user", "first")]),
+            manager.generate_completion([LLMMessage("user", "second")]),
+            return_exceptions=True,
+        )
+
+    probe, rejected = loop.run_until_complete(run())
+    assert probe.content == REPLY
+    assert isinstance(rejected, CircuitOpenError)
+    assert manager._routes[0].backend.replay.requests == 1
+    assert breaker.state == "closed"
+
+
+def test_retry_delay_backs_off_with_jitter(hass):
+    """Delays double per attempt up to the maximum, jittered in the upper half."""
+    manager = LLMClientManager(hass)
+    for attempt in range(8):
+        ceiling = min(DEFAULT_RETRY_MAX_DELAY, DEFAULT_RETRY_BASE_DELAY * 2 ** attempt)
+        for _ in range(20):
+            assert ceiling / 2 <= manager._retry_delay(attempt, None) <= ceiling
+
+
+def test_retry_delay_honours_retry_after(hass):
+    """Retry-After is a lower bound; one beyond the maximum delay gives up."""
+    manager = LLMClientManager(hass)
+    assert manager._retry_delay(0, 5.0) == 5.0
+    assert DEFAULT_RETRY_BASE_DELAY / 2 <= manager._retry_delay(0, 0.0) <= DEFAULT_RETRY_BASE_DELAY
+    assert manager._retry_delay(0, DEFAULT_RETRY_MAX_DELAY) == DEFAULT_RETRY_MAX_DELAY
+    assert manager._retry_delay(0, DEFAULT_RETRY_MAX_DELAY + 1) is None
+
+
+@pytest.mark.parametrize(
+    ("status", "attempts"), [(503, DEFAULT_MAX_RETRIES + 1), (400, 1)]
+)
+def test_retries_only_transient_failures(loop, hass, monkeypatch, status, attempts):
+    """Server errors are retried up to the limit; client errors are not."""
+    manager = mock_manager(hass, replying(error_rate=1.0, error_status=status))
+    monkeypatch.setattr(manager, "_retry_delay", lambda attempt, retry_after: 0.0)
+
+    with pytest.raises(ProviderError):
+        loop.run_until_complete(
+            manager.generate_completion([LLMMessage("user", "hi")])
+        )
+    assert manager._routes[0].backend.replay.requests == attempts
+    assert manager._scheduler.stats["running"] == 0
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [("3", 3.0), ("0.5", 0.5), ("-2", 0.0), ("", None), (None, None), ("soon", None)],
+)
+def test_parse_retry_after_seconds(value, expected):
+    """Retry-After in seconds is clamped at zero; garbage is ignored."""
+    assert parse_retry_after(value) == expected
+
+
+def test_parse_retry_after_http_date():
+    """Retry-After as an HTTP date is turned into the seconds until then."""
+    later = format_datetime(dt_util.utcnow() + timedelta(seconds=30), usegmt=True)
+    assert 28 <= parse_retry_after(later) <= 30
+    earlier = format_datetime(dt_util.utcnow() - timedelta(seconds=30), usegmt=True)
+    assert parse_retry_after(earlier) == 0.0
+
+
+def hedge_after(manager: LLMClientManager, seconds: float) -> None:
+    """Make every provider of a client hedge after ``seconds``."""
+    for route in manager._routes:
+        route.latency.hedge_delay = lambda: seconds
+        route.first_chunk_latency.hedge_delay = lambda: seconds
+
+
+def test_hedge_delay_follows_p95():
+    """The hedge delay is the recent p95, clamped, with a default until known."""
+    tracker = LatencyTracker()
+    for _ in range(LATENCY_MIN_SAMPLES - 1):
+        tracker.record(2.0)
+    assert tracker.hedge_delay() == DEFAULT_HEDGE_DELAY
+    tracker.record(2.0)
+    assert tracker.hedge_delay() == 2.0
+
+    fast = LatencyTracker()
+    slow = LatencyTracker()
+    for _ in range(LATENCY_MIN_SAMPLES):
+        fast.record(0.01)
+        slow.record(HEDGE_MAX_DELAY * 2)
+    assert fast.hedge_delay() == HEDGE_MIN_DELAY
+    assert slow.hedge_delay() == HEDGE_MAX_DELAY
+
+
+def test_failed_provider_fails_over_at_once(loop, hass):
+    """A provider that fails outright hands the request to the next one."""
+    manager = mock_manager(hass, replying(error_rate=1.0, error_status=400), replying())
+    hedge_after(manager, 10.0)
+
+    started = time.monotonic()
+    response = loop.run_until_complete(
+        manager.generate_completion([LLMMessage("user", "hi")])
+    )
+    assert time.monotonic() - started < 1.0
+    assert (response.provider, response.content) == ("mock1", REPLY)
+    assert (manager.failovers, manager.hedged_requests) == (1, 0)
+
+
+def test_empty_response_fails_over(loop, hass):
+    """An empty answer counts as a failure of the provider."""
+    manager = mock_manager(hass, replying(responses=[{"content": ""}]), replying())
+
+    response = loop.run_until_complete(
+        manager.generate_completion([LLMMessage("user", "hi")])
+    )
+    assert response.provider == "mock1"
+    assert manager.failovers == 1
+
+
+def test_last_error_surfaces_when_all_fail(loop, hass):
+    """With every provider failing, the last provider's error is raised."""
+    manager = mock_manager(
+        hass,
+        replying(error_rate=1.0, error_status=401),
+        replying(error_rate=1.0, error_status=400),
+    )
+
+    with pytest.raises(ProviderError) as err:
+        loop.run_until_complete(manager.generate_completion([LLMMessage("user", "hi")]))
+    assert err.value.status == 400
+
+
+def test_slow_provider_is_hedged(loop, hass):
+    """A provider slower than its hedge delay races the next one, which wins."""
+    manager = mock_manager(hass, replying(latency=5.0), replying())
+    hedge_after(manager, 0.05)
+
+    started = time.monotonic()
+    response = loop.run_until_complete(
+        manager.generate_completion([LLMMessage("user", "hi")])
+    )
+    assert time.monotonic() - started < 1.0
+    assert response.provider == "mock1"
+    assert (manager.hedged_requests, manager.failovers) == (1, 0)
+    # The losing request was cancelled and gave back its slot
+    assert manager._scheduler.stats["running"] == 0
+
+
+def test_fast_provider_is_not_hedged(loop, hass):
+    """A provider answering within its hedge delay is the only one asked."""
+    manager = mock_manager(hass, replying(latency=0.01), replying())
+    hedge_after(manager, 0.5)
+
+    response = loop.run_until_complete(
+        manager.generate_completion([LLMMessage("user", "hi")])
+    )
+    assert response.provider == "mock0"
+    assert manager.hedged_requests == 0
+    assert manager._routes[1].backend.replay.requests == 0
+
+
+def test_stream_fails_over_before_first_chunk(loop, hass):
+    """A stream failing before its first chunk is served by the next provider."""
+    manager = mock_manager(hass, replying(error_rate=1.0, error_status=400), replying())
+    hedge_after(manager, 10.0)
+
+    async def read_all() -> llm_client.LLMStream:
+        """Read the whole stream."""
+        stream = await manager.generate_completion(
+            [LLMMessage("user", "hi")], stream=True
+        )
+        async with stream:
+            async for _ in stream:
+                pass
+        return stream
+
+    stream = loop.run_until_complete(read_all())
+    assert (stream.provider, stream.response.content) == ("mock1", REPLY)
+    assert manager.failovers == 1
+    assert manager._scheduler.stats["running"] == 0
@@ -0,0 +1,199 @@
+"""Tests for the priority request scheduler."""
+import asyncio
+from typing import List
+
+import pytest
+
+from custom_components.ai_config_assistant import scheduler as scheduler_module
+from custom_components.ai_config_assistant.const import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_EXPLANATION,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_VALIDATION,
+)
+from custom_components.ai_config_assistant.scheduler import (
+    RequestScheduler,
+    SchedulerOverloadedError,
+    TokenBucket,
+)
+
+
+@pytest.fixture
+def clock(monkeypatch) -> List[float]:
+    """Freeze the monotonic clock; advance it by adding to ``clock[0]``."""
+    now = [1000.0]
+    monkeypatch.setattr(scheduler_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_bucket_refills_at_its_rate(clock):
+    """An emptied bucket earns back ``per_minute`` tokens a minute."""
+    bucket = TokenBucket(60)
+    assert bucket.time_until(60) == 0
+    bucket.consume(60)
+    assert bucket.time_until(1) == pytest.approx(1.0)
+    clock[0] += 30
+    assert bucket.time_until(30) == 0
+    assert bucket.time_until(40) == pytest.approx(10.0)
+
+
+def test_bucket_debt_and_refunds(clock):
+    """Usage beyond the estimate is owed; refunds never overfill the bucket."""
+    bucket = TokenBucket(60)
+    bucket.consume(90)
+    assert bucket.time_until(1) == pytest.approx(31.0)
+    bucket.refund(200)
+    assert bucket.time_until(60) == 0
+    # A request larger than the bucket waits for a full bucket only
+    bucket.consume(60)
+    assert bucket.time_until(600) == pytest.approx(60.0)
+
+
+def test_admits_by_priority(loop, hass):
+    """Queued requests are admitted highest priority first, in arrival order within one."""
+    scheduler = RequestScheduler(hass, max_concurrent=1)
+    admitted: List[str] = []
+
+    async def request(name: str, priority: int) -> None:
+        """Wait for a slot, note the admission and free the slot."""
+        async with scheduler.slot("mock", priority, 0):
+            admitted.append(name)
+            await asyncio.sleep(0)
+
+    async def run() -> None:
+        """Queue requests behind a held slot, then free it."""
+        held = await scheduler.acquire("mock", PRIORITY_INTERACTIVE, 0)
+        requests = [
+            asyncio.ensure_future(request(name, priority))
+            for name, priority in [
+                ("background", PRIORITY_BACKGROUND),
+                ("validation", PRIORITY_VALIDATION),
+                ("interactive 1", PRIORITY_INTERACTIVE),
+                ("explanation", PRIORITY_EXPLANATION),
+                ("interactive 2", PRIORITY_INTERACTIVE),
+            ]
+        ]
+        await asyncio.sleep(0)
+        assert scheduler.queue_depth == 5
+
+        scheduler.release(held)
+        await asyncio.gather(*requests)
+
+    loop.run_until_complete(run())
+    assert admitted == [
+        "interactive 1", "interactive 2", "explanation", "validation", "background"
+    ]
+    assert scheduler.stats["priorities"]["background"]["admitted"] == 1
+
+
+def test_full_queue_sheds_lowest_priority(loop, hass):
+    """A full queue drops its lowest-priority request for a more urgent one."""
+    scheduler = RequestScheduler(hass, max_concurrent=1, max_queue_depth=2)
+
+    async def run() -> None:
+        """Fill the queue, then queue more urgent and less urgent requests."""
+        held = await scheduler.acquire("mock", PRIORITY_INTERACTIVE, 0)
+        validation = asyncio.ensure_future(
+            scheduler.acquire("mock", PRIORITY_VALIDATION, 0)
+        )
+        background = asyncio.ensure_future(
+            scheduler.acquire("mock", PRIORITY_BACKGROUND, 0)
+        )
+        await asyncio.sleep(0)
+
+        interactive = asyncio.ensure_future(
+            scheduler.acquire("mock", PRIORITY_INTERACTIVE, 0)
+        )
+        await asyncio.sleep(0)
+        with pytest.raises(SchedulerOverloadedError):
+            await background
+
+        # Nothing queued is less urgent than a new background request
+        with pytest.raises(SchedulerOverloadedError):
+            await scheduler.acquire("mock", PRIORITY_BACKGROUND, 0)
+
+        scheduler.release(held)
+        scheduler.release(await interactive)
+        scheduler.release(await validation)
+
+    loop.run_until_complete(run())
+    stats = scheduler.stats
+    assert stats["running"] == 0
+    assert stats["priorities"]["background"]["shed"] == 2
+
+
+def test_rate_limit_defers_admission(loop, hass):
+    """A metered provider out of requests per minute waits for its bucket."""
+    scheduler = RequestScheduler(hass, max_concurrent=4)
+    scheduler.set_limits(requests_per_minute=600, tokens_per_minute=1_000_000)
+
+    async def run() -> None:
+        """Use up the bucket, then queue one more request."""
+        for _ in range(600):
+            scheduler.release(await scheduler.acquire("openai", PRIORITY_INTERACTIVE, 1))
+        waiting = asyncio.ensure_future(
+            scheduler.acquire("openai", PRIORITY_INTERACTIVE, 1)
+        )
+        await asyncio.sleep(0)
+        assert scheduler.queue_depth == 1
+
+        # Unmetered local providers are not held up
+        scheduler.release(await scheduler.acquire("mock", PRIORITY_INTERACTIVE, 1))
+
+        # 600 a minute refills one request every 0.1s
+        scheduler.release(await asyncio.wait_for(waiting, 1.0))
+
+    loop.run_until_complete(run())
+    assert scheduler.stats["running"] == 0
+
+
+def test_token_limit_defers_admission(loop, hass):
+    """A request's estimated tokens are charged against the tokens per minute."""
+    scheduler = RequestScheduler(hass)
+    scheduler.set_limits(requests_per_minute=1000, tokens_per_minute=6000)
+
+    async def run() -> None:
+        """Reserve most of the bucket, then queue a request that does not fit."""
+        request_slot = await scheduler.acquire("openai", PRIORITY_INTERACTIVE, 5900)
+        # Only 50 tokens were used; the rest goes back into the bucket
+        request_slot.tokens_used = 50
+        waiting = asyncio.ensure_future(
+            scheduler.acquire("openai", PRIORITY_INTERACTIVE, 1000)
+        )
+        await asyncio.sleep(0)
+        assert scheduler.queue_depth == 1
+
+        scheduler.release(request_slot)
+        await asyncio.sleep(0)
+        assert scheduler.queue_depth == 0
+        scheduler.release(await waiting)
+
+    loop.run_until_complete(run())
+
+
+def test_cancel_after_shed_keeps_running_count(loop, hass):
+    """A shed request cancelled before it wakes up holds no slot to give back."""
+    scheduler = RequestScheduler(hass, max_concurrent=1, max_queue_depth=1)
+
+    async def run() -> None:
+        """Fill the scheduler, shed a queued request and cancel it."""
+        held = await scheduler.acquire("mock", PRIORITY_INTERACTIVE, 0)
+        background = asyncio.ensure_future(
+            scheduler.acquire("mock", PRIORITY_BACKGROUND, 0)
+        )
+        await asyncio.sleep(0)
+        interactive = asyncio.ensure_future(
+            scheduler.acquire("mock", PRIORITY_INTERACTIVE, 0)
+        )
+        await asyncio.sleep(0)
+        # Shed, but not yet woken up
+        background.cancel()
+        with pytest.raises((asyncio.CancelledError, SchedulerOverloadedError)):
+            await background
+        assert scheduler.stats["running"] == 1
+
+        scheduler.release(held)
+        scheduler.release(await interactive)
+        assert scheduler.stats["running"] == 0
+
+    loop.run_until_complete(run())
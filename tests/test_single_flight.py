@@ -0,0 +1,125 @@
+"""Tests for coalescing identical in-flight requests."""
+import asyncio
+
+import pytest
+
+from custom_components.ai_config_assistant.single_flight import SingleFlight, request_key
+
+
+class Call:
+    """A call that finishes when released, counting how often it started."""
+
+    def __init__(self) -> None:
+        """Initialize the call."""
+        self.started = 0
+        self.cancelled = False
+        self.release = asyncio.Event()
+
+    async def __call__(self) -> str:
+        """Wait for the release and return a result."""
+        self.started += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return "result"
+
+
+def test_request_key_ignores_dict_order():
+    """Keys are equal for equal requests, whatever the order of their options."""
+    assert request_key({"a": 1, "b": 2}) == request_key({"b": 2, "a": 1})
+    assert request_key({"a": 1}) != request_key({"a": 2})
+
+
+def test_identical_calls_share_one_run(loop):
+    """Concurrent callers with the same key get the result of a single call."""
+    flight: SingleFlight[str] = SingleFlight()
+
+    async def run() -> None:
+        """Start three identical calls and one other."""
+        call = Call()
+        other = Call()
+        callers = [asyncio.ensure_future(flight.run("key", call)) for _ in range(3)]
+        callers.append(asyncio.ensure_future(flight.run("other", other)))
+        await asyncio.sleep(0)
+        assert flight.in_flight == 2
+
+        call.release.set()
+        other.release.set()
+        assert await asyncio.gather(*callers) == ["result"] * 4
+        assert (call.started, other.started, flight.coalesced) == (1, 1, 2)
+        assert flight.in_flight == 0
+
+    loop.run_until_complete(run())
+
+
+def test_one_waiter_cancelling_leaves_the_others(loop):
+    """A caller giving up does not cancel the call others still wait for."""
+    flight: SingleFlight[str] = SingleFlight()
+
+    async def run() -> None:
+        """Cancel the first of three callers."""
+        call = Call()
+        first, second, third = (
+            asyncio.ensure_future(flight.run("key", call)) for _ in range(3)
+        )
+        await asyncio.sleep(0)
+
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        assert not call.cancelled
+
+        call.release.set()
+        assert await asyncio.gather(second, third) == ["result", "result"]
+        assert call.started == 1
+
+    loop.run_until_complete(run())
+
+
+def test_last_waiter_cancelling_cancels_the_call(loop):
+    """Once every caller has given up, the shared call is cancelled."""
+    flight: SingleFlight[str] = SingleFlight()
+
+    async def run() -> None:
+        """Cancel both callers one after the other."""
+        call = Call()
+        callers = [asyncio.ensure_future(flight.run("key", call)) for _ in range(2)]
+        await asyncio.sleep(0)
+
+        for caller in callers:
+            caller.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await caller
+            await asyncio.sleep(0)
+        assert call.cancelled
+        assert flight.in_flight == 0
+
+        # The next identical request starts afresh
+        fresh = Call()
+        fresh.release.set()
+        assert await flight.run("key", fresh) == "result"
+        assert fresh.started == 1
+
+    loop.run_until_complete(run())
+
+
+def test_error_reaches_every_caller(loop):
+    """Callers sharing a failed call all receive its exception."""
+    flight: SingleFlight[str] = SingleFlight()
+
+    async def fail() -> str:
+        """Fail after the other callers joined."""
+        await asyncio.sleep(0)
+        raise ValueError("boom")
+
+    async def run() -> None:
+        """Start two identical failing calls."""
+        results = await asyncio.gather(
+            flight.run("key", fail), flight.run("key", fail), return_exceptions=True
+        )
+        assert [type(result) for result in results] == [ValueError, ValueError]
+        assert results[0] is results[1]
+
+    loop.run_until_complete(run())